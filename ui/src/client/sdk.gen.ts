@@ -1,7 +1,7 @@
 // This file is auto-generated by @hey-api/openapi-ts
 
 import type { Options as ClientOptions, TDataShape, Client } from '@hey-api/client-axios';
-import type { AddAssessmentApiV1AdminAssessmentAddPostData, AddAssessmentApiV1AdminAssessmentAddPostResponse, AddAssessmentApiV1AdminAssessmentAddPostError, EditAssessmentApiV1AdminAssessmentAssessmentIdEditPostData, EditAssessmentApiV1AdminAssessmentAssessmentIdEditPostError, GetYearDaysApiV1AdminDayYearYearIdGetData, GetYearDaysApiV1AdminDayYearYearIdGetResponse, GetYearDaysApiV1AdminDayYearYearIdGetError, AddDayApiV1AdminDayAddPostData, AddDayApiV1AdminDayAddPostResponse, AddDayApiV1AdminDayAddPostError, EditDayApiV1AdminDayDayIdEditPostData, EditDayApiV1AdminDayDayIdEditPostError, AddHallApiV1AdminHallAddPostData, AddHallApiV1AdminHallAddPostResponse, AddHallApiV1AdminHallAddPostError, EditHallApiV1AdminHallHallIdEditPostData, EditHallApiV1AdminHallHallIdEditPostError, GetYearHallsApiV1AdminHallYearYearIdGetData, GetYearHallsApiV1AdminHallYearYearIdGetResponse, GetYearHallsApiV1AdminHallYearYearIdGetError, AddPositionApiV1AdminPositionAddPostData, AddPositionApiV1AdminPositionAddPostResponse, AddPositionApiV1AdminPositionAddPostError, EditPositionApiV1AdminPositionPositionIdEditPostData, EditPositionApiV1AdminPositionPositionIdEditPostError, GetAllUsersApiV1AdminUserGetData, GetAllUsersApiV1AdminUserGetResponse, GetUserByIdApiV1AdminUserUserIdGetData, GetUserByIdApiV1AdminUserUserIdGetResponse, GetUserByIdApiV1AdminUserUserIdGetError, EditUserApiV1AdminUserUserIdEditPostData, EditUserApiV1AdminUserUserIdEditPostResponse, EditUserApiV1AdminUserUserIdEditPostError, AddUserDayApiV1AdminUserDayAddPostData, AddUserDayApiV1AdminUserDayAddPostResponse, AddUserDayApiV1AdminUserDayAddPostError, EditPositionApiV1AdminUserDayUserDayIdEditPostData, EditPositionApiV1AdminUserDayUserDayIdEditPostError, DeleteUserDayApiV1AdminUserDayUserDayIdDeleteData, DeleteUserDayApiV1AdminUserDayUserDayIdDeleteResponse, DeleteUserDayApiV1AdminUserDayUserDayIdDeleteError, GetDayAssignmentsApiV1AdminUserDayDayDayIdAssignmentsGetData, GetDayAssignmentsApiV1AdminUserDayDayDayIdAssignmentsGetResponse, GetDayAssignmentsApiV1AdminUserDayDayDayIdAssignmentsGetError, AddYearApiV1AdminYearAddPostData, AddYearApiV1AdminYearAddPostResponse, AddYearApiV1AdminYearAddPostError, EditYearApiV1AdminYearYearIdEditPostData, EditYearApiV1AdminYearYearIdEditPostError, GetUsersListApiV1AdminYearYearIdUsersGetData, GetUsersListApiV1AdminYearYearIdUsersGetResponse, GetUsersListApiV1AdminYearYearIdUsersGetError, GetYearPositionsApiV1AdminYearYearIdPositionsGetData, GetYearPositionsApiV1AdminYearYearIdPositionsGetResponse, GetYearPositionsApiV1AdminYearYearIdPositionsGetError, GetRegistrationFormsApiV1AdminYearYearIdRegistrationFormsGetData, GetRegistrationFormsApiV1AdminYearYearIdRegistrationFormsGetResponse, GetRegistrationFormsApiV1AdminYearYearIdRegistrationFormsGetError, RegisterApiV1AuthTelegramRegisterPostData, RegisterApiV1AuthTelegramRegisterPostResponse, RegisterApiV1AuthTelegramRegisterPostError, MigrateApiV1AuthTelegramMigratePostData, MigrateApiV1AuthTelegramMigratePostResponse, MigrateApiV1AuthTelegramMigratePostError, LoginApiV1AuthTelegramLoginPostData, LoginApiV1AuthTelegramLoginPostResponse, LoginApiV1AuthTelegramLoginPostError, RefreshApiV1AuthRefreshPostData, RefreshApiV1AuthRefreshPostResponse, RefreshApiV1AuthRefreshPostError, MeApiV1AuthMeGetData, MeApiV1AuthMeGetResponse, UpdateUserApiV1AuthUpdatePostData, UpdateUserApiV1AuthUpdatePostResponse, UpdateUserApiV1AuthUpdatePostError, GetYearsApiV1YearGetData, GetYearsApiV1YearGetResponse, GetFormYearApiV1YearYearIdGetData, GetFormYearApiV1YearYearIdGetResponse, GetFormYearApiV1YearYearIdGetError, SaveFormYearApiV1YearYearIdPostData, SaveFormYearApiV1YearYearIdPostResponse, SaveFormYearApiV1YearYearIdPostError, GetDayAssignmentsApiV1YearYearIdDaysDayIdAssignmentsGetData, GetDayAssignmentsApiV1YearYearIdDaysDayIdAssignmentsGetResponse, GetDayAssignmentsApiV1YearYearIdDaysDayIdAssignmentsGetError, HealthCheckHcGetData, HealthCheckHcGetResponse, ProxyPathGetData, ProxyPathGetError } from './types.gen';
+import type { AddAssessmentApiV1AdminAssessmentAddPostData, AddAssessmentApiV1AdminAssessmentAddPostResponse, AddAssessmentApiV1AdminAssessmentAddPostError, EditAssessmentApiV1AdminAssessmentAssessmentIdEditPostData, EditAssessmentApiV1AdminAssessmentAssessmentIdEditPostError, GetYearDaysApiV1AdminDayYearYearIdGetData, GetYearDaysApiV1AdminDayYearYearIdGetResponse, GetYearDaysApiV1AdminDayYearYearIdGetError, AddDayApiV1AdminDayAddPostData, AddDayApiV1AdminDayAddPostResponse, AddDayApiV1AdminDayAddPostError, EditDayApiV1AdminDayDayIdEditPostData, EditDayApiV1AdminDayDayIdEditPostError, AddHallApiV1AdminHallAddPostData, AddHallApiV1AdminHallAddPostResponse, AddHallApiV1AdminHallAddPostError, EditHallApiV1AdminHallHallIdEditPostData, EditHallApiV1AdminHallHallIdEditPostError, GetYearHallsApiV1AdminHallYearYearIdGetData, GetYearHallsApiV1AdminHallYearYearIdGetResponse, GetYearHallsApiV1AdminHallYearYearIdGetError, AddPositionApiV1AdminPositionAddPostData, AddPositionApiV1AdminPositionAddPostResponse, AddPositionApiV1AdminPositionAddPostError, EditPositionApiV1AdminPositionPositionIdEditPostData, EditPositionApiV1AdminPositionPositionIdEditPostError, GetAllUsersApiV1AdminUserGetData, GetAllUsersApiV1AdminUserGetResponse, GetAllUsersApiV1AdminUserGetError, GetUserByIdApiV1AdminUserUserIdGetData, GetUserByIdApiV1AdminUserUserIdGetResponse, GetUserByIdApiV1AdminUserUserIdGetError, EditUserApiV1AdminUserUserIdEditPostData, EditUserApiV1AdminUserUserIdEditPostResponse, EditUserApiV1AdminUserUserIdEditPostError, AddUserDayApiV1AdminUserDayAddPostData, AddUserDayApiV1AdminUserDayAddPostResponse, AddUserDayApiV1AdminUserDayAddPostError, EditPositionApiV1AdminUserDayUserDayIdEditPostData, EditPositionApiV1AdminUserDayUserDayIdEditPostError, DeleteUserDayApiV1AdminUserDayUserDayIdDeleteData, DeleteUserDayApiV1AdminUserDayUserDayIdDeleteResponse, DeleteUserDayApiV1AdminUserDayUserDayIdDeleteError, GetDayAssignmentsApiV1AdminUserDayDayDayIdAssignmentsGetData, GetDayAssignmentsApiV1AdminUserDayDayDayIdAssignmentsGetResponse, GetDayAssignmentsApiV1AdminUserDayDayDayIdAssignmentsGetError, AddYearApiV1AdminYearAddPostData, AddYearApiV1AdminYearAddPostResponse, AddYearApiV1AdminYearAddPostError, EditYearApiV1AdminYearYearIdEditPostData, EditYearApiV1AdminYearYearIdEditPostError, GetUsersListApiV1AdminYearYearIdUsersGetData, GetUsersListApiV1AdminYearYearIdUsersGetResponse, GetUsersListApiV1AdminYearYearIdUsersGetError, GetYearPositionsApiV1AdminYearYearIdPositionsGetData, GetYearPositionsApiV1AdminYearYearIdPositionsGetResponse, GetYearPositionsApiV1AdminYearYearIdPositionsGetError, GetRegistrationFormsApiV1AdminYearYearIdRegistrationFormsGetData, GetRegistrationFormsApiV1AdminYearYearIdRegistrationFormsGetResponse, GetRegistrationFormsApiV1AdminYearYearIdRegistrationFormsGetError, RegisterApiV1AuthTelegramRegisterPostData, RegisterApiV1AuthTelegramRegisterPostResponse, RegisterApiV1AuthTelegramRegisterPostError, MigrateApiV1AuthTelegramMigratePostData, MigrateApiV1AuthTelegramMigratePostResponse, MigrateApiV1AuthTelegramMigratePostError, LoginApiV1AuthTelegramLoginPostData, LoginApiV1AuthTelegramLoginPostResponse, LoginApiV1AuthTelegramLoginPostError, RefreshApiV1AuthRefreshPostData, RefreshApiV1AuthRefreshPostResponse, RefreshApiV1AuthRefreshPostError, LogoutApiV1AuthLogoutPostData, LogoutApiV1AuthLogoutPostError, MeApiV1AuthMeGetData, MeApiV1AuthMeGetResponse, UpdateUserApiV1AuthUpdatePostData, UpdateUserApiV1AuthUpdatePostResponse, UpdateUserApiV1AuthUpdatePostError, GetYearsApiV1YearGetData, GetYearsApiV1YearGetResponse, GetFormYearApiV1YearYearIdGetData, GetFormYearApiV1YearYearIdGetResponse, GetFormYearApiV1YearYearIdGetError, SaveFormYearApiV1YearYearIdPostData, SaveFormYearApiV1YearYearIdPostResponse, SaveFormYearApiV1YearYearIdPostError, GetDayAssignmentsApiV1YearYearIdDaysDayIdAssignmentsGetData, GetDayAssignmentsApiV1YearYearIdDaysDayIdAssignmentsGetResponse, GetDayAssignmentsApiV1YearYearIdDaysDayIdAssignmentsGetError, HealthCheckHcGetData, HealthCheckHcGetResponse, ProxyPathGetData, ProxyPathGetError } from './types.gen';
 import { client as _heyApiClient } from './client.gen';
 
 export type Options<TData extends TDataShape = TDataShape, ThrowOnError extends boolean = boolean> = ClientOptions<TData, ThrowOnError> & {
@@ -218,10 +218,10 @@ export const editPositionApiV1AdminPositionPositionIdEditPost = <ThrowOnError ex
 
 /**
  * Get All Users
- * Get list of all users
+ * Get list of users, a page of up to limit users at a time; pass the returned next_cursor to get the following page
  */
 export const getAllUsersApiV1AdminUserGet = <ThrowOnError extends boolean = false>(options?: Options<GetAllUsersApiV1AdminUserGetData, ThrowOnError>) => {
-    return (options?.client ?? _heyApiClient).get<GetAllUsersApiV1AdminUserGetResponse, unknown, ThrowOnError>({
+    return (options?.client ?? _heyApiClient).get<GetAllUsersApiV1AdminUserGetResponse, GetAllUsersApiV1AdminUserGetError, ThrowOnError>({
         security: [
             {
                 scheme: 'bearer',
@@ -388,7 +388,7 @@ export const editYearApiV1AdminYearYearIdEditPost = <ThrowOnError extends boolea
 
 /**
  * Get Users List
- * Get list of all users with their registration status for a specific year
+ * Get list of users with their registration status for a specific year. A page of up to limit users at a time; pass the returned next_cursor to get the following page
  */
 export const getUsersListApiV1AdminYearYearIdUsersGet = <ThrowOnError extends boolean = false>(options: Options<GetUsersListApiV1AdminYearYearIdUsersGetData, ThrowOnError>) => {
     return (options.client ?? _heyApiClient).get<GetUsersListApiV1AdminYearYearIdUsersGetResponse, GetUsersListApiV1AdminYearYearIdUsersGetError, ThrowOnError>({
@@ -493,6 +493,20 @@ export const refreshApiV1AuthRefreshPost = <ThrowOnError extends boolean = false
     });
 };
 
+/**
+ * Logout
+ */
+export const logoutApiV1AuthLogoutPost = <ThrowOnError extends boolean = false>(options: Options<LogoutApiV1AuthLogoutPostData, ThrowOnError>) => {
+    return (options.client ?? _heyApiClient).post<unknown, LogoutApiV1AuthLogoutPostError, ThrowOnError>({
+        url: '/api/v1/auth/logout',
+        ...options,
+        headers: {
+            'Content-Type': 'application/json',
+            ...options?.headers
+        }
+    });
+};
+
 /**
  * Me
  */
@@ -73,6 +73,7 @@ export type AddYearResponse = {
 
 export type AllUsersResponse = {
     users: Array<VolunteersApiV1AdminUserSchemasUserResponse>;
+    next_cursor?: string | null;
 };
 
 export type ApplicationFormYearSaveRequest = {
@@ -315,8 +316,11 @@ export type UserListItem = {
 
 export type UserListResponse = {
     users: Array<UserListItem>;
+    next_cursor?: string | null;
 };
 
+export type UserSort = 'id' | 'name_ru' | 'name_en';
+
 export type UserUpdateRequest = {
     first_name_ru?: string | null;
     last_name_ru?: string | null;
@@ -647,10 +651,28 @@ export type EditPositionApiV1AdminPositionPositionIdEditPostResponses = {
 export type GetAllUsersApiV1AdminUserGetData = {
     body?: never;
     path?: never;
-    query?: never;
+    query?: {
+        /**
+         * Words to find in names or username
+         */
+        search?: string | null;
+        sort?: UserSort;
+        descending?: boolean;
+        limit?: number;
+        cursor?: string | null;
+    };
     url: '/api/v1/admin/user';
 };
 
+export type GetAllUsersApiV1AdminUserGetErrors = {
+    /**
+     * Validation Error
+     */
+    422: HttpValidationError;
+};
+
+export type GetAllUsersApiV1AdminUserGetError = GetAllUsersApiV1AdminUserGetErrors[keyof GetAllUsersApiV1AdminUserGetErrors];
+
 export type GetAllUsersApiV1AdminUserGetResponses = {
     /**
      * Successful Response
@@ -881,7 +903,18 @@ export type GetUsersListApiV1AdminYearYearIdUsersGetData = {
     path: {
         year_id: number;
     };
-    query?: never;
+    query?: {
+        /**
+         * Words to find in names or username
+         */
+        search?: string | null;
+        registered?: boolean | null;
+        itmo_group?: string | null;
+        sort?: UserSort;
+        descending?: boolean;
+        limit?: number;
+        cursor?: string | null;
+    };
     url: '/api/v1/admin/year/{year_id}/users';
 };
 
@@ -1057,6 +1090,29 @@ export type RefreshApiV1AuthRefreshPostResponses = {
 
 export type RefreshApiV1AuthRefreshPostResponse = RefreshApiV1AuthRefreshPostResponses[keyof RefreshApiV1AuthRefreshPostResponses];
 
+export type LogoutApiV1AuthLogoutPostData = {
+    body: RefreshTokenRequest;
+    path?: never;
+    query?: never;
+    url: '/api/v1/auth/logout';
+};
+
+export type LogoutApiV1AuthLogoutPostErrors = {
+    /**
+     * Validation Error
+     */
+    422: HttpValidationError;
+};
+
+export type LogoutApiV1AuthLogoutPostError = LogoutApiV1AuthLogoutPostErrors[keyof LogoutApiV1AuthLogoutPostErrors];
+
+export type LogoutApiV1AuthLogoutPostResponses = {
+    /**
+     * Successful Response
+     */
+    200: unknown;
+};
+
 export type MeApiV1AuthMeGetData = {
     body?: never;
     path?: never;
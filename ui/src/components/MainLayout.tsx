@@ -409,8 +409,8 @@ export default observer(function MainLayout({
           <LanguageSwitcher />
           <Button
             color="inherit"
-            onClick={() => {
-              authStore.logout();
+            onClick={async () => {
+              await authStore.logout();
               navigate({ to: "/login" });
             }}
           >
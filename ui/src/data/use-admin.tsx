@@ -318,29 +318,52 @@ export const useDeleteUserDay = () => {
   });
 };
 
+// The largest page the user list endpoints serve
+const USER_PAGE_SIZE = 500;
+
+// Follows next_cursor until the last page and joins the pages' users
+const fetchAllUserPages = async <T,>(
+  fetchPage: (
+    cursor: string | undefined,
+  ) => Promise<{ users: T[]; next_cursor?: string | null }>,
+) => {
+  const users: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const page = await fetchPage(cursor);
+    users.push(...page.users);
+    cursor = page.next_cursor ?? undefined;
+  } while (cursor);
+  return { users };
+};
+
 // Query hooks
 export const useUsersList = (yearId: string | number) => {
   return useQuery({
     queryKey: queryKeys.admin.users.list(yearId),
-    queryFn: async () => {
-      const response = await getUsersListApiV1AdminYearYearIdUsersGet({
-        path: { year_id: Number(yearId) },
-        throwOnError: true,
-      });
-      return response.data;
-    },
+    queryFn: () =>
+      fetchAllUserPages(async (cursor) => {
+        const response = await getUsersListApiV1AdminYearYearIdUsersGet({
+          path: { year_id: Number(yearId) },
+          query: { limit: USER_PAGE_SIZE, cursor },
+          throwOnError: true,
+        });
+        return response.data;
+      }),
   });
 };
 
 export const useAllUsers = () => {
   return useQuery({
     queryKey: queryKeys.admin.users.allUsers(),
-    queryFn: async () => {
-      const response = await getAllUsersApiV1AdminUserGet({
-        throwOnError: true,
-      });
-      return response.data;
-    },
+    queryFn: () =>
+      fetchAllUserPages(async (cursor) => {
+        const response = await getAllUsersApiV1AdminUserGet({
+          query: { limit: USER_PAGE_SIZE, cursor },
+          throwOnError: true,
+        });
+        return response.data;
+      }),
   });
 };
 
@@ -2,6 +2,7 @@ import { action, makeAutoObservable } from "mobx";
 import { makePersistable } from "mobx-persist-store";
 import {
   loginApiV1AuthTelegramLoginPost,
+  logoutApiV1AuthLogoutPost,
   meApiV1AuthMeGet,
   migrateApiV1AuthTelegramMigratePost,
   refreshApiV1AuthRefreshPost,
@@ -22,6 +23,10 @@ export class UserNotFoundError extends Error {
   }
 }
 
+// The refresh under way, that requests failing with 401 at the same time wait for rather
+// than each exchanging the refresh token
+let refreshInFlight: Promise<void> | null = null;
+
 class AuthStore {
   private _user: VolunteersApiV1AuthSchemasUserResponse | null = null;
   private accessToken: string | null = null;
@@ -129,7 +134,8 @@ class AuthStore {
         if (
           error.response?.status === 401 &&
           !originalRequest._retry &&
-          !originalRequest.url?.includes("/api/v1/auth/refresh")
+          !originalRequest.url?.includes("/api/v1/auth/refresh") &&
+          !originalRequest.url?.includes("/api/v1/auth/logout")
         ) {
           originalRequest._retry = true;
           await this.refresh();
@@ -148,13 +154,34 @@ class AuthStore {
 
   @action
   async logout() {
+    if (this.refreshToken) {
+      // Ends the session on the server too, so that its refresh token can't be used anymore
+      try {
+        await logoutApiV1AuthLogoutPost({
+          throwOnError: true,
+          body: { refresh_token: this.refreshToken },
+        });
+      } catch (error) {
+        // Logged out locally all the same
+        console.error(error);
+      }
+    }
     this._user = null;
     this.accessToken = null;
     this.refreshToken = null;
   }
 
+  private refresh(): Promise<void> {
+    if (refreshInFlight === null) {
+      refreshInFlight = this.exchangeRefreshToken().finally(() => {
+        refreshInFlight = null;
+      });
+    }
+    return refreshInFlight;
+  }
+
   @action
-  private async refresh() {
+  private async exchangeRefreshToken() {
     if (!this.refreshToken) {
       throw new Error("No refresh token");
     }
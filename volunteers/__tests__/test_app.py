@@ -1,18 +1,38 @@
+import subprocess
+import sys
 from collections.abc import Generator
+from pathlib import Path
 from typing import Any
+from unittest.mock import AsyncMock, MagicMock
 
+import dependency_injector.providers as providers
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
 from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
 
-from volunteers.app import app
+from volunteers.app import app, container, metrics_registry
+
+# Started and stopped with the app, and would reach for the database in the background
+BACKGROUND_SERVICES = (
+    container.notification_outbox,
+    container.refresh_token_service,
+    container.user_service,
+    container.year_service,
+)
 
 
 @pytest.fixture
 def client() -> Generator[TestClient]:
-    # Using FastAPI's TestClient for sync tests
-    with TestClient(app) as c:
-        yield c
+    for provider in BACKGROUND_SERVICES:
+        provider.override(providers.Object(MagicMock(stop=AsyncMock())))
+    try:
+        # Using FastAPI's TestClient for sync tests
+        with TestClient(app) as c:
+            yield c
+    finally:
+        for provider in BACKGROUND_SERVICES:
+            provider.reset_override()
 
 
 def test_root_serves_auth_html(client: TestClient, monkeypatch: MonkeyPatch) -> None:
@@ -66,3 +86,65 @@ def test_http_middleware_metrics_inc(client: TestClient, monkeypatch: MonkeyPatc
     assert response.status_code == 200
     assert called["labels"]
     assert called["inc"]
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_http_middleware_labels_route_templates(client: TestClient) -> None:
+    before = {
+        endpoint: sample("http_request_duration_seconds_count", method="GET", endpoint=endpoint)
+        for endpoint in ("/api/v1/year/{year_id}", "/{path:path}", "/hc")
+    }
+
+    client.get("/api/v1/year/1")
+    client.get("/api/v1/year/2")
+    client.get("/some/frontend/page")
+    client.get("/hc")
+
+    assert (
+        sample(
+            "http_request_duration_seconds_count", method="GET", endpoint="/api/v1/year/{year_id}"
+        )
+        == before["/api/v1/year/{year_id}"] + 2
+    )
+    assert (
+        sample("http_request_duration_seconds_count", method="GET", endpoint="/{path:path}")
+        == before["/{path:path}"] + 1
+    )
+    assert (
+        sample("http_request_duration_seconds_count", method="GET", endpoint="/hc")
+        == before["/hc"] + 1
+    )
+    assert (
+        sample("http_request_duration_seconds_count", method="GET", endpoint="/api/v1/year/1") == 0
+    )
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+
+def test_http_middleware_labels_mounted_apps(client: TestClient) -> None:
+    client.get("/metrics/")
+    response = client.get("/metrics/")
+
+    assert (
+        'http_requests_total{endpoint="/metrics",method="GET",status_code="200"}' in response.text
+    )
+
+
+def test_metrics_registry_adds_up_processes(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    assert metrics_registry() is REGISTRY
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    # As gunicorn workers would, each writing the files of its own
+    for _ in range(2):
+        subprocess.run(  # noqa: S603
+            [
+                sys.executable,
+                "-c",
+                "from prometheus_client import Counter; Counter('jobs', 'Jobs').inc()",
+            ],
+            check=True,
+        )
+
+    assert metrics_registry().get_sample_value("jobs_total") == 2
@@ -0,0 +1,31 @@
+"""add_notification_outbox_failed_at
+
+Revision ID: 6f2a8d4b1c93
+Revises: c7d4e9a1f062
+Create Date: 2026-10-18 17:00:27.904512
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6f2a8d4b1c93"
+down_revision: str | None = "c7d4e9a1f062"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "notification_outbox",
+        sa.Column("failed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("notification_outbox", "failed_at")
@@ -0,0 +1,341 @@
+"""Upper bounds on the SQL statements every endpoint makes, against a seeded database.
+
+A bound going up means a new query per request, or one per row: an N+1. When a change
+makes an endpoint cheaper, lower its bound too.
+"""
+
+import asyncio
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from typing import Any
+
+import bcrypt
+import pytest
+from fastapi.routing import APIRoute
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.api.v1.auth import router as auth_router
+from volunteers.auth.jwt_tokens import JWTTokenPayload, create_access_token, create_refresh_token
+from volunteers.benchmarks.seed import seed
+from volunteers.conftest import QueryCounter
+from volunteers.core.di import Container
+from volunteers.models import Assessment, Day, LegacyUser, User, UserDay
+
+USERS = 30  # enough rows for a query per row to break any bound
+
+
+@dataclass
+class Case:
+    method: str
+    route: str
+    max_queries: int
+    as_user: str | None = "admin"  # "admin", "volunteer", or None for no token
+    json: Callable[[dict[str, Any]], Any] | None = None
+    params: dict[str, Any] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+def telegram_login(telegram_id: int, username: str) -> dict[str, Any]:
+    return {
+        "telegram_id": telegram_id,
+        "telegram_auth_date": 0,
+        "telegram_first_name": "Name",
+        "telegram_hash": "hash",
+        "telegram_username": username,
+    }
+
+
+CASES = [
+    # auth
+    Case(
+        "POST",
+        "/api/v1/auth/telegram/register",
+        4,
+        as_user=None,
+        json=lambda ids: telegram_login(1, "newcomer")
+        | {
+            "first_name_ru": "Имя",
+            "last_name_ru": "Фамилия",
+            "first_name_en": "Name",
+            "last_name_en": "Surname",
+        },
+    ),
+    Case(
+        "POST",
+        "/api/v1/auth/telegram/migrate",
+        5,
+        as_user=None,
+        json=lambda ids: telegram_login(ids["legacy_telegram_id"], "migrated")
+        | {"email": "legacy@example.com", "password": "password"},
+    ),
+    Case(
+        "POST",
+        "/api/v1/auth/telegram/login",
+        5,
+        as_user=None,
+        # A new username is saved on login
+        json=lambda ids: telegram_login(ids["volunteer_telegram_id"], "renamed"),
+    ),
+    Case(
+        "POST",
+        "/api/v1/auth/refresh",
+        1,
+        as_user=None,
+        json=lambda ids: {"refresh_token": ids["refresh_token"]},
+    ),
+    Case(
+        "POST",
+        "/api/v1/auth/logout",
+        1,
+        as_user=None,
+        json=lambda ids: {"refresh_token": ids["refresh_token"]},
+    ),
+    Case("POST", "/api/v1/auth/revoke-all", 1, as_user="volunteer"),
+    Case("GET", "/api/v1/auth/me", 1, as_user="volunteer"),
+    Case(
+        "POST",
+        "/api/v1/auth/update",
+        3,
+        as_user="volunteer",
+        json=lambda ids: {"phone": "+70000000000"},
+    ),
+    # year
+    Case("GET", "/api/v1/year/", 2, as_user="volunteer"),
+    Case("GET", "/api/v1/year/{year_id}", 7, as_user="volunteer"),
+    Case(
+        "POST",
+        "/api/v1/year/{year_id}",
+        7,
+        as_user="volunteer",
+        json=lambda ids: {"desired_positions_ids": ids["position_ids"][:2], "itmo_group": None},
+    ),
+    Case("GET", "/api/v1/year/{year_id}/days/{day_id}/assignments", 9, as_user="volunteer"),
+    Case("GET", "/api/v1/year/{year_id}/days/{day_id}/assignments/live", 3, as_user="volunteer"),
+    # admin/year
+    Case("POST", "/api/v1/admin/year/add", 2, json=lambda ids: {"year_name": "2030"}),
+    Case(
+        "POST",
+        "/api/v1/admin/year/{year_id}/edit",
+        3,
+        json=lambda ids: {"open_for_registration": False},
+    ),
+    Case("GET", "/api/v1/admin/year/{year_id}/users", 3),
+    Case("GET", "/api/v1/admin/year/{year_id}/positions", 3),
+    Case("GET", "/api/v1/admin/year/{year_id}/registration-forms", 6),
+    Case("GET", "/api/v1/admin/year/{year_id}/registration-forms/export", 2),
+    # admin/position
+    Case(
+        "POST",
+        "/api/v1/admin/position/add",
+        2,
+        json=lambda ids: {"year_id": ids["year_id"], "name": "Cook"},
+    ),
+    Case(
+        "POST",
+        "/api/v1/admin/position/{position_id}/edit",
+        3,
+        json=lambda ids: {"can_desire": False},
+    ),
+    # admin/hall
+    Case(
+        "POST",
+        "/api/v1/admin/hall/add",
+        2,
+        json=lambda ids: {"year_id": ids["year_id"], "name": "Hall D"},
+    ),
+    Case("POST", "/api/v1/admin/hall/{hall_id}/edit", 3, json=lambda ids: {"description": "Big"}),
+    Case("GET", "/api/v1/admin/hall/year/{year_id}", 3),
+    # admin/day
+    Case("GET", "/api/v1/admin/day/year/{year_id}", 3),
+    Case(
+        "POST",
+        "/api/v1/admin/day/add",
+        2,
+        json=lambda ids: {
+            "year_id": ids["year_id"],
+            "name": "Closing",
+            "information": "",
+            "score": 1.0,
+            "mandatory": False,
+            "assignment_published": False,
+        },
+    ),
+    Case(
+        "POST",
+        "/api/v1/admin/day/{day_id}/edit",
+        3,
+        json=lambda ids: {"information": "Come early"},
+    ),
+    Case(
+        "POST",
+        "/api/v1/admin/day/copy-assignments",
+        4,
+        json=lambda ids: {"source_day_id": ids["day_id"], "target_day_id": ids["other_day_id"]},
+    ),
+    # admin/user
+    Case("GET", "/api/v1/admin/user", 3, params={"limit": 20}),
+    Case("GET", "/api/v1/admin/user/export", 2),
+    Case("GET", "/api/v1/admin/user/{user_id}", 2),
+    Case("POST", "/api/v1/admin/user/{user_id}/edit", 3, json=lambda ids: {"email": "a@b.c"}),
+    # admin/user-day
+    Case(
+        "POST",
+        "/api/v1/admin/user-day/add",
+        3,
+        json=lambda ids: {
+            "application_form_id": ids["unassigned_form_id"],
+            "day_id": ids["day_id"],
+            "information": "",
+            "position_id": ids["position_ids"][0],
+            "hall_id": ids["hall_id"],
+        },
+    ),
+    Case(
+        "POST",
+        "/api/v1/admin/user-day/{user_day_id}/edit",
+        3,
+        json=lambda ids: {"position_id": ids["position_ids"][0], "hall_id": ids["hall_id"]},
+    ),
+    Case("DELETE", "/api/v1/admin/user-day/{user_day_id}", 4),
+    Case(
+        "POST",
+        "/api/v1/admin/user-day/day/{day_id}/batch",
+        15,
+        json=lambda ids: {
+            "add": [
+                {"application_form_id": form_id, "position_id": ids["position_ids"][1]}
+                for form_id in ids["unassigned_form_ids"]
+            ],
+            "edit": [
+                {"user_day_id": user_day_id, "position_id": ids["position_ids"][2]}
+                for user_day_id in ids["user_day_ids"][1:4]
+            ],
+            "delete": ids["user_day_ids"][4:7],
+        },
+    ),
+    Case("GET", "/api/v1/admin/user-day/day/{day_id}/assignments", 7),
+    Case("GET", "/api/v1/admin/user-day/day/{day_id}/assignments/export", 2),
+    # admin/assessment
+    Case(
+        "POST",
+        "/api/v1/admin/assessment/add",
+        2,
+        json=lambda ids: {"user_day_id": ids["user_day_id"], "comment": "Great", "value": 5.0},
+    ),
+    Case(
+        "POST",
+        "/api/v1/admin/assessment/{assessment_id}/edit",
+        3,
+        json=lambda ids: {"value": 4.0},
+    ),
+]
+
+
+async def seed_endpoints(engine: AsyncEngine, container: Container) -> dict[str, Any]:
+    """Seed the database and return the ids requests refer to, and tokens to make them."""
+    seeded = await seed(engine, users=USERS)
+    volunteer_id = seeded.registered_user_ids[0]
+    async with engine.begin() as conn:
+        telegram_ids = dict((await conn.execute(select(User.id, User.telegram_id))).tuples().all())
+        user_day_ids = list(
+            (
+                await conn.execute(
+                    select(UserDay.id)
+                    .where(UserDay.day_id == seeded.event_day_id)
+                    .order_by(UserDay.id)
+                )
+            ).scalars()
+        )
+        other_day_id = await conn.scalar(
+            select(Day.id)
+            .where(Day.year_id == seeded.open_year_id, Day.id != seeded.event_day_id)
+            .limit(1)
+        )
+        assessment_id = await conn.scalar(select(Assessment.id).limit(1))
+        legacy_user_id = seeded.unregistered_user_ids[0]
+        await conn.execute(
+            insert(LegacyUser).values(
+                new_user_id=legacy_user_id,
+                email="legacy@example.com",
+                password=bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=4)).decode(),
+            )
+        )
+
+    session_id, token_id = await container.refresh_token_service().start_session(volunteer_id)
+    session = JWTTokenPayload(user_id=volunteer_id, role="user", session_id=session_id)
+    admin = JWTTokenPayload(user_id=seeded.admin_id, role="admin")
+    return {
+        "year_id": seeded.open_year_id,
+        "day_id": seeded.event_day_id,
+        "other_day_id": other_day_id,
+        "position_id": seeded.position_ids[0],
+        "position_ids": seeded.position_ids,
+        "hall_id": seeded.hall_ids[0],
+        "user_id": volunteer_id,
+        "user_day_id": user_day_ids[0],
+        "user_day_ids": user_day_ids,
+        "unassigned_form_id": seeded.unassigned_form_ids[0],
+        "unassigned_form_ids": seeded.unassigned_form_ids[1:6],
+        "assessment_id": assessment_id,
+        "volunteer_telegram_id": telegram_ids[volunteer_id],
+        "legacy_telegram_id": telegram_ids[legacy_user_id],
+        "refresh_token": await create_refresh_token(session, token_id=token_id),
+        "tokens": {
+            "volunteer": await create_access_token(session),
+            "admin": await create_access_token(admin),
+        },
+    }
+
+
+def test_every_endpoint_has_a_bound() -> None:
+    # Not imported at module level: wiring the app container imports every test module
+    from volunteers.app import app
+
+    endpoints = {
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.path.startswith("/api/v1/")
+        for method in route.methods
+    }
+    assert endpoints == {str(case) for case in CASES}
+
+
+@pytest.mark.parametrize("case", CASES, ids=str)
+async def test_query_count(
+    case: Case,
+    monkeypatch: pytest.MonkeyPatch,
+    pg_engine: AsyncEngine,
+    pg_container: Container,
+    pg_client: AsyncClient,
+    db_queries: Callable[[], AbstractContextManager[QueryCounter]],
+) -> None:
+    monkeypatch.setattr(auth_router, "verify_telegram_login", lambda data, config: True)
+    ids = await seed_endpoints(pg_engine, pg_container)
+    headers = {}
+    if case.as_user is not None:
+        headers["Authorization"] = f"Bearer {ids['tokens'][case.as_user]}"
+    request = pg_client.request(
+        case.method,
+        case.route.format(**ids),
+        headers=headers,
+        params=case.params,
+        json=case.json(ids) if case.json else None,
+    )
+
+    with db_queries() as queries:
+        if case.route.endswith("/live"):
+            # The stream never ends, its queries are all made before it starts
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(request, timeout=0.5)
+            response = None
+        else:
+            response = await request
+
+    if response is not None:
+        assert response.is_success, response.text
+    assert queries.count <= case.max_queries, "\n".join(queries.statements)
@@ -10,6 +10,7 @@ from volunteers.api.v1.admin.day.router import router
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
 from volunteers.models import User
+from volunteers.services.year import DayNotFound, SameDayCopy
 
 
 class AppWithContainer(FastAPI):
@@ -125,3 +126,23 @@ async def test_edit_day_success(app: AppWithContainer, edit_day_request: dict[st
     day_edit_in = kwargs.get("day_edit_in")
     assert day_edit_in.name == "Updated Day"
     assert day_edit_in.information == "Updated info"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("error", "status_code"),
+    [(SameDayCopy(), status.HTTP_400_BAD_REQUEST), (DayNotFound(), status.HTTP_404_NOT_FOUND)],
+)
+async def test_copy_assignments_errors(
+    app: AppWithContainer, error: Exception, status_code: int
+) -> None:
+    app.test_year_service.copy_assignments_from_day = AsyncMock(side_effect=error)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/api/v1/admin/day/copy-assignments",
+            json={"source_day_id": 7, "target_day_id": 7},
+        )
+
+    assert resp.status_code == status_code
+    assert resp.json() == {"detail": str(error)}
@@ -1,14 +1,15 @@
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, Path, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
 from loguru import logger
 
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
+from volunteers.core.etag import conditional_response
 from volunteers.models import User
 from volunteers.schemas.day import DayEditIn, DayIn, DayOutAdmin
-from volunteers.services.year import YearService
+from volunteers.services.year import DayNotFound, SameDayCopy, YearService
 
 from .schemas import (
     AddDayRequest,
@@ -29,9 +30,15 @@ router = APIRouter(tags=["day"])
 @inject
 async def get_year_days(
     year_id: Annotated[int, Path(title="The ID of the year")],
+    request: Request,
+    response: Response,
     _: Annotated[User, Depends(with_admin)],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
-) -> list[DayOutAdmin]:
+) -> list[DayOutAdmin] | Response:
+    version = await year_service.get_days_version(year_id=year_id)
+    if not_modified := conditional_response(request, response, version):
+        return not_modified
+
     days = await year_service.get_days_by_year_id(year_id=year_id)
     return [
         DayOutAdmin(
@@ -109,11 +116,16 @@ async def copy_assignments(
     _: Annotated[User, Depends(with_admin)],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
 ) -> CopyAssignmentsResponse:
-    copied_count = await year_service.copy_assignments_from_day(
-        source_day_id=request.source_day_id,
-        target_day_id=request.target_day_id,
-        overwrite_existing=request.overwrite_existing,
-    )
+    try:
+        copied_count = await year_service.copy_assignments_from_day(
+            source_day_id=request.source_day_id,
+            target_day_id=request.target_day_id,
+            overwrite_existing=request.overwrite_existing,
+        )
+    except SameDayCopy as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except DayNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
     logger.info(
         f"Copied {copied_count} assignments from day {request.source_day_id} to day {request.target_day_id}"
     )
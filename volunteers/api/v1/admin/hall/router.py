@@ -1,11 +1,12 @@
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, Path, Response, status
+from fastapi import APIRouter, Depends, Path, Request, Response, status
 from loguru import logger
 
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
+from volunteers.core.etag import conditional_response
 from volunteers.models import User
 from volunteers.schemas.hall import HallEditIn, HallIn, HallOut
 from volunteers.services.year import YearService
@@ -68,9 +69,15 @@ async def edit_hall(
 @inject
 async def get_year_halls(
     year_id: Annotated[int, Path(title="The ID of the year")],
+    request: Request,
+    response: Response,
     _: Annotated[User, Depends(with_admin)],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
-) -> list[HallOut]:
+) -> list[HallOut] | Response:
+    version = await year_service.get_halls_version(year_id=year_id)
+    if not_modified := conditional_response(request, response, version):
+        return not_modified
+
     halls = await year_service.get_halls_by_year_id(year_id=year_id)
 
     return [
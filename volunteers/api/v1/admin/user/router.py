@@ -1,31 +1,74 @@
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
+from volunteers.core.etag import conditional_response
+from volunteers.core.export import ExportFormat, export_response
 from volunteers.models import User
-from volunteers.schemas.user import UserUpdate
-from volunteers.services.user import UserService
+from volunteers.schemas.user import (
+    DEFAULT_USER_PAGE_SIZE,
+    MAX_USER_PAGE_SIZE,
+    UserListQuery,
+    UserSort,
+    UserUpdate,
+)
+from volunteers.services.user import InvalidCursor, UserService
 
 from .schemas import AllUsersResponse, EditUserRequest, UserResponse
 
 router = APIRouter(tags=["user"])
 
+USER_EXPORT_COLUMNS = (
+    "id",
+    "telegram_id",
+    "first_name_ru",
+    "last_name_ru",
+    "patronymic_ru",
+    "first_name_en",
+    "last_name_en",
+    "isu_id",
+    "phone",
+    "email",
+    "telegram_username",
+    "is_admin",
+    "created_at",
+)
+
 
 @router.get(
     "",
     response_model=AllUsersResponse,
-    description="Get list of all users",
+    description="Get list of users, a page of up to limit users at a time; "
+    "pass the returned next_cursor to get the following page",
 )
 @inject
 async def get_all_users(
+    request: Request,
+    response: Response,
     _: Annotated[User, Depends(with_admin)],
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
-) -> AllUsersResponse:
-    users = await user_service.get_all_users()
+    search: Annotated[str | None, Query(description="Words to find in names or username")] = None,
+    sort: UserSort = UserSort.ID,
+    descending: bool = False,
+    limit: Annotated[int, Query(ge=1, le=MAX_USER_PAGE_SIZE)] = DEFAULT_USER_PAGE_SIZE,
+    cursor: str | None = None,
+) -> AllUsersResponse | Response:
+    version = await user_service.get_users_version()
+    if not_modified := conditional_response(request, response, version):
+        return not_modified
+
+    query = UserListQuery(
+        search=search, sort=sort, descending=descending, limit=limit, cursor=cursor
+    )
+    try:
+        page = await user_service.get_users_page(query)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     user_list = [
         UserResponse(
             user_id=user.id,
@@ -41,9 +84,30 @@ async def get_all_users(
             telegram_username=user.telegram_username,
             is_admin=user.is_admin,
         )
-        for user in users
+        for user in page.items
     ]
-    return AllUsersResponse(users=user_list)
+    return AllUsersResponse(users=user_list, next_cursor=page.next_cursor)
+
+
+# Declared before /{user_id}, which would match "export" too
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    description="Download the list of users as a CSV or XLSX file",
+)
+@inject
+async def export_users(
+    _: Annotated[User, Depends(with_admin)],
+    user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
+    search: Annotated[str | None, Query(description="Words to find in names or username")] = None,
+    sort: UserSort = UserSort.ID,
+    descending: bool = False,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.CSV,
+) -> StreamingResponse:
+    query = UserListQuery(search=search, sort=sort, descending=descending)
+    return export_response(
+        "users", export_format, USER_EXPORT_COLUMNS, user_service.stream_users(query)
+    )
 
 
 @router.get(
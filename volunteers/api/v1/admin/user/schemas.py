@@ -18,6 +18,7 @@ class UserResponse(BaseModel):
 
 class AllUsersResponse(BaseModel):
     users: list[UserResponse]
+    next_cursor: str | None = None
 
 
 class EditUserRequest(BaseModel):
@@ -7,9 +7,11 @@ from fastapi import FastAPI, status
 from httpx import ASGITransport, AsyncClient
 
 from volunteers.api.v1.admin.user_day.router import router
+from volunteers.api.v1.admin.user_day.schemas import MAX_BATCH_ITEMS
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
 from volunteers.models import User
+from volunteers.services.year import PositionNotFound, UserDayAlreadyExists
 
 
 class AppWithContainer(FastAPI):
@@ -129,3 +131,105 @@ async def test_edit_user_day_success(
     user_day_edit_in = kwargs.get("user_day_edit_in")
     assert user_day_edit_in.information == "User did not attend."
     assert user_day_edit_in.attendance == "no"
+
+
+@pytest.mark.asyncio
+async def test_batch_user_days_success(app: AppWithContainer, admin_user: User) -> None:
+    apply_batch_mock = AsyncMock(return_value=[MagicMock(id=901), MagicMock(id=902)])
+    app.test_year_service.apply_user_day_batch = apply_batch_mock
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/api/v1/admin/user_day/day/77/batch",
+            json={
+                "add": [
+                    {"application_form_id": 1, "position_id": 5},
+                    {"application_form_id": 2, "position_id": 6, "hall_id": 8},
+                ],
+                "edit": [{"user_day_id": 10, "position_id": 5, "attendance": "late"}],
+                "delete": [11, 12],
+            },
+        )
+    assert resp.status_code == status.HTTP_200_OK, resp.json()
+    assert resp.json() == {"success": True, "added_user_day_ids": [901, 902]}
+
+    apply_batch_mock.assert_awaited_once()
+    batch = apply_batch_mock.call_args.kwargs["batch"]
+    assert apply_batch_mock.call_args.kwargs["author"] == admin_user
+    assert batch.day_id == 77
+    assert [(item.application_form_id, item.hall_id) for item in batch.add] == [(1, None), (2, 8)]
+    assert batch.add[0].attendance == "unknown"
+    assert batch.edit.keys() == {10}
+    assert batch.edit[10].attendance == "late"
+    assert batch.delete == {11, 12}
+
+
+@pytest.mark.asyncio
+async def test_batch_user_days_rejects_duplicates(app: AppWithContainer) -> None:
+    app.test_year_service.apply_user_day_batch = AsyncMock()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        edited_and_deleted = await ac.post(
+            "/api/v1/admin/user_day/day/77/batch",
+            json={"edit": [{"user_day_id": 10, "position_id": 5}], "delete": [10]},
+        )
+        added_twice = await ac.post(
+            "/api/v1/admin/user_day/day/77/batch",
+            json={
+                "add": [
+                    {"application_form_id": 1, "position_id": 5},
+                    {"application_form_id": 1, "position_id": 6},
+                ]
+            },
+        )
+    assert edited_and_deleted.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert added_twice.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    app.test_year_service.apply_user_day_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_user_days_rejects_large_batches(app: AppWithContainer) -> None:
+    app.test_year_service.apply_user_day_batch = AsyncMock(return_value=[])
+    ids = range(1, MAX_BATCH_ITEMS + 2)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        largest = await ac.post(
+            "/api/v1/admin/user_day/day/77/batch", json={"delete": list(ids)[:MAX_BATCH_ITEMS]}
+        )
+        too_large = [
+            await ac.post("/api/v1/admin/user_day/day/77/batch", json=body)
+            for body in (
+                {"add": [{"application_form_id": i, "position_id": 5} for i in ids]},
+                {"edit": [{"user_day_id": i, "position_id": 5} for i in ids]},
+                {"delete": list(ids)},
+            )
+        ]
+    assert largest.status_code == status.HTTP_200_OK
+    assert [resp.status_code for resp in too_large] == [status.HTTP_422_UNPROCESSABLE_ENTITY] * 3
+    app.test_year_service.apply_user_day_batch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_user_days_not_found(app: AppWithContainer) -> None:
+    app.test_year_service.apply_user_day_batch = AsyncMock(side_effect=PositionNotFound())
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/api/v1/admin/user_day/day/77/batch",
+            json={"add": [{"application_form_id": 1, "position_id": 5}]},
+        )
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+    assert resp.json() == {"detail": "Position not found"}
+
+
+@pytest.mark.asyncio
+async def test_batch_user_days_already_assigned(app: AppWithContainer) -> None:
+    app.test_year_service.apply_user_day_batch = AsyncMock(side_effect=UserDayAlreadyExists())
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post(
+            "/api/v1/admin/user_day/day/77/batch",
+            json={"add": [{"application_form_id": 1, "position_id": 5}]},
+        )
+    assert resp.status_code == status.HTTP_409_CONFLICT
+    assert resp.json() == {"detail": "Application form is already assigned on this day"}
@@ -1,25 +1,59 @@
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, Path, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
+from volunteers.core.etag import conditional_response
+from volunteers.core.export import ExportFormat, export_response
 from volunteers.models import User
-from volunteers.schemas.user_day import UserDayEditIn, UserDayIn
-from volunteers.services.year import YearService
+from volunteers.schemas.user_day import (
+    UserDayBatchAddIn,
+    UserDayBatchIn,
+    UserDayEditIn,
+    UserDayIn,
+)
+from volunteers.services.year import (
+    ApplicationFormNotFound,
+    DayNotFound,
+    HallNotFound,
+    PositionNotFound,
+    UserDayAlreadyExists,
+    UserDayNotFound,
+    YearService,
+)
 
 from .schemas import (
     AddUserDayRequest,
     AddUserDayResponse,
     AssignmentItem,
     AssignmentsResponse,
+    BatchUserDayRequest,
+    BatchUserDayResponse,
     EditUserDayRequest,
 )
 
 router = APIRouter(tags=["user-day"])
 
+ASSIGNMENT_EXPORT_COLUMNS = (
+    "user_day_id",
+    "form_id",
+    "user_id",
+    "first_name_ru",
+    "last_name_ru",
+    "first_name_en",
+    "last_name_en",
+    "phone",
+    "telegram_username",
+    "position",
+    "hall",
+    "attendance",
+    "information",
+)
+
 
 @router.post(
     "/add",
@@ -88,6 +122,51 @@ async def delete_user_day(
     logger.info("User day has been deleted")
 
 
+@router.post(
+    "/day/{day_id}/batch",
+    response_model=BatchUserDayResponse,
+    description="Add, edit and delete assignments of a day in one transaction",
+)
+@inject
+async def batch_user_days(
+    day_id: Annotated[int, Path(title="The ID of the day")],
+    request: BatchUserDayRequest,
+    user: Annotated[User, Depends(with_admin)],
+    year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
+) -> BatchUserDayResponse:
+    batch = UserDayBatchIn(
+        day_id=day_id,
+        add=[UserDayBatchAddIn(**item.model_dump()) for item in request.add],
+        edit={
+            item.user_day_id: UserDayEditIn(
+                information=item.information,
+                attendance=item.attendance,
+                position_id=item.position_id,
+                hall_id=item.hall_id,
+            )
+            for item in request.edit
+        },
+        delete=set(request.delete),
+    )
+    try:
+        added_user_days = await year_service.apply_user_day_batch(batch=batch, author=user)
+    except (
+        ApplicationFormNotFound,
+        DayNotFound,
+        HallNotFound,
+        PositionNotFound,
+        UserDayNotFound,
+    ) as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except UserDayAlreadyExists as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    logger.info(
+        f"Applied batch to day {day_id}: {len(batch.add)} added, {len(batch.edit)} edited, "
+        f"{len(batch.delete)} deleted"
+    )
+    return BatchUserDayResponse(added_user_day_ids=[user_day.id for user_day in added_user_days])
+
+
 @router.get(
     "/day/{day_id}/assignments",
     response_model=AssignmentsResponse,
@@ -96,9 +175,15 @@ async def delete_user_day(
 @inject
 async def get_day_assignments(
     day_id: Annotated[int, Path(title="The ID of the day")],
+    request: Request,
+    response: Response,
     _: Annotated[User, Depends(with_admin)],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
-) -> AssignmentsResponse:
+) -> AssignmentsResponse | Response:
+    version = await year_service.get_day_assignments_version(day_id=day_id)
+    if not_modified := conditional_response(request, response, version):
+        return not_modified
+
     assignments = await year_service.get_all_assignments_by_day_id(day_id=day_id)
 
     assignment_items = [
@@ -112,3 +197,23 @@ async def get_day_assignments(
     ]
 
     return AssignmentsResponse(assignments=assignment_items)
+
+
+@router.get(
+    "/day/{day_id}/assignments/export",
+    response_class=StreamingResponse,
+    description="Download all assignments for a day as a CSV or XLSX file (admin only)",
+)
+@inject
+async def export_day_assignments(
+    day_id: Annotated[int, Path(title="The ID of the day")],
+    _: Annotated[User, Depends(with_admin)],
+    year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.CSV,
+) -> StreamingResponse:
+    return export_response(
+        f"assignments-{day_id}",
+        export_format,
+        ASSIGNMENT_EXPORT_COLUMNS,
+        year_service.stream_day_assignments(day_id),
+    )
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Self
+
+from pydantic import BaseModel, Field, model_validator
 
 from volunteers.models.attendance import Attendance
 from volunteers.schemas.base import BaseSuccessResponse
@@ -24,6 +26,46 @@ class EditUserDayRequest(BaseModel):
     hall_id: int | None = None
 
 
+MAX_BATCH_ITEMS = 500  # per list of a batch
+
+
+class BatchAddUserDayItem(BaseModel):
+    application_form_id: int
+    information: str = ""
+    attendance: Attendance = Attendance.UNKNOWN
+    position_id: int
+    hall_id: int | None = None
+
+
+class BatchEditUserDayItem(EditUserDayRequest):
+    user_day_id: int
+
+
+class DuplicateItemsError(ValueError):
+    def __init__(self, key: str) -> None:
+        super().__init__(f"Batch items must have unique {key}")
+
+
+class BatchUserDayRequest(BaseModel):
+    add: list[BatchAddUserDayItem] = Field(default=[], max_length=MAX_BATCH_ITEMS)
+    edit: list[BatchEditUserDayItem] = Field(default=[], max_length=MAX_BATCH_ITEMS)
+    delete: list[int] = Field(default=[], max_length=MAX_BATCH_ITEMS)
+
+    @model_validator(mode="after")
+    def check_unique(self) -> Self:
+        user_day_ids = [item.user_day_id for item in self.edit] + self.delete
+        if len(set(user_day_ids)) != len(user_day_ids):
+            raise DuplicateItemsError("user_day_id")
+        form_ids = [item.application_form_id for item in self.add]
+        if len(set(form_ids)) != len(form_ids):
+            raise DuplicateItemsError("application_form_id")
+        return self
+
+
+class BatchUserDayResponse(BaseSuccessResponse):
+    added_user_day_ids: list[int]
+
+
 class AssignmentItem(BaseModel):
     user_day_id: int
     application_form_id: int
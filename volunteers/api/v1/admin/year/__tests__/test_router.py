@@ -1,4 +1,5 @@
 from collections.abc import Generator
+from datetime import UTC, datetime
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock
 
@@ -141,22 +142,31 @@ async def test_get_registration_forms_with_experience(app: AppWithContainer) ->
     mock_position = Position(id=1, year_id=1, name="Volunteer", can_desire=True, has_halls=False)
 
     mock_form = ApplicationForm(
-        id=1, year_id=1, user_id=1, itmo_group="M1234", comments="Test comment"
+        id=1,
+        year_id=1,
+        user_id=1,
+        itmo_group="M1234",
+        comments="Test comment",
+        needs_invitation=False,
     )
+    mock_form.created_at = datetime(2025, 9, 1, tzinfo=UTC)
+    mock_form.updated_at = datetime(2025, 9, 2, tzinfo=UTC)
     mock_form.user = mock_user
     mock_form.desired_positions = {mock_position}
 
     # Mock the service methods
     app.test_year_service.get_all_forms_by_year_id = AsyncMock(return_value=[mock_form])
-    app.test_year_service.get_user_experience = AsyncMock(
-        return_value=[
-            {
-                "year_name": "2023",
-                "positions": ["Helper", "Coordinator"],
-                "attendance_stats": {"yes": 5, "late": 1, "no": 0, "sick": 0, "unknown": 0},
-                "assessments": ["Great work!", "Very helpful"],
-            }
-        ]
+    app.test_year_service.get_users_experience = AsyncMock(
+        return_value={
+            1: [
+                {
+                    "year_name": "2023",
+                    "positions": ["Helper", "Coordinator"],
+                    "attendance_stats": {"yes": 5, "late": 1, "no": 0, "sick": 0, "unknown": 0},
+                    "assessments": ["Great work!", "Very helpful"],
+                }
+            ]
+        }
     )
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
@@ -201,4 +211,4 @@ async def test_get_registration_forms_with_experience(app: AppWithContainer) ->
 
     # Verify service methods were called
     app.test_year_service.get_all_forms_by_year_id.assert_awaited_once_with(year_id=1)
-    app.test_year_service.get_user_experience.assert_awaited_once_with(1)
+    app.test_year_service.get_users_experience.assert_awaited_once_with(user_ids={1})
@@ -8,7 +8,13 @@ from fastapi.testclient import TestClient
 from volunteers.api.v1.admin.year.router import router
 from volunteers.core.di import Container
 from volunteers.models import ApplicationForm, User
-from volunteers.services.user import UserService
+from volunteers.schemas.user import (
+    DEFAULT_USER_PAGE_SIZE,
+    MAX_USER_PAGE_SIZE,
+    UserListQuery,
+    UserSort,
+)
+from volunteers.services.user import InvalidCursor, UserPage, UserService
 
 
 class AppWithContainer(FastAPI):
@@ -118,10 +124,13 @@ async def test_get_users_list_success(
         }
 
     # Mock the service method to return the expected data
-    app.test_user_service.get_users_with_registration_status.return_value = [
-        (sample_users[0], True, "M3234"),  # user1, registered, with group
-        (sample_users[1], False, None),  # user2, not registered, no group
-    ]
+    app.test_user_service.get_users_with_registration_status.return_value = UserPage(
+        items=[
+            (sample_users[0], True, "M3234"),  # user1, registered, with group
+            (sample_users[1], False, None),  # user2, not registered, no group
+        ],
+        next_cursor=None,
+    )
 
     client = TestClient(app)
     response = client.get("/api/v1/admin/year/1/users")
@@ -158,3 +167,63 @@ async def test_get_users_list_success(
     assert user2_data["phone"] == "+0987654321"
     assert user2_data["telegram_username"] == "petr_user"
     assert user2_data["is_registered"] is False
+    assert data["next_cursor"] is None
+    # Without a limit the first page of the default size is served
+    app.test_user_service.get_users_with_registration_status.assert_awaited_once_with(
+        1, UserListQuery(limit=DEFAULT_USER_PAGE_SIZE)
+    )
+
+
+async def test_get_users_list_page(
+    app: AppWithContainer, sample_users: list[User], override_with_admin: None
+) -> None:
+    app.test_user_service.get_users_with_registration_status.return_value = UserPage(
+        items=[(sample_users[1], False, None)], next_cursor="next"
+    )
+
+    client = TestClient(app)
+    response = client.get(
+        "/api/v1/admin/year/1/users",
+        params={
+            "search": "petr",
+            "registered": "false",
+            "sort": "name_en",
+            "descending": "true",
+            "limit": 1,
+            "cursor": "previous",
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [user["id"] for user in data["users"]] == [2]
+    assert data["next_cursor"] == "next"
+    app.test_user_service.get_users_with_registration_status.assert_awaited_once_with(
+        1,
+        UserListQuery(
+            search="petr",
+            registered=False,
+            sort=UserSort.NAME_EN,
+            descending=True,
+            limit=1,
+            cursor="previous",
+        ),
+    )
+
+
+async def test_get_users_list_invalid_cursor(
+    app: AppWithContainer, override_with_admin: None
+) -> None:
+    app.test_user_service.get_users_with_registration_status.side_effect = InvalidCursor()
+
+    client = TestClient(app)
+    response = client.get("/api/v1/admin/year/1/users", params={"cursor": "garbage"})
+
+    assert response.status_code == 400
+    assert client.get("/api/v1/admin/year/1/users", params={"limit": 0}).status_code == 422
+    assert (
+        client.get(
+            "/api/v1/admin/year/1/users", params={"limit": MAX_USER_PAGE_SIZE + 1}
+        ).status_code
+        == 422
+    )
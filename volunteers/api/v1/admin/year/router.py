@@ -1,15 +1,24 @@
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, Path, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
 from volunteers.auth.deps import with_admin
 from volunteers.core.di import Container
+from volunteers.core.etag import conditional_response
+from volunteers.core.export import ExportFormat, export_response
 from volunteers.models import User
 from volunteers.schemas.position import PositionOut
+from volunteers.schemas.user import (
+    DEFAULT_USER_PAGE_SIZE,
+    MAX_USER_PAGE_SIZE,
+    UserListQuery,
+    UserSort,
+)
 from volunteers.schemas.year import YearEditIn, YearIn
-from volunteers.services.user import UserService
+from volunteers.services.user import InvalidCursor, UserService
 from volunteers.services.year import YearService
 
 from .schemas import (
@@ -24,6 +33,27 @@ from .schemas import (
 
 router = APIRouter(tags=["year"])
 
+REGISTRATION_EXPORT_COLUMNS = (
+    "form_id",
+    "user_id",
+    "first_name_ru",
+    "last_name_ru",
+    "patronymic_ru",
+    "first_name_en",
+    "last_name_en",
+    "isu_id",
+    "phone",
+    "email",
+    "telegram_username",
+    "itmo_group",
+    "comments",
+    "needs_invitation",
+    "desired_positions",
+    "previous_years",
+    "created_at",
+    "updated_at",
+)
+
 
 @router.post(
     "/add",
@@ -68,15 +98,42 @@ async def edit_year(
 @router.get(
     "/{year_id}/users",
     response_model=UserListResponse,
-    description="Get list of all users with their registration status for a specific year",
+    description="Get list of users with their registration status for a specific year. "
+    "A page of up to limit users at a time; "
+    "pass the returned next_cursor to get the following page",
 )
 @inject
 async def get_users_list(
     year_id: Annotated[int, Path(title="The ID of the year")],
+    request: Request,
+    response: Response,
     _: Annotated[User, Depends(with_admin)],
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
-) -> UserListResponse:
-    user_data = await user_service.get_users_with_registration_status(year_id)
+    search: Annotated[str | None, Query(description="Words to find in names or username")] = None,
+    registered: bool | None = None,
+    itmo_group: str | None = None,
+    sort: UserSort = UserSort.ID,
+    descending: bool = False,
+    limit: Annotated[int, Query(ge=1, le=MAX_USER_PAGE_SIZE)] = DEFAULT_USER_PAGE_SIZE,
+    cursor: str | None = None,
+) -> UserListResponse | Response:
+    version = await user_service.get_registration_status_version(year_id)
+    if not_modified := conditional_response(request, response, version):
+        return not_modified
+
+    query = UserListQuery(
+        search=search,
+        registered=registered,
+        itmo_group=itmo_group,
+        sort=sort,
+        descending=descending,
+        limit=limit,
+        cursor=cursor,
+    )
+    try:
+        page = await user_service.get_users_with_registration_status(year_id, query)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
     user_list = [
         UserListItem(
@@ -92,10 +149,10 @@ async def get_users_list(
             telegram_username=user.telegram_username,
             is_registered=is_registered,
         )
-        for user, is_registered, itmo_group in user_data
+        for user, is_registered, itmo_group in page.items
     ]
 
-    return UserListResponse(users=user_list)
+    return UserListResponse(users=user_list, next_cursor=page.next_cursor)
 
 
 @router.get(
@@ -106,9 +163,15 @@ async def get_users_list(
 @inject
 async def get_year_positions(
     year_id: Annotated[int, Path(title="The ID of the year")],
+    request: Request,
+    response: Response,
     _: Annotated[User, Depends(with_admin)],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
-) -> list[PositionOut]:
+) -> list[PositionOut] | Response:
+    version = await year_service.get_positions_version(year_id=year_id)
+    if not_modified := conditional_response(request, response, version):
+        return not_modified
+
     positions = await year_service.get_positions_by_year_id(year_id=year_id)
     return [
         PositionOut(
@@ -134,42 +197,62 @@ async def get_registration_forms(
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
 ) -> RegistrationFormsResponse:
     forms = await year_service.get_all_forms_by_year_id(year_id=year_id)
+    # Get user experience data for all applicants at once
+    experience_by_user = await year_service.get_users_experience(
+        user_ids={form.user.id for form in forms}
+    )
 
-    form_items: list[RegistrationFormItem] = []
-    for form in forms:
-        # Get user experience data
-        experience_data = await year_service.get_user_experience(form.user.id)
-
-        form_items.append(
-            RegistrationFormItem(
-                form_id=form.id,
-                user_id=form.user.id,
-                first_name_ru=form.user.first_name_ru,
-                last_name_ru=form.user.last_name_ru,
-                patronymic_ru=form.user.patronymic_ru,
-                first_name_en=form.user.first_name_en,
-                last_name_en=form.user.last_name_en,
-                isu_id=form.user.isu_id,
-                phone=form.user.phone,
-                email=form.user.email,
-                telegram_username=form.user.telegram_username,
-                itmo_group=form.itmo_group,
-                comments=form.comments,
-                needs_invitation=form.needs_invitation,
-                desired_positions=[
-                    PositionOut(
-                        position_id=p.id,
-                        year_id=p.year_id,
-                        name=p.name,
-                        can_desire=p.can_desire,
-                        has_halls=p.has_halls,
-                    )
-                    for p in form.desired_positions
-                ],
-                experience=experience_data,
-                created_at=form.created_at.isoformat(),
-                updated_at=form.updated_at.isoformat(),
-            )
+    form_items = [
+        RegistrationFormItem(
+            form_id=form.id,
+            user_id=form.user.id,
+            first_name_ru=form.user.first_name_ru,
+            last_name_ru=form.user.last_name_ru,
+            patronymic_ru=form.user.patronymic_ru,
+            first_name_en=form.user.first_name_en,
+            last_name_en=form.user.last_name_en,
+            isu_id=form.user.isu_id,
+            phone=form.user.phone,
+            email=form.user.email,
+            telegram_username=form.user.telegram_username,
+            itmo_group=form.itmo_group,
+            comments=form.comments,
+            needs_invitation=form.needs_invitation,
+            desired_positions=[
+                PositionOut(
+                    position_id=p.id,
+                    year_id=p.year_id,
+                    name=p.name,
+                    can_desire=p.can_desire,
+                    has_halls=p.has_halls,
+                )
+                for p in form.desired_positions
+            ],
+            experience=experience_by_user.get(form.user.id, []),
+            created_at=form.created_at.isoformat(),
+            updated_at=form.updated_at.isoformat(),
         )
+        for form in forms
+    ]
 
     return RegistrationFormsResponse(forms=form_items)
+
+
+@router.get(
+    "/{year_id}/registration-forms/export",
+    response_class=StreamingResponse,
+    description="Download all registration forms for a year as a CSV or XLSX file (admin only)",
+)
+@inject
+async def export_registration_forms(
+    year_id: Annotated[int, Path(title="The ID of the year")],
+    _: Annotated[User, Depends(with_admin)],
+    year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.CSV,
+) -> StreamingResponse:
+    return export_response(
+        f"registrations-{year_id}",
+        export_format,
+        REGISTRATION_EXPORT_COLUMNS,
+        year_service.stream_registrations(year_id),
+    )
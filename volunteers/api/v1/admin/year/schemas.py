@@ -34,6 +34,7 @@ class UserListItem(BaseModel):
 
 class UserListResponse(BaseModel):
     users: list[UserListItem]
+    next_cursor: str | None = None
 
 
 class ExperienceItem(BaseModel):
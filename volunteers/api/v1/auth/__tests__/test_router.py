@@ -7,9 +7,10 @@ from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 
 from volunteers.api.v1.auth import router as auth_router
-from volunteers.auth.jwt_tokens import JWTTokenPayload
+from volunteers.auth.jwt_tokens import JWTTokenPayload, TokenClaims
 from volunteers.core.di import Container
 from volunteers.models import User
+from volunteers.services.refresh_token import RefreshTokenReused
 
 if TYPE_CHECKING:
     from dependency_injector.containers import DeclarativeContainer
@@ -102,6 +103,10 @@ def app(config: MagicMock) -> FastAPIWithContainer:
     user_service.get_user_by_telegram_id = AsyncMock(return_value=None)
     user_service.create_user = AsyncMock(return_value=None)
     container.user_service.override(user_service)
+    refresh_token_service: MagicMock = MagicMock()
+    refresh_token_service.start_session = AsyncMock(return_value=("session", "token-1"))
+    refresh_token_service.rotate = AsyncMock(return_value="token-2")
+    container.refresh_token_service.override(refresh_token_service)
     container.config.override(config)
     container.wire(modules=[auth_router])
     app: FastAPIWithContainer = FastAPIWithContainer()
@@ -117,8 +122,15 @@ def patch_jwt_and_telegram(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(auth_router, "create_access_token", AsyncMock(return_value="access"))
     monkeypatch.setattr(
         auth_router,
-        "verify_refresh_token",
-        AsyncMock(return_value=JWTTokenPayload(user_id=123, role="user")),
+        "verify_refresh_token_claims",
+        AsyncMock(
+            return_value=TokenClaims(
+                payload=JWTTokenPayload(user_id=123, role="user", session_id="session"),
+                type="refresh",
+                exp=0,
+                token_id="token-1",  # noqa: S106
+            )
+        ),
     )
 
 
@@ -204,9 +216,45 @@ async def test_refresh_success(
     assert resp.status_code == 200
     data: dict[str, Any] = resp.json()
     assert data["token"] == "access"  # noqa: S105
-    assert data["refresh_token"] == refresh_token_request["refresh_token"]
+    # The presented token is replaced by the next one of its session
+    assert data["refresh_token"] == "refresh"  # noqa: S105
     assert data["expires_in"] == config.jwt.expiration
     assert data["refresh_expires_in"] == config.jwt.refresh_expiration
+    app.container.refresh_token_service().rotate.assert_awaited_once_with("session", "token-1")
+    auth_router.create_refresh_token.assert_awaited_once()  # type: ignore[attr-defined]
+    assert auth_router.create_refresh_token.await_args.kwargs == {"token_id": "token-2"}  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_refresh_reused_token(
+    app: FastAPIWithContainer, refresh_token_request: dict[str, Any]
+) -> None:
+    app.container.refresh_token_service().rotate = AsyncMock(side_effect=RefreshTokenReused())
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/auth/refresh", json=refresh_token_request)
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_without_session(
+    monkeypatch: pytest.MonkeyPatch,
+    app: FastAPIWithContainer,
+    refresh_token_request: dict[str, Any],
+) -> None:
+    # Tokens issued before rotation have neither a session nor an id
+    monkeypatch.setattr(
+        auth_router,
+        "verify_refresh_token_claims",
+        AsyncMock(
+            return_value=TokenClaims(
+                payload=JWTTokenPayload(user_id=123, role="user"), type="refresh", exp=0
+            )
+        ),
+    )
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/auth/refresh", json=refresh_token_request)
+    assert resp.status_code == 401
+    app.container.refresh_token_service().rotate.assert_not_awaited()
 
 
 def get_with_user_dep() -> Callable[[], User]:
@@ -1,3 +1,4 @@
+import math
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
@@ -14,14 +15,13 @@ from volunteers.api.v1.auth.schemas import (
     UserResponse,
     UserUpdateRequest,
 )
-from volunteers.auth.deps import with_user
+from volunteers.auth.deps import with_token_payload, with_user
 from volunteers.auth.jwt_tokens import (
     JWTTokenPayload,
     create_access_token,
     create_refresh_token,
-    verify_refresh_token,
+    verify_refresh_token_claims,
 )
-from volunteers.auth.providers.legacy import verify_legacy_user
 from volunteers.auth.providers.telegram import (
     TelegramLoginConfig,
     TelegramLoginData,
@@ -32,12 +32,33 @@ from volunteers.core.di import Container
 from volunteers.models import User
 from volunteers.schemas.user import UserIn, UserUpdate
 from volunteers.services.i18n import I18nService
-from volunteers.services.legacy_user import LegacyUserService
+from volunteers.services.legacy_user import LegacyUserService, TooManyPasswordAttempts
+from volunteers.services.refresh_token import (
+    RefreshTokenReused,
+    RefreshTokenRevoked,
+    RefreshTokenService,
+)
 from volunteers.services.user import UserService
 
 router = APIRouter(tags=["auth"])
 
 
+async def _start_session(
+    user_id: int, refresh_token_service: RefreshTokenService, config: Config
+) -> SuccessfulLoginResponse:
+    session_id, token_id = await refresh_token_service.start_session(user_id)
+    payload = JWTTokenPayload(user_id=user_id, role="user", session_id=session_id)
+    refresh_token = await create_refresh_token(payload, token_id=token_id)
+    access_token = await create_access_token(payload)
+
+    return SuccessfulLoginResponse(
+        token=access_token,
+        refresh_token=refresh_token,
+        expires_in=config.jwt.expiration,
+        refresh_expires_in=config.jwt.refresh_expiration,
+    )
+
+
 @router.post("/telegram/register")
 @inject
 async def register(
@@ -45,6 +66,9 @@ async def register(
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
     config: Annotated[Config, Depends(Provide[Container.config])],
     i18n: Annotated[I18nService, Depends(Provide[Container.i18n_service])],
+    refresh_token_service: Annotated[
+        RefreshTokenService, Depends(Provide[Container.refresh_token_service])
+    ],
 ) -> SuccessfulLoginResponse:
     if not verify_telegram_login(
         data=TelegramLoginData(
@@ -83,16 +107,7 @@ async def register(
     user = await user_service.create_user(user_in)
     logger.info("User has been registered")
 
-    payload = JWTTokenPayload(user_id=user.id, role="user")
-    refresh_token = await create_refresh_token(payload)
-    access_token = await create_access_token(payload)
-
-    return SuccessfulLoginResponse(
-        token=access_token,
-        refresh_token=refresh_token,
-        expires_in=config.jwt.expiration,
-        refresh_expires_in=config.jwt.refresh_expiration,
-    )
+    return await _start_session(user.id, refresh_token_service, config)
 
 
 @router.post("/telegram/migrate")
@@ -104,6 +119,9 @@ async def migrate(
     ],
     config: Annotated[Config, Depends(Provide[Container.config])],
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
+    refresh_token_service: Annotated[
+        RefreshTokenService, Depends(Provide[Container.refresh_token_service])
+    ],
 ) -> SuccessfulLoginResponse:
     if not verify_telegram_login(
         data=TelegramLoginData(
@@ -127,7 +145,18 @@ async def migrate(
         logger.warning("Detected an attempt to migrate a non-existent user")
         raise HTTPException(status_code=403, detail="User is not found")
 
-    if not verify_legacy_user(password=request.password, legacy_user=legacy_user):
+    try:
+        valid_password = await legacy_user_service.verify_password(
+            legacy_user=legacy_user, password=request.password
+        )
+    except TooManyPasswordAttempts as e:
+        logger.warning("Detected too many attempts to migrate a user")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts, try again later",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        ) from e
+    if not valid_password:
         logger.warning("Detected an attempt to migrate with an incorrect password")
         raise HTTPException(status_code=403, detail="Incorrect password")
 
@@ -141,16 +170,7 @@ async def migrate(
         user_id=user.id, user_update=UserUpdate(telegram_id=request.telegram_id)
     )
 
-    payload = JWTTokenPayload(user_id=user.id, role="user")
-    refresh_token = await create_refresh_token(payload)
-    access_token = await create_access_token(payload)
-
-    return SuccessfulLoginResponse(
-        token=access_token,
-        refresh_token=refresh_token,
-        expires_in=config.jwt.expiration,
-        refresh_expires_in=config.jwt.refresh_expiration,
-    )
+    return await _start_session(user.id, refresh_token_service, config)
 
 
 @router.post("/telegram/login")
@@ -159,6 +179,9 @@ async def login(
     request: TelegramLoginRequest,
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
     config: Annotated[Config, Depends(Provide[Container.config])],
+    refresh_token_service: Annotated[
+        RefreshTokenService, Depends(Provide[Container.refresh_token_service])
+    ],
 ) -> SuccessfulLoginResponse | ErrorLoginResponse:
     if not verify_telegram_login(
         data=TelegramLoginData(
@@ -190,32 +213,64 @@ async def login(
 
     logger.info("User has been authorized")
 
-    payload = JWTTokenPayload(user_id=user.id, role="user")
-    refresh_token = await create_refresh_token(payload)
-    access_token = await create_access_token(payload)
-
-    return SuccessfulLoginResponse(
-        token=access_token,
-        refresh_token=refresh_token,
-        expires_in=config.jwt.expiration,
-        refresh_expires_in=config.jwt.refresh_expiration,
-    )
+    return await _start_session(user.id, refresh_token_service, config)
 
 
 @router.post("/refresh")
 @inject
 async def refresh(
-    request: RefreshTokenRequest, config: Annotated[Config, Depends(Provide[Container.config])]
+    request: RefreshTokenRequest,
+    config: Annotated[Config, Depends(Provide[Container.config])],
+    refresh_token_service: Annotated[
+        RefreshTokenService, Depends(Provide[Container.refresh_token_service])
+    ],
 ) -> SuccessfulLoginResponse | ErrorLoginResponse:
-    payload = await verify_refresh_token(request.refresh_token)
+    claims = await verify_refresh_token_claims(request.refresh_token)
+    if claims.payload.session_id is None or claims.token_id is None:
+        # Issued before rotation, the user has to log in again
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
+    try:
+        token_id = await refresh_token_service.rotate(claims.payload.session_id, claims.token_id)
+    except RefreshTokenReused as e:
+        logger.warning(f"Detected a reused refresh token of user {claims.payload.user_id}")
+        raise HTTPException(status_code=401, detail="Refresh token revoked") from e
+    except RefreshTokenRevoked as e:
+        raise HTTPException(status_code=401, detail="Refresh token revoked") from e
+
     return SuccessfulLoginResponse(
-        token=await create_access_token(payload),
-        refresh_token=request.refresh_token,
+        token=await create_access_token(claims.payload),
+        refresh_token=await create_refresh_token(claims.payload, token_id=token_id),
         expires_in=config.jwt.expiration,
         refresh_expires_in=config.jwt.refresh_expiration,
     )
 
 
+@router.post("/logout")
+@inject
+async def logout(
+    request: RefreshTokenRequest,
+    refresh_token_service: Annotated[
+        RefreshTokenService, Depends(Provide[Container.refresh_token_service])
+    ],
+) -> None:
+    claims = await verify_refresh_token_claims(request.refresh_token)
+    if claims.payload.session_id is not None:
+        await refresh_token_service.end_session(claims.payload.session_id)
+        logger.info(f"User {claims.payload.user_id} has logged out")
+
+
+@router.post("/revoke-all")
+@inject
+async def revoke_all(
+    payload: Annotated[JWTTokenPayload, Depends(with_token_payload)],
+    refresh_token_service: Annotated[
+        RefreshTokenService, Depends(Provide[Container.refresh_token_service])
+    ],
+) -> None:
+    count = await refresh_token_service.end_all_sessions(payload.user_id)
+    logger.info(f"Revoked {count} sessions of user {payload.user_id}")
+
+
 @router.get("/me")
 async def me(user: Annotated[User, Depends(with_user)]) -> UserResponse:
     return UserResponse(
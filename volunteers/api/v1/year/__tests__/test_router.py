@@ -1,3 +1,4 @@
+import time
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any, cast
 from unittest.mock import AsyncMock, MagicMock
@@ -7,9 +8,12 @@ from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 
 from volunteers.api.v1.year import router as year_router
+from volunteers.auth.jwt_tokens import JWTTokenPayload, TokenClaims
 from volunteers.core.di import Container
+from volunteers.core.events import EventBroker
 from volunteers.models import ApplicationForm, Day, Hall, Position, User, UserDay, Year
 from volunteers.models.attendance import Attendance
+from volunteers.services.year import day_assignments_channel
 
 if TYPE_CHECKING:
     from dependency_injector.containers import DeclarativeContainer
@@ -246,3 +250,97 @@ async def test_get_day_assignments_empty_list(
     data: dict[str, Any] = resp.json()
     assert "assignments" in data
     assert len(data["assignments"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_live_day_assignments_hide_unpublished_changes() -> None:
+    broker = EventBroker()
+    events = year_router._day_assignment_events(
+        broker,
+        day_id=1,
+        published=False,
+        is_admin=False,
+        expires_at=time.time() + 60,
+        still_granted=AsyncMock(return_value=True),
+    )
+
+    # Subscribed on the first event, which asks the client to fetch the assignments
+    assert await anext(events) == 'data: {"type":"reset","published":false}\n\n'
+    await broker.publish(
+        day_assignments_channel(1),
+        [
+            '{"type":"delete","user_day_id":1}',
+            '{"type":"reset","published":true}',
+            '{"type":"delete","user_day_id":2}',
+        ],
+    )
+    assert await anext(events) == 'data: {"type":"reset","published":true}\n\n'
+    assert await anext(events) == 'data: {"type":"delete","user_day_id":2}\n\n'
+
+    await events.aclose()
+    assert broker._subscriptions == {}
+
+
+@pytest.mark.asyncio
+async def test_live_day_assignments_end_with_access() -> None:
+    broker = EventBroker()
+    still_granted = AsyncMock(return_value=True)
+    events = year_router._day_assignment_events(
+        broker,
+        day_id=1,
+        published=True,
+        is_admin=True,
+        expires_at=time.time() + 60,
+        still_granted=still_granted,
+    )
+    await anext(events)
+    await broker.publish(day_assignments_channel(1), ['{"type":"delete","user_day_id":1}'])
+    assert await anext(events) == 'data: {"type":"delete","user_day_id":1}\n\n'
+
+    # Logged out, or no longer an admin
+    still_granted.return_value = False
+    await broker.publish(day_assignments_channel(1), ['{"type":"delete","user_day_id":2}'])
+    with pytest.raises(StopAsyncIteration):
+        await anext(events)
+    assert broker._subscriptions == {}
+
+    # Nor does a stream outlive its access token, even without events
+    expiring = year_router._day_assignment_events(
+        broker,
+        day_id=1,
+        published=True,
+        is_admin=True,
+        expires_at=time.time() + 0.1,
+        still_granted=AsyncMock(return_value=True),
+    )
+    await anext(expiring)
+    with pytest.raises(StopAsyncIteration):
+        await anext(expiring)
+
+
+@pytest.mark.asyncio
+async def test_live_day_assignments_access_checks() -> None:
+    claims = TokenClaims(
+        payload=JWTTokenPayload(user_id=7, role="admin", session_id="session"),
+        type="access",
+        exp=int(time.time()) + 60,
+    )
+    refresh_token_service = MagicMock()
+    refresh_token_service.is_revoked.return_value = False
+    user_service = MagicMock()
+    user_service.get_cached_user_by_id = AsyncMock(return_value=User(id=7, is_admin=True))
+
+    async def granted(is_admin: bool) -> bool:
+        return await year_router._access_still_granted(
+            claims, is_admin, refresh_token_service, user_service
+        )
+
+    assert await granted(is_admin=True)
+    user_service.get_cached_user_by_id.return_value = User(id=7, is_admin=False)
+    assert not await granted(is_admin=True)
+    # Volunteers see what any volunteer sees, whatever their rights
+    assert await granted(is_admin=False)
+
+    refresh_token_service.is_revoked.return_value = True
+    assert not await granted(is_admin=False)
+    refresh_token_service.is_revoked.assert_called_with("session")
@@ -1,19 +1,30 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from functools import partial
 from typing import Annotated
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends, HTTPException, Path, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Request, Response, status
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
-from volunteers.auth.deps import with_user
+from volunteers.auth.deps import with_token_claims, with_user
+from volunteers.auth.jwt_tokens import TokenClaims
+from volunteers.core.cache import TTLCache
+from volunteers.core.db import request_session_scope
 from volunteers.core.di import Container
+from volunteers.core.etag import conditional_response
+from volunteers.core.events import EventBroker
 from volunteers.models import User
 from volunteers.schemas.application_form import ApplicationFormIn
-from volunteers.schemas.day import DayOutUser
-from volunteers.schemas.day_assignment import DayAssignmentItem
+from volunteers.schemas.day_assignment import DayAssignmentEvent, DayAssignmentItem
 from volunteers.schemas.position import PositionOut
 from volunteers.schemas.year import YearOut
 from volunteers.services.i18n import I18nService
-from volunteers.services.year import YearService
+from volunteers.services.refresh_token import RefreshTokenService
+from volunteers.services.user import UserService
+from volunteers.services.year import YearService, day_assignments_channel
 
 from .schemas import (
     ApplicationFormYearSavedResponse,
@@ -25,13 +36,27 @@ from .schemas import (
 router = APIRouter(tags=["year"])
 
 DB_PREFIX = "Response from database:"
+LIVE_KEEPALIVE_INTERVAL = 15.0  # in seconds, keeps proxies from closing idle streams
+IDEMPOTENCY_KEY_CACHE_SIZE = 10_000
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60  # in seconds
+
+# By user and Idempotency-Key: the form saved with the key and the status it was answered with
+_saved_forms: TTLCache[tuple[int, str], tuple[ApplicationFormIn, int]] = TTLCache(
+    "saved_form", maxsize=IDEMPOTENCY_KEY_CACHE_SIZE, ttl=IDEMPOTENCY_KEY_TTL
+)
 
 
-@router.get("/", description="Return info about all years")
+@router.get("/", response_model=YearsResponse, description="Return info about all years")
 @inject
 async def get_years(
+    request: Request,
+    response: Response,
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
-) -> YearsResponse:
+) -> YearsResponse | Response:
+    version = await year_service.get_years_version()
+    if not_modified := conditional_response(request, response, version):
+        return not_modified
+
     years = await year_service.get_years()
     logger.debug(f"{DB_PREFIX} Got years info")
     return YearsResponse(
@@ -44,37 +69,35 @@ async def get_years(
     )
 
 
-@router.get("/{year_id}", description="Return year positions, days and saved user form data")
+@router.get(
+    "/{year_id}",
+    response_model=ApplicationFormYearSavedResponse,
+    description="Return year positions, days and saved user form data",
+)
 @inject
 async def get_form_year(
     year_id: Annotated[int, Path(title="The ID of the year")],
+    request: Request,
+    response: Response,
     user: Annotated[User, Depends(with_user)],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
-) -> ApplicationFormYearSavedResponse:
-    year = await year_service.get_year_by_year_id(year_id=year_id)
+) -> ApplicationFormYearSavedResponse | Response:
+    year = await year_service.get_year_snapshot(year_id=year_id)
 
     if not year:
         raise HTTPException(status_code=404, detail="Year not found")
 
+    form_version = await year_service.get_form_version(year_id=year_id, user_id=user.id)
+    if not_modified := conditional_response(request, response, user.id, year.version, form_version):
+        return not_modified
+
     form = await year_service.get_form_by_year_id_and_user_id(year_id=year_id, user_id=user.id)
-    positions = await year_service.get_positions_by_year_id(year_id=year_id)
-    days = await year_service.get_days_by_year_id(year_id=year_id)
 
-    logger.debug(f"{DB_PREFIX} Got user form and year positions")
+    logger.debug(f"{DB_PREFIX} Got user form")
     return ApplicationFormYearSavedResponse(
         open_for_registration=year.open_for_registration,
-        positions=[
-            PositionOut(
-                position_id=p.id,
-                year_id=p.year_id,
-                name=p.name,
-                can_desire=p.can_desire,
-                has_halls=p.has_halls,
-            )
-            for p in positions
-            if p.can_desire
-        ],
-        days=[DayOutUser(day_id=d.id, name=d.name) for d in days],
+        positions=list(year.positions),
+        days=list(year.days),
         desired_positions=[
             PositionOut(
                 position_id=p.id,
@@ -111,7 +134,28 @@ async def save_form_year(
     user: Annotated[User, Depends(with_user)],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
     i18n: Annotated[I18nService, Depends(Provide[Container.i18n_service])],
+    idempotency_key: Annotated[str | None, Header(max_length=255)] = None,
 ) -> None:
+    form_in = ApplicationFormIn(
+        year_id=year_id,
+        user_id=user.id,
+        desired_positions_ids=request.desired_positions_ids,
+        itmo_group=request.itmo_group,
+        comments=request.comments,
+        needs_invitation=request.needs_invitation,
+    )
+    # A retry gets the answer of the save it repeats. Keys are remembered per worker, which
+    # is enough as saving the same form twice changes nothing.
+    if idempotency_key is not None and (saved := _saved_forms.get((user.id, idempotency_key))):
+        saved_form, status_code = saved
+        if saved_form != form_in:
+            raise HTTPException(
+                status_code=422, detail="Idempotency-Key was already used for another form"
+            )
+        response.status_code = status_code
+        return
+
+    # Not the cached snapshot: once registration is closed, no worker may accept a form
     year = await year_service.get_year_by_year_id(year_id=year_id)
 
     if not year:
@@ -122,24 +166,14 @@ async def save_form_year(
             status_code=403, detail=i18n.translate("Year is not open for registration")
         )
 
-    form = await year_service.get_form_by_year_id_and_user_id(year_id=year_id, user_id=user.id)
-    logger.debug(f"{DB_PREFIX} Got user form for sign up")
-    form_in = ApplicationFormIn(
-        year_id=year_id,
-        user_id=user.id,
-        desired_positions_ids=request.desired_positions_ids,
-        itmo_group=request.itmo_group,
-        comments=request.comments,
-        needs_invitation=request.needs_invitation,
-    )
-    if not form:
-        await year_service.create_form(form_in)
+    if await year_service.save_form(form_in):
         logger.debug(f"{DB_PREFIX} Created user form")
         response.status_code = status.HTTP_201_CREATED
     else:
-        await year_service.update_form(form_in)
         logger.debug(f"{DB_PREFIX} Updated user form")
         response.status_code = status.HTTP_204_NO_CONTENT
+    if idempotency_key is not None:
+        _saved_forms.set((user.id, idempotency_key), (form_in, response.status_code))
 
 
 @router.get(
@@ -151,9 +185,11 @@ async def save_form_year(
 async def get_day_assignments(
     year_id: Annotated[int, Path(title="The ID of the year")],
     day_id: Annotated[int, Path(title="The ID of the day")],
+    request: Request,
+    response: Response,
     user: Annotated[User, Depends(with_user)],
     year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
-) -> DayAssignmentsResponse:
+) -> DayAssignmentsResponse | Response:
     # Verify the day belongs to the year
     year = await year_service.get_year_by_year_id(year_id=year_id)
     if not year:
@@ -168,10 +204,17 @@ async def get_day_assignments(
         logger.debug(f"{DB_PREFIX} Assignments not published for day {day_id}")
         return DayAssignmentsResponse(assignments=[], is_published=False)
 
+    version = await year_service.get_day_assignments_version(day_id=day_id)
+    if not_modified := conditional_response(
+        request, response, day_id, day.assignment_published, version
+    ):
+        return not_modified
+
     assignments = await year_service.get_all_assignments_by_day_id(day_id=day_id)
 
     assignment_items = [
         DayAssignmentItem(
+            user_day_id=assignment.id,
             name=f"{assignment.application_form.user.first_name_en} {assignment.application_form.user.last_name_en}",
             telegram=assignment.application_form.user.telegram_username,
             position=assignment.position.name,
@@ -185,3 +228,111 @@ async def get_day_assignments(
     return DayAssignmentsResponse(
         assignments=assignment_items, is_published=day.assignment_published
     )
+
+
+def _server_sent_event(event: DayAssignmentEvent) -> str:
+    return f"data: {event.model_dump_json(exclude_none=True)}\n\n"
+
+
+async def _access_still_granted(
+    claims: TokenClaims,
+    is_admin: bool,
+    refresh_token_service: RefreshTokenService,
+    user_service: UserService,
+) -> bool:
+    """Whether the session of a stream is still live, and its admin, if any, still one."""
+    session_id = claims.payload.session_id
+    if session_id is not None and refresh_token_service.is_revoked(session_id):
+        return False
+    if not is_admin:
+        return True
+    # The request's session was released when the stream started, so use one of its own
+    async with request_session_scope(origin=lambda: "live day assignments"):
+        user = await user_service.get_cached_user_by_id(claims.payload.user_id)
+    return user is not None and user.is_admin
+
+
+async def _day_assignment_events(
+    broker: EventBroker,
+    day_id: int,
+    published: bool,
+    is_admin: bool,
+    expires_at: float,
+    still_granted: Callable[[], Awaitable[bool]],
+) -> AsyncIterator[str]:
+    """Changes of the day's assignments, until ``expires_at`` (a UNIX timestamp) or until
+    ``still_granted``, asked on every event and keep-alive, says that access is over."""
+    with broker.subscribe(day_assignments_channel(day_id)) as subscription:
+        # Subscribed before the client fetches the list, so no change falls in between
+        yield _server_sent_event(DayAssignmentEvent(type="reset", published=published))
+        while (left := expires_at - time.time()) > 0:
+            idle = False
+            try:
+                data = await asyncio.wait_for(
+                    subscription.get(), min(LIVE_KEEPALIVE_INTERVAL, left)
+                )
+            except TimeoutError:
+                data, idle = None, True
+            if time.time() >= expires_at or not await still_granted():
+                # The client reconnects with a fresh token, or not at all
+                return
+
+            if idle:
+                yield ": keep-alive\n\n"
+                continue
+            if data is None:
+                # Some changes were dropped, start over
+                yield _server_sent_event(DayAssignmentEvent(type="reset", published=published))
+                continue
+            if not is_admin:
+                event = DayAssignmentEvent.model_validate_json(data)
+                if event.type == "reset" and event.published is not None:
+                    published = event.published
+                elif not published:
+                    continue
+            yield f"data: {data}\n\n"
+
+
+@router.get(
+    "/{year_id}/days/{day_id}/assignments/live",
+    response_class=StreamingResponse,
+    description="Stream changes to the assignments of a day as server-sent events. "
+    'Every "reset" event asks to fetch the assignments again; "upsert" and "delete" events '
+    "change a single assignment of the fetched list",
+)
+@inject
+async def stream_day_assignments(
+    year_id: Annotated[int, Path(title="The ID of the year")],
+    day_id: Annotated[int, Path(title="The ID of the day")],
+    claims: Annotated[TokenClaims, Depends(with_token_claims)],
+    user: Annotated[User, Depends(with_user)],
+    year_service: Annotated[YearService, Depends(Provide[Container.year_service])],
+    user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
+    refresh_token_service: Annotated[
+        RefreshTokenService, Depends(Provide[Container.refresh_token_service])
+    ],
+    broker: Annotated[EventBroker, Depends(Provide[Container.event_broker])],
+) -> StreamingResponse:
+    year = await year_service.get_year_by_year_id(year_id=year_id)
+    if not year:
+        raise HTTPException(status_code=404, detail="Year not found")
+
+    day = await year_service.get_day_by_id(day_id=day_id)
+    if not day or day.year_id != year_id:
+        raise HTTPException(status_code=404, detail="Day not found")
+
+    # The request's database connection is released before the stream starts
+    return StreamingResponse(
+        _day_assignment_events(
+            broker,
+            day_id,
+            day.assignment_published,
+            user.is_admin,
+            expires_at=claims.exp,
+            still_granted=partial(
+                _access_still_granted, claims, user.is_admin, refresh_token_service, user_service
+            ),
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,14 +1,30 @@
+import asyncio
+import os
+import signal
 import sys
+import threading
+import time
 from collections.abc import AsyncGenerator, Awaitable, Callable
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import FileResponse
 from loguru import logger
-from prometheus_client import Counter, make_asgi_app
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    make_asgi_app,
+    multiprocess,
+)
+from starlette.routing import Mount
 
 from volunteers.api.router import router as api_router
-from volunteers.core.di import Container
+from volunteers.auth.ratelimit import RateLimitMiddleware, RateLimitRule
+from volunteers.core.db import get_request_session, request_session_scope
+from volunteers.core.di import Container, reload_config
 
 logger.remove()
 logger.add(sys.stdout, level="DEBUG")
@@ -17,6 +33,15 @@ container = Container()
 container.wire()
 
 
+def on_sighup() -> None:
+    try:
+        reload_config(container)
+    except Exception:
+        logger.exception("Failed to reload config, keeping the current one")
+        return
+    logger.info("Config reloaded")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     # Startup
@@ -26,7 +51,41 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     # parse config
     c = container.config()
     logger.debug(f"Config: {c}")
+    # Signal handlers can only be set from the main thread, which isn't the case under TestClient
+    loop = asyncio.get_running_loop()
+    reload_on_sighup = (
+        hasattr(signal, "SIGHUP") and threading.current_thread() is threading.main_thread()
+    )
+    if reload_on_sighup:
+        loop.add_signal_handler(signal.SIGHUP, on_sighup)
+    # Telegram notifications are sent in the background, off the request path
+    # The bot is created asynchronously, so the provider returns an awaitable
+    notifier = await container.notifier()  # type: ignore[misc]
+    outbox = container.notification_outbox()
+    outbox.start(notifier)
+    broker = container.event_broker()
+    await broker.start()
+    # Revoked sessions are shared between workers through the broker
+    refresh_token_service = container.refresh_token_service()
+    refresh_token_service.start()
+    # So are invalidated year snapshots and cached users
+    year_service = container.year_service()
+    year_service.start()
+    user_service = container.user_service()
+    user_service.start()
     yield
+    await user_service.stop()
+    await year_service.stop()
+    await refresh_token_service.stop()
+    await broker.stop()
+    await outbox.stop(notifier)
+    # Close pooled connections while the event loop they belong to still runs
+    primary, replica = container.db(), container.replica_db()
+    await primary.dispose()
+    if replica is not primary:
+        await replica.dispose()
+    if reload_on_sighup:
+        loop.remove_signal_handler(signal.SIGHUP)
     # Shutdown
     shutdown_resources = container.shutdown_resources()
     if shutdown_resources:
@@ -37,12 +96,56 @@ app = FastAPI(lifespan=lifespan, openapi_url="/api/v1/openapi.json", docs_url="/
 
 app.include_router(api_router)
 
-metrics_app = make_asgi_app()
+
+def metrics_registry() -> CollectorRegistry:
+    """The registry ``/metrics`` serves: under gunicorn, the metrics of all workers added up."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return registry
+
+
+metrics_app = make_asgi_app(metrics_registry())
 app.mount("/metrics", metrics_app)
 
+# "endpoint" is the route template, not the raw path, to keep the number of series bounded
 HTTP_REQUESTS_TOTAL = Counter(
     "http_requests_total", "Total HTTP requests", ["method", "endpoint", "status_code"]
 )
+HTTP_REQUEST_DURATION_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "endpoint"]
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in database queries per HTTP request",
+    ["method", "endpoint"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ["method", "endpoint"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+
+def route_template(request: Request) -> str:
+    """Path template of the route that handled the request, e.g. ``/api/v1/year/{year_id}``."""
+    if (route := request.scope.get("route")) is not None:
+        return str(route.path)
+    # Mounted apps only leave their app in the scope
+    endpoint = request.scope.get("endpoint")
+    for mount in app.routes:
+        if isinstance(mount, Mount) and mount.app is endpoint:
+            return mount.path
+    return "unmatched"
 
 
 @app.get("/hc")
@@ -51,17 +154,60 @@ def health_check() -> str:
     return "OK"
 
 
+# Added first, so it runs inside the other middleware and refused requests are still measured
+app.add_middleware(
+    RateLimitMiddleware,
+    rules=[
+        RateLimitRule("POST", "/api/v1/auth/telegram/login", "auth"),
+        RateLimitRule("POST", "/api/v1/auth/telegram/register", "auth"),
+        RateLimitRule("POST", "/api/v1/auth/telegram/migrate", "auth"),
+        RateLimitRule("POST", "/api/v1/year/{year_id}", "form"),
+    ],
+    store=container.rate_limit_store,
+    config=container.config,
+)
+
+
 @app.middleware("http")
 async def track_requests(
     request: Request, call_next: Callable[[Request], Awaitable[Response]]
 ) -> Response:
-    response = await call_next(request)
-    HTTP_REQUESTS_TOTAL.labels(
-        method=request.method, endpoint=request.url.path, status_code=response.status_code
-    ).inc()
+    in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=request.method)
+    in_progress.inc()
+    started_at = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        duration = time.perf_counter() - started_at
+        in_progress.dec()
+        endpoint = route_template(request)
+        HTTP_REQUESTS_TOTAL.labels(
+            method=request.method, endpoint=endpoint, status_code=status_code
+        ).inc()
+        HTTP_REQUEST_DURATION_SECONDS.labels(method=request.method, endpoint=endpoint).observe(
+            duration
+        )
+        if (request_session := get_request_session()) is not None:
+            HTTP_REQUEST_DB_SECONDS.labels(method=request.method, endpoint=endpoint).observe(
+                request_session.db_time
+            )
+            HTTP_REQUEST_DB_QUERIES.labels(method=request.method, endpoint=endpoint).observe(
+                request_session.queries
+            )
     return response
 
 
+@app.middleware("http")
+async def db_session_scope(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    # All services share one session (and at most one pooled connection) per request
+    async with request_session_scope(origin=lambda: f"{request.method} {route_template(request)}"):
+        return await call_next(request)
+
+
 # Proxy everything else to the frontend
 @app.get("/{path:path}")
 async def proxy(path: str) -> FileResponse:
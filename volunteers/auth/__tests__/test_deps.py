@@ -0,0 +1,61 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.auth.deps import with_admin, with_user
+from volunteers.auth.jwt_tokens import JWTTokenPayload
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.core.events import PostgresEventBroker
+from volunteers.models import User
+from volunteers.schemas.user import UserUpdate
+from volunteers.services.__tests__.test_refresh_token import wait_until
+from volunteers.services.__tests__.test_year_snapshot import wait_listening
+from volunteers.services.user import UserService
+
+
+@pytest.mark.asyncio
+async def test_demoted_admin_is_refused_by_every_worker(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    async with pg_engine.begin() as conn:
+        user_id = await conn.scalar(
+            insert(User)
+            .values(
+                first_name_ru="Имя",
+                last_name_ru="Фамилия",
+                first_name_en="Name",
+                last_name_en="Surname",
+                is_admin=True,
+            )
+            .returning(User.id)
+        )
+    assert user_id is not None
+    payload = JWTTokenPayload(user_id=user_id, role="admin")
+    brokers = [PostgresEventBroker(pg_engine) for _ in range(2)]
+    workers = [UserService(broker) for broker in brokers]
+    for broker, worker in zip(brokers, workers, strict=True):
+        await broker.start()
+        worker.start()
+    try:
+        await wait_listening(brokers[0], brokers[1])
+        user = await with_user(payload, user_service=workers[1])
+        assert (await with_admin(user)).is_admin
+        # Admin requests are authenticated from the cache too
+        with count_queries(pg_engine) as queries:
+            user = await with_user(payload, user_service=workers[1])
+            assert (await with_admin(user)).is_admin
+        assert queries.count == 0
+
+        await workers[0].update_user(user_id, UserUpdate(is_admin=False))
+        await wait_until(lambda: len(workers[1]._user_cache) == 0)
+
+        user = await with_user(payload, user_service=workers[1])
+        with pytest.raises(HTTPException) as exc_info:
+            await with_admin(user)
+        assert exc_info.value.status_code == 403
+    finally:
+        for broker, worker in zip(brokers, workers, strict=True):
+            await worker.stop()
+            await broker.stop()
@@ -1,6 +1,9 @@
 import datetime
+import hashlib
 import os
+import time
 from typing import Any
+from unittest.mock import patch
 
 import pytest
 from dotenv import load_dotenv
@@ -144,3 +147,34 @@ async def test_verify_refresh_token_wrong_type(
         await jwt_tokens.verify_refresh_token(token, config=dummy_config)
     assert exc.value.status_code == 401
     assert exc.value.detail == "Invalid token type"
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_are_cached_until_expiry(
+    dummy_config: Config, token_payload: JWTTokenPayload
+) -> None:
+    token = await jwt_tokens.create_access_token(token_payload, config=dummy_config)
+
+    first = await jwt_tokens.verify_access_token(token, config=dummy_config)
+    with patch.object(jwt_tokens, "_decode", side_effect=AssertionError("decoded again")):
+        assert await jwt_tokens.verify_access_token(token, config=dummy_config) is first
+
+    digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    expires_at, _ = jwt_tokens._verified_tokens._entries[digest]
+    assert expires_at <= time.monotonic() + min(
+        jwt_tokens.VERIFIED_TOKEN_TTL, dummy_config.jwt.expiration
+    )
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_are_checked_again_with_new_secret(
+    dummy_config: Config, token_payload: JWTTokenPayload
+) -> None:
+    token = await jwt_tokens.create_access_token(token_payload, config=dummy_config)
+    await jwt_tokens.verify_access_token(token, config=dummy_config)
+
+    rotated = DummyConfig()
+    rotated.jwt.secret = dummy_config.jwt.secret[::-1]
+    with pytest.raises(HTTPException) as exc:
+        await jwt_tokens.verify_access_token(token, config=rotated)
+    assert exc.value.detail == "Invalid token"
@@ -0,0 +1,63 @@
+import asyncio
+import time
+from collections.abc import Iterator
+
+import dependency_injector.providers as providers
+import pytest
+from loguru import logger
+
+from volunteers.auth.jwt_tokens import JWTTokenPayload, create_access_token, verify_access_token
+from volunteers.core.config import Config
+from volunteers.core.di import Container
+
+ITERATIONS = 2000
+
+
+@pytest.fixture(autouse=True)
+def quiet_logger() -> Iterator[None]:
+    logger.disable("volunteers")
+    yield
+    logger.enable("volunteers")
+
+
+async def verify_throughput(token: str) -> float:
+    """Return verified tokens per second."""
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await verify_access_token(token)
+    return ITERATIONS / (time.perf_counter() - start)
+
+
+@pytest.mark.slow
+def test_verify_access_token_throughput(container: Container) -> None:
+    token = asyncio.run(create_access_token(JWTTokenPayload(user_id=1, role="admin")))
+
+    # Settings parsed on every injection, as before config became a singleton
+    with container.config.override(providers.Factory(Config)):
+        per_call = asyncio.run(verify_throughput(token))
+    snapshot = asyncio.run(verify_throughput(token))
+
+    assert snapshot > per_call, (
+        f"verify_access_token: {per_call:.0f}/s parsing config per call, {snapshot:.0f}/s cached"
+    )
+
+
+@pytest.mark.slow
+def test_verified_token_cache_throughput(container: Container) -> None:
+    async def throughputs() -> tuple[float, float]:
+        # Distinct users give distinct tokens, none of them verified before
+        tokens = [
+            await create_access_token(JWTTokenPayload(user_id=user_id, role="user"))
+            for user_id in range(ITERATIONS)
+        ]
+        start = time.perf_counter()
+        for token in tokens:
+            await verify_access_token(token)
+        uncached = ITERATIONS / (time.perf_counter() - start)
+        return uncached, await verify_throughput(tokens[0])
+
+    uncached, cached = asyncio.run(throughputs())
+
+    assert cached > uncached, (
+        f"verify_access_token: {uncached:.0f}/s on first sight, {cached:.0f}/s once verified"
+    )
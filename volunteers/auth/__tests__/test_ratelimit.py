@@ -0,0 +1,170 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from loguru import logger
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from volunteers.auth.jwt_tokens import JWTTokenPayload, create_access_token
+from volunteers.auth.ratelimit import RateLimitMiddleware, RateLimitRule
+from volunteers.core.config import Config, RateLimitBudget, RateLimitConfig
+from volunteers.core.di import Container
+from volunteers.core.ratelimit import RateLimitStore
+
+RULES = [
+    RateLimitRule("POST", "/login", "auth"),
+    RateLimitRule("POST", "/year/{year_id}", "form"),
+]
+
+
+def make_app(config: Config, store: RateLimitStore) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login() -> str:
+        return "OK"
+
+    @app.post("/year/{year_id}")
+    async def submit(year_id: int) -> int:
+        return year_id
+
+    @app.get("/year/{year_id}")
+    async def get_year(year_id: int) -> int:
+        return year_id
+
+    app.add_middleware(RateLimitMiddleware, rules=RULES, store=lambda: store, config=lambda: config)
+    return app
+
+
+@pytest.fixture
+def config() -> Config:
+    return Config().model_copy(
+        update={
+            "rate_limit": RateLimitConfig(
+                auth=RateLimitBudget(burst=2, per_minute=1),
+                form=RateLimitBudget(burst=1, per_minute=1),
+            )
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_limits_clients_by_address(config: Config) -> None:
+    app = make_app(config, RateLimitStore())
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        responses = [await client.post("/login") for _ in range(3)]
+        # Routes without rules are never limited
+        others = [await client.get("/year/1") for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert int(responses[-1].headers["Retry-After"]) == 60
+    assert all(response.status_code == 200 for response in others)
+
+
+@pytest.mark.asyncio
+async def test_limits_users_by_token(config: Config, container: Container) -> None:
+    app = make_app(config, RateLimitStore())
+    tokens = [
+        await create_access_token(JWTTokenPayload(user_id=user_id, role="user"))
+        for user_id in (1, 2)
+    ]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        statuses = [
+            (await client.post("/year/3", headers={"Authorization": f"Bearer {token}"})).status_code
+            for token in (tokens[0], tokens[1], tokens[0])
+        ]
+        # An invalid token counts against the client's address
+        invalid = [
+            (await client.post("/year/3", headers={"Authorization": "Bearer x"})).status_code
+            for _ in range(2)
+        ]
+
+    assert statuses == [200, 200, 429]
+    assert invalid == [200, 429]
+
+
+@pytest.mark.asyncio
+async def test_spoofed_forwarded_for_keeps_the_budget(config: Config) -> None:
+    # As behind the prod proxy, whose address alone is trusted with X-Forwarded-For
+    app = ProxyHeadersMiddleware(make_app(config, RateLimitStore()), trusted_hosts="10.0.0.2")
+
+    async def statuses(client_address: str, forwarded_for: list[str]) -> list[int]:
+        transport = ASGITransport(app=app, client=(client_address, 1234))
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            return [
+                (await client.post("/login", headers={"X-Forwarded-For": spoofed})).status_code
+                for spoofed in forwarded_for
+            ]
+
+    # Straight from the client, the header is ignored
+    direct = await statuses("203.0.113.7", ["198.51.100.1", "198.51.100.2", "198.51.100.3"])
+    # Through the proxy, only the address the proxy appended counts
+    proxied = await statuses("10.0.0.2", [f"198.51.100.{i}, 203.0.113.8" for i in range(1, 4)])
+
+    assert direct == [200, 200, 429]
+    assert proxied == [200, 200, 429]
+
+
+@pytest.mark.asyncio
+async def test_disabled(config: Config) -> None:
+    config = config.model_copy(update={"rate_limit": RateLimitConfig(enabled=False)})
+    store = MagicMock(spec=RateLimitStore)
+    app = make_app(config, store)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.post("/login")).status_code == 200
+    store.take.assert_not_called()
+
+
+@pytest.mark.slow
+def test_middleware_overhead(config: Config) -> None:
+    """Time spent in the middleware per request, for unlimited and limited routes."""
+    iterations = 20_000
+    config = config.model_copy(
+        update={"rate_limit": RateLimitConfig(auth=RateLimitBudget(burst=10**9, per_minute=1))}
+    )
+
+    async def endpoint(scope: object, receive: object, send: object) -> None:
+        pass
+
+    middleware = RateLimitMiddleware(
+        endpoint,  # type: ignore[arg-type]
+        rules=RULES,
+        store=lambda: store,
+        config=lambda: config,
+    )
+    store = RateLimitStore()
+
+    def scope(method: str, path: str) -> dict[str, object]:
+        return {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+        }
+
+    async def per_request(target: object, request_scope: dict[str, object]) -> float:
+        started_at = time.perf_counter()
+        for _ in range(iterations):
+            await target(request_scope, None, None)  # type: ignore[operator]
+        return (time.perf_counter() - started_at) / iterations
+
+    async def measure() -> tuple[float, float, float]:
+        bare = await per_request(endpoint, scope("GET", "/year/1"))
+        unlimited = await per_request(middleware, scope("GET", "/year/1"))
+        limited = await per_request(middleware, scope("POST", "/login"))
+        return bare, unlimited - bare, limited - bare
+
+    logger.disable("volunteers")
+    bare, unlimited, limited = asyncio.run(measure())
+    logger.enable("volunteers")
+    overhead = (
+        f"Rate limit middleware: {unlimited * 1e6:.2f}us per unlimited request, "
+        f"{limited * 1e6:.2f}us per limited one with the in-process store"
+    )
+    assert unlimited < 5e-6, overhead
+    assert limited < 50e-6, overhead
@@ -5,21 +5,41 @@ from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from loguru import logger
 
-from volunteers.auth.jwt_tokens import verify_access_token
+from volunteers.auth.jwt_tokens import JWTTokenPayload, TokenClaims, verify_access_token_claims
 from volunteers.core.di import Container
 from volunteers.models import User
+from volunteers.services.refresh_token import RefreshTokenService
 from volunteers.services.user import UserService
 
 JWTBearer = HTTPBearer()
 
 
 @inject
-async def with_user(
+async def with_token_claims(
     token: Annotated[HTTPAuthorizationCredentials, Depends(JWTBearer)],
+    refresh_token_service: Annotated[
+        RefreshTokenService, Depends(Provide[Container.refresh_token_service])
+    ],
+) -> TokenClaims:
+    claims = await verify_access_token_claims(token.credentials)
+    session_id = claims.payload.session_id
+    if session_id is not None and refresh_token_service.is_revoked(session_id):
+        raise HTTPException(status_code=401, detail="Session revoked")
+    return claims
+
+
+async def with_token_payload(
+    claims: Annotated[TokenClaims, Depends(with_token_claims)],
+) -> JWTTokenPayload:
+    return claims.payload
+
+
+@inject
+async def with_user(
+    payload: Annotated[JWTTokenPayload, Depends(with_token_payload)],
     user_service: Annotated[UserService, Depends(Provide[Container.user_service])],
 ) -> User:
-    payload = await verify_access_token(token.credentials)
-    user = await user_service.get_user_by_id(payload.user_id)
+    user = await user_service.get_cached_user_by_id(payload.user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     logger.info(f"User {user.id} has been authenticated, is_admin: {user.is_admin}")
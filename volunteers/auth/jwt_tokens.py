@@ -1,65 +1,114 @@
 import datetime
+import hashlib
+import time
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 import jwt
 from dependency_injector.wiring import Provide, inject
 from fastapi import HTTPException
 from loguru import logger
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
-from volunteers.core.config import Config
+from volunteers.core.cache import TTLCache
+from volunteers.core.config import Config, JWTConfig
 from volunteers.core.di import Container
 
+VERIFIED_TOKEN_CACHE_SIZE = 10_000
+VERIFIED_TOKEN_TTL = 300  # in seconds, and never past the token's expiry
+
 
 class JWTTokenPayload(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     user_id: int
     role: str
+    # The login session the token belongs to, see RefreshTokenService; absent in older tokens
+    session_id: str | None = None
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    key: Any  # as prepared by the algorithm, so it isn't parsed again for every token
+    algorithm: str
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """Claims of a token whose signature and expiry were checked."""
+
+    payload: JWTTokenPayload
+    type: str
+    exp: int  # as a UNIX timestamp
+    token_id: str | None = None  # only in refresh tokens
+
+
+# By token digest, with the key that verified the token
+_verified_tokens: TTLCache[bytes, tuple[SigningKey, TokenClaims]] = TTLCache(
+    "verified_token", maxsize=VERIFIED_TOKEN_CACHE_SIZE, ttl=VERIFIED_TOKEN_TTL
+)
+
+
+@lru_cache(maxsize=1)
+def signing_key(jwt_config: JWTConfig) -> SigningKey:
+    """Key for the current JWT settings, made again only when they are reloaded."""
+    algorithm = jwt.get_algorithm_by_name(jwt_config.algorithm)
+    return SigningKey(key=algorithm.prepare_key(jwt_config.secret), algorithm=jwt_config.algorithm)
 
 
 @inject
 def create_token(payload: dict[str, Any], config: Config = Provide[Container.config]) -> str:
-    return jwt.encode(payload, config.jwt.secret, algorithm=config.jwt.algorithm)
+    key = signing_key(config.jwt)
+    return jwt.encode(payload, key.key, algorithm=key.algorithm)
 
 
-@inject
-async def create_refresh_token(
-    payload: JWTTokenPayload, config: Config = Provide[Container.config]
+def _issue_token(
+    payload: JWTTokenPayload, token_type: str, lifetime: int, config: Config, **claims: Any
 ) -> str:
-    logger.debug("Refresh token created")
+    now = datetime.datetime.now(tz=datetime.UTC)
     return create_token(
         {
-            **payload.model_dump(),
-            "exp": datetime.datetime.now(tz=datetime.UTC)
-            + datetime.timedelta(seconds=config.jwt.refresh_expiration),
-            "iat": datetime.datetime.now(tz=datetime.UTC),
-            "type": "refresh",
-        }
+            **payload.model_dump(exclude_none=True),
+            "exp": now + datetime.timedelta(seconds=lifetime),
+            "iat": now,
+            "type": token_type,
+            **claims,
+        },
+        config=config,
     )
 
 
+@inject
+async def create_refresh_token(
+    payload: JWTTokenPayload,
+    token_id: str | None = None,
+    config: Config = Provide[Container.config],
+) -> str:
+    logger.debug("Refresh token created")
+    claims = {} if token_id is None else {"jti": token_id}
+    return _issue_token(payload, "refresh", config.jwt.refresh_expiration, config, **claims)
+
+
 @inject
 async def create_access_token(
     payload: JWTTokenPayload, config: Config = Provide[Container.config]
 ) -> str:
     logger.debug("Access token created")
-    return create_token(
-        {
-            **payload.model_dump(),
-            "exp": datetime.datetime.now(tz=datetime.UTC)
-            + datetime.timedelta(seconds=config.jwt.expiration),
-            "iat": datetime.datetime.now(tz=datetime.UTC),
-            "type": "access",
-        }
-    )
+    return _issue_token(payload, "access", config.jwt.expiration, config)
 
 
 @inject
 def decode_token(token: str, config: Config = Provide[Container.config]) -> dict[str, Any]:
+    return _decode(token, signing_key(config.jwt))
+
+
+def _decode(token: str, key: SigningKey) -> dict[str, Any]:
     try:
         token_data: dict[str, Any] = jwt.decode(
             token,
-            key=config.jwt.secret,
-            algorithms=[config.jwt.algorithm],
+            key=key.key,
+            algorithms=[key.algorithm],
             options={"verify_signature": True},
         )
     except jwt.ExpiredSignatureError as e:
@@ -72,21 +121,67 @@ def decode_token(token: str, config: Config = Provide[Container.config]) -> dict
     return token_data
 
 
+def verify_token_claims(token: str, config: Config) -> TokenClaims:
+    """Decode and check ``token``, or reuse the result of an earlier check of the same token.
+
+    Results are kept until the token expires or the JWT settings change, at most
+    ``VERIFIED_TOKEN_TTL`` seconds. Invalid tokens are not remembered.
+    """
+    key = signing_key(config.jwt)
+    digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    if (verified := _verified_tokens.get(digest)) is not None and verified[0] is key:
+        return verified[1]
+
+    token_data = _decode(token, key)
+    # Signed by us, so the claims have the types we put in; no need to validate them again
+    claims = TokenClaims(
+        payload=JWTTokenPayload.model_construct(
+            user_id=token_data["user_id"],
+            role=token_data["role"],
+            session_id=token_data.get("session_id"),
+        ),
+        type=token_data["type"],
+        exp=token_data["exp"],
+        token_id=token_data.get("jti"),
+    )
+    _verified_tokens.set(
+        digest, (key, claims), ttl=min(VERIFIED_TOKEN_TTL, claims.exp - time.time())
+    )
+    return claims
+
+
+def _verify_token_type(token: str, token_type: str, config: Config) -> TokenClaims:
+    claims = verify_token_claims(token, config)
+    if claims.type != token_type:
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    return claims
+
+
 @inject
 async def verify_access_token(
     token: str, config: Config = Provide[Container.config]
 ) -> JWTTokenPayload:
-    payload = decode_token(token)
-    if payload["type"] != "access":
-        raise HTTPException(status_code=401, detail="Invalid token type")
-    return JWTTokenPayload(**payload)
+    return _verify_token_type(token, "access", config).payload
+
+
+@inject
+async def verify_access_token_claims(
+    token: str, config: Config = Provide[Container.config]
+) -> TokenClaims:
+    """Like ``verify_access_token``, with the token's expiry for long-lived responses."""
+    return _verify_token_type(token, "access", config)
 
 
 @inject
 async def verify_refresh_token(
     token: str, config: Config = Provide[Container.config]
 ) -> JWTTokenPayload:
-    payload = decode_token(token)
-    if payload["type"] != "refresh":
-        raise HTTPException(status_code=401, detail="Invalid token type")
-    return JWTTokenPayload(**payload)
+    return _verify_token_type(token, "refresh", config).payload
+
+
+@inject
+async def verify_refresh_token_claims(
+    token: str, config: Config = Provide[Container.config]
+) -> TokenClaims:
+    """Like ``verify_refresh_token``, with the token's id for rotation."""
+    return _verify_token_type(token, "refresh", config)
@@ -0,0 +1,90 @@
+import math
+import re
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Literal
+
+from fastapi import HTTPException
+from prometheus_client import Counter
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from volunteers.auth.jwt_tokens import verify_token_claims
+from volunteers.core.config import Config
+from volunteers.core.ratelimit import RateLimitStore
+
+RATE_LIMITED_REQUESTS_TOTAL = Counter(
+    "rate_limited_requests_total", "Requests refused by a rate limit", ["budget"]
+)
+
+Budget = Literal["auth", "form"]  # fields of RateLimitConfig
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    method: str
+    path: str  # route template, e.g. "/api/v1/year/{year_id}"
+    budget: Budget
+
+
+def client_key(scope: Scope, config: Config) -> str:
+    """The user of the request's access token, or else the address it came from."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer":
+                try:
+                    return f"user:{verify_token_claims(token, config).payload.user_id}"
+                except HTTPException:
+                    pass  # counted by address, like requests without a token
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """Answers 429 once a client has used up its budget for one of the ``rules``' routes.
+
+    Requests to other routes cost a lookup by method and, for the few methods that have
+    rules, a regular expression match. Budgets are read from the settings on every
+    limited request, so they follow ``reload_config()``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rules: Sequence[RateLimitRule],
+        store: Callable[[], RateLimitStore],
+        config: Callable[[], Config],
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.config = config
+        self._rules: dict[str, list[tuple[re.Pattern[str], Budget]]] = {}
+        for rule in rules:
+            pattern, _, _ = compile_path(rule.path)
+            self._rules.setdefault(rule.method, []).append((pattern, rule.budget))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and (rules := self._rules.get(scope["method"])):
+            for pattern, budget in rules:
+                if pattern.match(scope["path"]):
+                    if retry_after := await self._take(scope, budget):
+                        RATE_LIMITED_REQUESTS_TOTAL.labels(budget=budget).inc()
+                        response = JSONResponse(
+                            {"detail": "Too many requests, try again later"},
+                            status_code=429,
+                            headers={"Retry-After": str(math.ceil(retry_after))},
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+    async def _take(self, scope: Scope, budget: Budget) -> float:
+        config = self.config()
+        if not config.rate_limit.enabled:
+            return 0.0
+        key = f"{budget}:{client_key(scope, config)}"
+        return await self.store().take(key, getattr(config.rate_limit, budget))
@@ -0,0 +1,161 @@
+"""Load test of the app under gunicorn, for every worker count given.
+
+    python -m volunteers.benchmarks.load --workers 1 2 4 --path /api/v1/year/
+
+Uses the settings from the environment, like the app itself, so point
+``VOLUNTEERS_DATABASE__URL`` at a database you don't mind loading. Reports throughput,
+latency percentiles and the most connections the database had open at once, which must
+stay below ``max_connections`` however many workers there are.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+
+import httpx
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.core.config import Config
+from volunteers.core.db import create_engine
+
+STARTUP_TIMEOUT = 30.0  # in seconds
+SAMPLE_INTERVAL = 0.1  # in seconds between connection counts
+
+
+@dataclass
+class Result:
+    workers: int
+    elapsed: float = 0.0
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+    peak_connections: int = 0
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.elapsed
+
+    def percentile(self, percent: int) -> float:
+        return statistics.quantiles(self.latencies, n=100)[percent - 1]
+
+
+async def count_connections(engine: AsyncEngine, result: Result) -> None:
+    async with engine.connect() as conn:
+        while True:
+            connections = await conn.scalar(
+                text("SELECT count(*) - 1 FROM pg_stat_activity WHERE datname = current_database()")
+            )
+            result.peak_connections = max(result.peak_connections, connections or 0)
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+
+async def wait_until_ready(client: httpx.AsyncClient) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            if (await client.get("/hc")).is_success:
+                return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+        await asyncio.sleep(0.2)
+
+
+async def hammer(client: httpx.AsyncClient, path: str, until: float, result: Result) -> None:
+    while (started_at := time.perf_counter()) < until:
+        try:
+            response = await client.get(path)
+        except httpx.TransportError:
+            result.errors += 1
+            continue
+        if response.is_success:
+            result.latencies.append(time.perf_counter() - started_at)
+        else:
+            result.errors += 1
+
+
+async def run(workers: int, args: argparse.Namespace, engine: AsyncEngine, base_url: str) -> Result:
+    result = Result(workers)
+    env = os.environ | {
+        "VOLUNTEERS_SERVER__HOST": "127.0.0.1",
+        "VOLUNTEERS_SERVER__PORT": str(args.port),
+        "VOLUNTEERS_SERVER__WORKERS": str(workers),
+        "VOLUNTEERS_LOGGING__LEVEL": "WARNING",
+    }
+    server = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "--config",
+        "python:volunteers.core.gunicorn",
+        "volunteers.app:app",
+        env=env,
+    )
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            await wait_until_ready(client)
+            # Let every worker open its connections before measuring
+            warm_up_until = time.perf_counter() + args.warm_up
+            await asyncio.gather(
+                *(hammer(client, args.path, warm_up_until, Result(workers)) for _ in range(8))
+            )
+
+            sampler = asyncio.create_task(count_connections(engine, result))
+            started_at = time.perf_counter()
+            until = started_at + args.duration
+            await asyncio.gather(
+                *(hammer(client, args.path, until, result) for _ in range(args.concurrency))
+            )
+            result.elapsed = time.perf_counter() - started_at
+            sampler.cancel()
+    finally:
+        server.terminate()
+        await server.wait()
+    return result
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = Config()
+    engine = create_engine(config.database.url)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        async with engine.connect() as conn:
+            max_connections = await conn.scalar(text("SHOW max_connections"))
+        logger.info(
+            f"GET {args.path} with {args.concurrency} clients for {args.duration}s, "
+            f"{config.database.max_connections} of {max_connections} connections budgeted"
+        )
+        logger.info("workers  requests/s   p50 ms   p99 ms  errors  peak connections")
+        for workers in args.workers:
+            result = await run(workers, args, engine, base_url)
+            if not result.latencies:
+                logger.error(f"{workers} workers: every request failed")
+                continue
+            logger.info(
+                f"{workers:7}  {result.throughput:10.1f}  {result.percentile(50) * 1000:7.1f}  "
+                f"{result.percentile(99) * 1000:7.1f}  {result.errors:6}  "
+                f"{result.peak_connections:16}"
+            )
+    finally:
+        await engine.dispose()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/api/v1/year/")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="in seconds")
+    parser.add_argument("--warm-up", type=float, default=2.0, help="in seconds")
+    parser.add_argument("--port", type=int, default=8765)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
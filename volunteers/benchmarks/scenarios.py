@@ -0,0 +1,357 @@
+"""Benchmarks of typical traffic against a seeded database, reported as JSON for CI to diff.
+
+    python -m volunteers.benchmarks.scenarios postgresql+asyncpg://postgres@localhost/bench
+    python -m volunteers.benchmarks.scenarios URL --output new.json --baseline benchmark.json
+
+The database's schema is dropped and recreated, so point it at a disposable database, e.g.
+one of the dev compose Postgres. Other settings come from the environment, like for the
+app itself. The app runs in this process and is called through httpx without a network,
+so the numbers are the app's and the database's own; ``volunteers.benchmarks.load`` covers
+gunicorn.
+
+Against a baseline, any endpoint making more queries per request than before, or with a
+p95 latency more than ``--tolerance`` higher, fails the run.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+from loguru import logger
+from prometheus_client import REGISTRY
+
+from volunteers.auth.jwt_tokens import JWTTokenPayload, create_access_token
+from volunteers.benchmarks.seed import Seeded, seed
+from volunteers.core.db import create_engine
+from volunteers.models.base import metadata
+
+USERS = 3000
+CONCURRENCY = 50  # clients at once
+REGISTRATIONS = 1000
+ADMIN_EDITS = 100
+POLLING_CLIENTS = 300
+POLLING_ROUNDS = 5
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def report(self, queries: float | None) -> dict[str, Any]:
+        latencies = sorted(self.latencies) or [0.0]
+        # Inclusive, so that a single request is its own percentiles
+        percentiles = statistics.quantiles(latencies * 2, n=100, method="inclusive")
+        return {
+            "requests": len(self.latencies) + self.errors,
+            "errors": self.errors,
+            "p50_ms": round(percentiles[49] * 1000, 2),
+            "p95_ms": round(percentiles[94] * 1000, 2),
+            "p99_ms": round(percentiles[98] * 1000, 2),
+            "queries_per_request": None if queries is None else round(queries, 2),
+        }
+
+
+def _db_queries(method: str, route: str) -> tuple[float, float]:
+    """Statements and requests counted by the app's metrics so far, for one route."""
+    labels = {"method": method, "endpoint": route}
+    return (
+        REGISTRY.get_sample_value("http_request_db_queries_sum", labels) or 0.0,
+        REGISTRY.get_sample_value("http_request_db_queries_count", labels) or 0.0,
+    )
+
+
+class Client:
+    """Requests to the app, timed and counted by route template."""
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self.client = client
+        self.endpoints: dict[tuple[str, str], EndpointStats] = {}
+        self._queries_before: dict[tuple[str, str], tuple[float, float]] = {}
+
+    async def request(
+        self, method: str, route: str, path: dict[str, Any] | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        key = (method, route)
+        if key not in self.endpoints:
+            self.endpoints[key] = EndpointStats()
+            self._queries_before[key] = _db_queries(method, route)
+        stats = self.endpoints[key]
+        started_at = time.perf_counter()
+        response = await self.client.request(method, route.format(**path or {}), **kwargs)
+        if response.is_error:
+            stats.errors += 1
+            logger.warning(f"{method} {route}: {response.status_code} {response.text[:200]}")
+        else:
+            stats.latencies.append(time.perf_counter() - started_at)
+        return response
+
+    def report(self) -> dict[str, Any]:
+        endpoints = {}
+        for (method, route), stats in sorted(self.endpoints.items()):
+            queries, requests = (
+                after - before
+                for after, before in zip(
+                    _db_queries(method, route), self._queries_before[(method, route)], strict=True
+                )
+            )
+            endpoints[f"{method} {route}"] = stats.report(queries / requests if requests else None)
+        everything = EndpointStats(
+            [latency for stats in self.endpoints.values() for latency in stats.latencies],
+            sum(stats.errors for stats in self.endpoints.values()),
+        )
+        return {**everything.report(None), "endpoints": endpoints}
+
+
+async def run_concurrently(tasks: Iterable[Awaitable[None]], concurrency: int) -> None:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(task: Awaitable[None]) -> None:
+        async with slots:
+            await task
+
+    await asyncio.gather(*(run(task) for task in tasks))
+
+
+async def authorization(user_id: int, role: str = "user") -> dict[str, str]:
+    token = await create_access_token(JWTTokenPayload(user_id=user_id, role=role))
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def registration_opens(client: Client, seeded: Seeded, args: argparse.Namespace) -> None:
+    """Volunteers who haven't registered yet open the form, send it and look at what they sent."""
+    year = {"year_id": seeded.open_year_id}
+
+    async def register(user_id: int) -> None:
+        headers = await authorization(user_id)
+        await client.request("GET", "/api/v1/auth/me", headers=headers)
+        await client.request("GET", "/api/v1/year/", headers=headers)
+        await client.request("GET", "/api/v1/year/{year_id}", year, headers=headers)
+        form = {
+            "desired_positions_ids": seeded.position_ids[user_id % 3 :: 3],
+            "itmo_group": f"M{3100 + user_id % 40}",
+            "comments": "",
+        }
+        await client.request(
+            "POST",
+            "/api/v1/year/{year_id}",
+            year,
+            json=form,
+            headers=headers | {"Idempotency-Key": f"benchmark-{user_id}"},
+        )
+        await client.request("GET", "/api/v1/year/{year_id}", year, headers=headers)
+
+    users = seeded.unregistered_user_ids[: args.registrations]
+    await run_concurrently((register(user_id) for user_id in users), args.concurrency)
+
+
+async def admin_builds_day_board(client: Client, seeded: Seeded, args: argparse.Namespace) -> None:
+    """An admin looks through the forms and assigns volunteers to a day one by one."""
+    headers = await authorization(seeded.admin_id, role="admin")
+    year = {"year_id": seeded.open_year_id}
+    day = {"day_id": seeded.event_day_id}
+    await client.request(
+        "GET", "/api/v1/admin/year/{year_id}/registration-forms", year, headers=headers
+    )
+    await client.request(
+        "GET", "/api/v1/admin/year/{year_id}/users", year, headers=headers, params={"limit": 50}
+    )
+
+    for i, form_id in enumerate(seeded.unassigned_form_ids[: args.admin_edits]):
+        added = await client.request(
+            "POST",
+            "/api/v1/admin/user-day/add",
+            headers=headers,
+            json={
+                "application_form_id": form_id,
+                "day_id": seeded.event_day_id,
+                "information": "",
+                "position_id": seeded.position_ids[i % len(seeded.position_ids)],
+            },
+        )
+        if added.is_error:
+            continue
+        user_day = {"user_day_id": added.json()["user_day_id"]}
+        if i % 2:
+            await client.request(
+                "POST",
+                "/api/v1/admin/user-day/{user_day_id}/edit",
+                user_day,
+                headers=headers,
+                json={
+                    "position_id": seeded.position_ids[0],
+                    "hall_id": seeded.hall_ids[i % len(seeded.hall_ids)],
+                },
+            )
+        if i % 5 == 0:
+            await client.request(
+                "DELETE", "/api/v1/admin/user-day/{user_day_id}", user_day, headers=headers
+            )
+        if i % 10 == 0:
+            await client.request(
+                "GET", "/api/v1/admin/user-day/day/{day_id}/assignments", day, headers=headers
+            )
+
+
+async def assignment_polling(client: Client, seeded: Seeded, args: argparse.Namespace) -> None:
+    """On the event day volunteers keep reloading their day's assignments, which change a bit."""
+    path = {"year_id": seeded.open_year_id, "day_id": seeded.event_day_id}
+    admin = await authorization(seeded.admin_id, role="admin")
+    volunteers = seeded.registered_user_ids[: args.polling_clients]
+    headers = {user_id: await authorization(user_id) for user_id in volunteers}
+    etags: dict[int, str] = {}
+
+    async def poll(user_id: int) -> None:
+        response = await client.request(
+            "GET",
+            "/api/v1/year/{year_id}/days/{day_id}/assignments",
+            path,
+            headers=headers[user_id]
+            | ({"If-None-Match": etags[user_id]} if user_id in etags else {}),
+        )
+        if "etag" in response.headers:
+            etags[user_id] = response.headers["etag"]
+
+    for round_index in range(args.polling_rounds):
+        await run_concurrently((poll(user_id) for user_id in volunteers), args.concurrency)
+        if round_index % 2 == 0:
+            # An assignment changes every other round, so some polls get the whole day again
+            await client.request(
+                "POST",
+                "/api/v1/admin/user-day/add",
+                headers=admin,
+                json={
+                    "application_form_id": seeded.unassigned_form_ids[-1 - round_index],
+                    "day_id": seeded.event_day_id,
+                    "information": "",
+                    "position_id": seeded.position_ids[1],
+                },
+            )
+
+
+Scenario = Callable[[Client, Seeded, argparse.Namespace], Awaitable[None]]
+SCENARIOS: dict[str, Scenario] = {
+    "registration_opens": registration_opens,
+    "admin_builds_day_board": admin_builds_day_board,
+    "assignment_polling": assignment_polling,
+}
+
+
+async def benchmark(app: Any, seeded: Seeded, args: argparse.Namespace) -> dict[str, Any]:
+    """Run every scenario in turn against ``app``, whose database was seeded as ``seeded``."""
+    scenarios = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as http:
+        for name, scenario in SCENARIOS.items():
+            client = Client(http)
+            started_at = time.perf_counter()
+            await scenario(client, seeded, args)
+            elapsed = time.perf_counter() - started_at
+            scenarios[name] = {"elapsed_s": round(elapsed, 2), **client.report()}
+    return {
+        "seed": {"users": seeded.users, "rows": seeded.rows},
+        "concurrency": args.concurrency,
+        "scenarios": scenarios,
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Regressions of ``report`` against ``baseline``, one line each."""
+    regressions = []
+    for scenario, before in baseline["scenarios"].items():
+        after = report["scenarios"].get(scenario, {"endpoints": {}})
+        for endpoint, then in before["endpoints"].items():
+            if (now := after["endpoints"].get(endpoint)) is None:
+                continue
+            queries = (then["queries_per_request"], now["queries_per_request"])
+            if None not in queries and queries[1] > queries[0] + 0.01:
+                regressions.append(
+                    f"{scenario}, {endpoint}: {queries[1]} queries per request, was {queries[0]}"
+                )
+            if now["p95_ms"] > then["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{scenario}, {endpoint}: p95 {now['p95_ms']}ms, was {then['p95_ms']}ms"
+                )
+    return regressions
+
+
+def log_report(report: dict[str, Any]) -> None:
+    for name, scenario in report["scenarios"].items():
+        logger.info(
+            f"{name}: {scenario['requests']} requests in {scenario['elapsed_s']}s, "
+            f"{scenario['errors']} errors"
+        )
+        logger.info("    p50 ms    p95 ms    p99 ms  queries  endpoint")
+        for endpoint, stats in scenario["endpoints"].items():
+            logger.info(
+                f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+                f"{stats['queries_per_request'] or 0:>9.2f}  {endpoint}"
+            )
+
+
+async def main(args: argparse.Namespace) -> int:
+    # Imported here, as the app reads its settings and sets up logging when imported
+    from volunteers.app import app, container
+
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        filter=lambda record: (
+            record["name"].startswith(__name__) or record["level"].no >= logger.level("ERROR").no
+        ),
+    )
+
+    engine = create_engine(args.database_url)
+    container.db.override(engine)
+    container.session_maker.reset()
+    container.replica_db.reset()
+    container.replica_session_maker.reset()
+    container.wire(packages=["volunteers.services"])
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.drop_all)
+            await conn.run_sync(metadata.create_all)
+        logger.info(f"Seeding {args.users} users")
+        seeded = await seed(engine, args.users)
+        report = await benchmark(app, seeded, args)
+    finally:
+        await engine.dispose()
+
+    log_report(report)
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    logger.info(f"Written to {args.output}")
+    if args.baseline is None:
+        return 0
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+    for regression in regressions:
+        logger.error(regression)
+    return 1 if regressions else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("database_url", help="a disposable database, its schema is recreated")
+    parser.add_argument("--users", type=int, default=USERS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--registrations", type=int, default=REGISTRATIONS)
+    parser.add_argument("--admin-edits", type=int, default=ADMIN_EDITS)
+    parser.add_argument("--polling-clients", type=int, default=POLLING_CLIENTS)
+    parser.add_argument("--polling-rounds", type=int, default=POLLING_ROUNDS)
+    parser.add_argument("--output", type=Path, default=Path("benchmark.json"))
+    parser.add_argument("--baseline", type=Path, help="a report to compare with")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="p95 slowdown allowed, as a fraction"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,234 @@
+"""Data for benchmarks: a few years of a contest's volunteers, sized like the real thing."""
+
+import random
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.models import (
+    ApplicationForm,
+    Assessment,
+    Day,
+    FormPositionAssociation,
+    Hall,
+    Position,
+    User,
+    UserDay,
+    Year,
+)
+from volunteers.models.attendance import Attendance
+
+POSITIONS = ["Hall", "Runner", "Printer", "Registration", "Photographer", "Tech support"]
+HALLS = ["Main hall", "Hall A", "Hall B", "Hall C"]
+DAYS_PER_YEAR = 8
+PAST_YEARS = 2
+PAST_REGISTERED_SHARE = 0.7  # of the users, per past year
+OPEN_REGISTERED_SHARE = 0.4  # of the users, registered before the benchmark starts
+DESIRED_POSITIONS = 3  # per form
+DAYS_PER_VOLUNTEER = 4  # in past years
+EVENT_DAY_ASSIGNMENTS = 300
+ASSESSED_SHARE = 0.3  # of past user days
+
+
+@dataclass
+class Seeded:
+    users: int
+    admin_id: int
+    open_year_id: int
+    event_day_id: int  # a published day of the open year, with assignments
+    position_ids: list[int]  # of the open year
+    hall_ids: list[int]  # of the open year
+    registered_user_ids: list[int]  # with a form for the open year
+    unregistered_user_ids: list[int]
+    unassigned_form_ids: list[int]  # open year forms without an assignment on the event day
+    rows: dict[str, int] = field(default_factory=dict)  # by table
+
+
+async def _insert(conn: Any, model: Any, rows: list[dict[str, Any]], seeded: Seeded) -> list[int]:
+    seeded.rows[model.__tablename__] = seeded.rows.get(model.__tablename__, 0) + len(rows)
+    if not rows:
+        return []
+    if not hasattr(model, "id"):
+        await conn.execute(insert(model), rows)
+        return []
+    return list((await conn.execute(insert(model).returning(model.id), rows)).scalars())
+
+
+def _assignment(
+    rng: random.Random,
+    form_id: int,
+    day_id: int,
+    position_ids: list[int],
+    hall_ids: list[int],
+    past: bool = False,
+) -> dict[str, Any]:
+    position_index = rng.randrange(len(position_ids))
+    return {
+        "application_form_id": form_id,
+        "day_id": day_id,
+        "position_id": position_ids[position_index],
+        # Only the first position works in halls
+        "hall_id": rng.choice(hall_ids) if position_index == 0 else None,
+        "information": "",
+        "attendance": (
+            rng.choice([Attendance.YES, Attendance.LATE, Attendance.NO])
+            if past
+            else Attendance.UNKNOWN
+        ),
+    }
+
+
+async def seed(engine: AsyncEngine, users: int, random_seed: int = 0) -> Seeded:
+    """Seed past years of forms, assignments and assessments, and a year open for registration.
+
+    The same ``users`` and ``random_seed`` always give the same data.
+    """
+    rng = random.Random(random_seed)  # noqa: S311
+    seeded = Seeded(
+        users=users,
+        admin_id=0,
+        open_year_id=0,
+        event_day_id=0,
+        position_ids=[],
+        hall_ids=[],
+        registered_user_ids=[],
+        unregistered_user_ids=[],
+        unassigned_form_ids=[],
+    )
+    async with engine.begin() as conn:
+        user_ids = await _insert(
+            conn,
+            User,
+            [
+                {
+                    "first_name_ru": f"Имя{i}",
+                    "last_name_ru": f"Фамилия{i}",
+                    "first_name_en": f"Name{i}",
+                    "last_name_en": f"Surname{i}",
+                    "telegram_id": 1_000_000 + i,
+                    "telegram_username": f"volunteer{i}",
+                    "isu_id": 300_000 + i,
+                    "is_admin": i == 0,
+                }
+                for i in range(users + 1)
+            ],
+            seeded,
+        )
+        seeded.admin_id, user_ids = user_ids[0], user_ids[1:]
+
+        for year_index in range(PAST_YEARS + 1):
+            is_open = year_index == PAST_YEARS
+            year_name = str(2020 + year_index)
+            (year_id,) = await _insert(
+                conn, Year, [{"year_name": year_name, "open_for_registration": is_open}], seeded
+            )
+            position_ids = await _insert(
+                conn,
+                Position,
+                [
+                    {
+                        "year_id": year_id,
+                        "name": f"{name} {year_name}",
+                        "can_desire": True,
+                        "has_halls": name == "Hall",
+                    }
+                    for name in POSITIONS
+                ],
+                seeded,
+            )
+            hall_ids = await _insert(
+                conn,
+                Hall,
+                [{"year_id": year_id, "name": name, "description": ""} for name in HALLS],
+                seeded,
+            )
+            day_ids = await _insert(
+                conn,
+                Day,
+                [
+                    {
+                        "year_id": year_id,
+                        "name": f"Day {day} of {year_name}",
+                        "information": "",
+                        "score": 1.0,
+                        "mandatory": day < 2,
+                        "assignment_published": not is_open or day == 0,
+                    }
+                    for day in range(DAYS_PER_YEAR)
+                ],
+                seeded,
+            )
+
+            share = OPEN_REGISTERED_SHARE if is_open else PAST_REGISTERED_SHARE
+            registered = sorted(rng.sample(user_ids, int(len(user_ids) * share)))
+            form_ids = await _insert(
+                conn,
+                ApplicationForm,
+                [
+                    {
+                        "year_id": year_id,
+                        "user_id": user_id,
+                        "itmo_group": f"M{3100 + user_id % 40}",
+                        "comments": "",
+                        "needs_invitation": user_id % 10 == 0,
+                    }
+                    for user_id in registered
+                ],
+                seeded,
+            )
+            await _insert(
+                conn,
+                FormPositionAssociation,
+                [
+                    {"form_id": form_id, "position_id": position_id, "year_id": year_id}
+                    for form_id in form_ids
+                    for position_id in rng.sample(position_ids, DESIRED_POSITIONS)
+                ],
+                seeded,
+            )
+
+            if is_open:
+                # At least half are left to assign, for small seeds
+                assigned = form_ids[: min(EVENT_DAY_ASSIGNMENTS, len(form_ids) // 2)]
+                await _insert(
+                    conn,
+                    UserDay,
+                    [
+                        _assignment(rng, form_id, day_ids[0], position_ids, hall_ids)
+                        for form_id in assigned
+                    ],
+                    seeded,
+                )
+                seeded.open_year_id = year_id
+                seeded.event_day_id = day_ids[0]
+                seeded.position_ids = position_ids
+                seeded.hall_ids = hall_ids
+                seeded.registered_user_ids = registered
+                seeded.unregistered_user_ids = sorted(set(user_ids) - set(registered))
+                seeded.unassigned_form_ids = form_ids[len(assigned) :]
+                continue
+
+            user_day_ids = await _insert(
+                conn,
+                UserDay,
+                [
+                    _assignment(rng, form_id, day_id, position_ids, hall_ids, past=True)
+                    for form_id in form_ids
+                    for day_id in rng.sample(day_ids, DAYS_PER_VOLUNTEER)
+                ],
+                seeded,
+            )
+            await _insert(
+                conn,
+                Assessment,
+                [
+                    {"user_day_id": user_day_id, "comment": "Good", "value": 5.0}
+                    for user_day_id in rng.sample(
+                        user_day_ids, int(len(user_day_ids) * ASSESSED_SHARE)
+                    )
+                ],
+                seeded,
+            )
+    return seeded
@@ -0,0 +1,188 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import aiogram.exceptions
+import pytest
+from aiogram.methods import SendMessage
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+import volunteers.bot.outbox as outbox_module
+from volunteers.bot.outbox import (
+    DatabaseOutboxStorage,
+    MemoryOutboxStorage,
+    NotificationOutbox,
+    pack_messages,
+)
+from volunteers.core.di import Container
+from volunteers.models import OutboxNotification
+
+METHOD = SendMessage(chat_id=1, text="")
+
+
+@pytest.fixture
+def notifier() -> MagicMock:
+    notifier = MagicMock()
+    notifier.send = AsyncMock()
+    return notifier
+
+
+@pytest.fixture
+def outbox(monkeypatch: pytest.MonkeyPatch) -> NotificationOutbox:
+    monkeypatch.setattr(outbox_module, "BACKOFF_BASE", 0)
+    return NotificationOutbox(
+        MemoryOutboxStorage(), coalesce_delay=0.05, min_interval=0, max_retries=2
+    )
+
+
+def test_pack_messages() -> None:
+    assert pack_messages([]) == []
+    assert pack_messages(["a", "b", "c"]) == ["a\n\nb\n\nc"]
+    assert pack_messages(["a" * 6, "b" * 3, "c" * 3], limit=10) == [
+        "a" * 6,
+        "b" * 3 + "\n\n" + "c" * 3,
+    ]
+    assert pack_messages(["a" * 12], limit=10) == ["a" * 10]
+    assert pack_messages(["aaa\nbbb\nccc\nddd", "e"], limit=10) == ["aaa\nbbb", "ccc\nddd\n\ne"]
+
+
+@pytest.mark.asyncio
+async def test_worker_coalesces_bursts(outbox: NotificationOutbox, notifier: MagicMock) -> None:
+    outbox.start(notifier)
+    for i in range(3):
+        await outbox.notify(f"change {i}")
+    await asyncio.sleep(0.2)
+    await outbox.notify("later change")
+    await asyncio.sleep(0.2)
+    await outbox.stop(notifier)
+
+    assert [call.args[0] for call in notifier.send.await_args_list] == [
+        "change 0\n\nchange 1\n\nchange 2",
+        "later change",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stop_sends_pending(outbox: NotificationOutbox, notifier: MagicMock) -> None:
+    outbox.coalesce_delay = 60
+    outbox.start(notifier)
+    await outbox.notify("change")
+    await outbox.stop(notifier)
+
+    notifier.send.assert_awaited_once_with("change")
+
+
+@pytest.mark.asyncio
+async def test_flush_retries_transient_errors(
+    outbox: NotificationOutbox, notifier: MagicMock
+) -> None:
+    notifier.send.side_effect = [
+        aiogram.exceptions.TelegramNetworkError(METHOD, "timeout"),
+        aiogram.exceptions.TelegramRetryAfter(METHOD, "flood", retry_after=0),
+        None,
+    ]
+    await outbox.notify("change")
+    await outbox.flush(notifier)
+
+    assert notifier.send.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_gives_up(outbox: NotificationOutbox, notifier: MagicMock) -> None:
+    notifier.send.side_effect = aiogram.exceptions.TelegramServerError(METHOD, "bad gateway")
+    await outbox.notify("change")
+    await outbox.flush(notifier)
+    assert notifier.send.await_count == 3
+
+    notifier.send.reset_mock()
+    notifier.send.side_effect = aiogram.exceptions.TelegramBadRequest(METHOD, "chat not found")
+    await outbox.notify("change")
+    await outbox.flush(notifier)
+    assert notifier.send.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_acks_each_sent_message(
+    outbox: NotificationOutbox, notifier: MagicMock
+) -> None:
+    outbox.storage.ack = AsyncMock()  # type: ignore[method-assign]
+    notifier.send.side_effect = [
+        None,
+        aiogram.exceptions.TelegramBadRequest(METHOD, "chat not found"),
+        None,
+        # Both pieces of the long notification have to go out
+        aiogram.exceptions.TelegramBadRequest(METHOD, "chat not found"),
+        None,
+    ]
+    for text in ["a" * 3000, "b" * 3000, "c" * 3000, "d" * 3000 + "\n" + "e" * 3000]:
+        await outbox.notify(text)
+    await outbox.flush(notifier)
+
+    assert notifier.send.await_count == 5
+    assert [
+        [message.text for message in call.args[0]] for call in outbox.storage.ack.await_args_list
+    ] == [["a" * 3000], ["c" * 3000]]
+
+
+@pytest.mark.asyncio
+async def test_flush_respects_min_interval(
+    outbox: NotificationOutbox, notifier: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # A fake clock that only sleeping moves
+    now = 0.0
+    delays: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        nonlocal now
+        delays.append(delay)
+        now += delay
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "time", lambda: now)
+    monkeypatch.setattr(outbox_module.asyncio, "sleep", sleep)
+    outbox.min_interval = 0.1
+    for _ in range(3):
+        await outbox.notify("a" * 3000)
+
+    await outbox.flush(notifier)
+
+    assert notifier.send.await_count == 3
+    assert delays == [pytest.approx(0.1), pytest.approx(0.1)]
+
+
+@pytest.mark.asyncio
+async def test_database_storage(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    storage = DatabaseOutboxStorage(poll_interval=0.01)
+    await storage.put("first")
+    await storage.put("second")
+    await asyncio.wait_for(storage.wait(), 1)
+
+    messages = await storage.claim(limit=10)
+    assert [message.text for message in messages] == ["first", "second"]
+    # Claimed notifications aren't handed out again until their lease expires
+    assert await storage.claim(limit=10) == []
+
+    storage.lease = 0
+    reclaimed = await storage.claim(limit=1)
+    assert [message.text for message in reclaimed] == ["first"]
+
+    await storage.ack(messages)
+    assert await storage.claim(limit=10) == []
+
+
+@pytest.mark.asyncio
+async def test_database_storage_gives_up_on_failed_messages(
+    pg_engine: AsyncEngine, pg_container: Container, notifier: MagicMock
+) -> None:
+    notifier.send.side_effect = aiogram.exceptions.TelegramBadRequest(METHOD, "chat not found")
+    storage = DatabaseOutboxStorage(poll_interval=0.01)
+    outbox = NotificationOutbox(storage, coalesce_delay=0, min_interval=0, max_retries=2)
+    await outbox.notify("change")
+    await outbox.flush(notifier)
+    assert notifier.send.await_count == 1
+
+    # Not even once its lease is over
+    storage.lease = 0
+    assert await storage.claim(limit=10) == []
+    async with pg_engine.connect() as conn:
+        failed_at = await conn.scalar(select(OutboxNotification.failed_at))
+    assert failed_at is not None
@@ -10,8 +10,12 @@ class Notifier:
         self.bot = bot
         self.config = config
 
+    async def send(self, message: str) -> None:
+        """Send a message to the notification chat, raising Telegram errors."""
+        await self.bot.send_message(chat_id=self.config.notification.tg_chat_id, text=message)
+
     async def notify(self, message: str) -> None:
         try:
-            await self.bot.send_message(chat_id=self.config.notification.tg_chat_id, text=message)
+            await self.send(message)
         except aiogram.exceptions.TelegramAPIError as e:
             logger.error(f"Failed to send notification: {e}")
@@ -0,0 +1,303 @@
+import asyncio
+import contextlib
+import datetime
+from collections import deque
+from dataclasses import dataclass
+from typing import Protocol
+
+import aiogram.exceptions
+from loguru import logger
+from prometheus_client import Counter
+from sqlalchemy import ColumnElement, and_, delete, exists, or_, select, update
+
+from volunteers.models import OutboxNotification
+from volunteers.services.base import BaseService
+
+from .notify import Notifier
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+BACKOFF_BASE = 1.0  # in seconds
+BACKOFF_MAX = 60.0  # in seconds
+DRAIN_TIMEOUT = 10.0  # in seconds
+
+NOTIFICATIONS_SENT_TOTAL = Counter(
+    "notifications_sent_total", "Telegram messages sent by the notification outbox"
+)
+NOTIFICATIONS_FAILED_TOTAL = Counter(
+    "notifications_failed_total", "Telegram messages the notification outbox gave up on"
+)
+
+
+@dataclass
+class OutboxMessage:
+    text: str
+    id: int | None = None  # row id in durable storage
+
+
+class OutboxStorage(Protocol):
+    async def put(self, text: str) -> None: ...
+
+    async def wait(self) -> None:
+        """Return once there may be messages to claim."""
+        ...
+
+    async def claim(self, limit: int) -> list[OutboxMessage]: ...
+
+    async def ack(self, messages: list[OutboxMessage]) -> None: ...
+
+    async def fail(self, messages: list[OutboxMessage]) -> None:
+        """Give up on messages that could not be sent, so that they are never claimed again."""
+        ...
+
+
+class MemoryOutboxStorage:
+    """Keeps pending notifications in the process: they are lost on restart and on send failure."""
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self._messages: deque[OutboxMessage] = deque()
+        self._pending = asyncio.Event()
+
+    async def put(self, text: str) -> None:
+        if len(self._messages) >= self.maxsize:
+            logger.error("Notification outbox is full, dropping notification")
+            return
+        self._messages.append(OutboxMessage(text))
+        self._pending.set()
+
+    async def wait(self) -> None:
+        await self._pending.wait()
+
+    async def claim(self, limit: int) -> list[OutboxMessage]:
+        messages = [self._messages.popleft() for _ in range(min(limit, len(self._messages)))]
+        if not self._messages:
+            self._pending.clear()
+        return messages
+
+    async def ack(self, messages: list[OutboxMessage]) -> None:
+        pass
+
+    async def fail(self, messages: list[OutboxMessage]) -> None:
+        pass
+
+
+class DatabaseOutboxStorage(BaseService):
+    """Keeps pending notifications in the ``notification_outbox`` table.
+
+    Notifications survive restarts, and several processes can share the table: a claimed
+    notification is only picked up again once its claim is ``lease`` seconds old. Notifications
+    the outbox gives up on stay in the table with ``failed_at`` set and are never claimed again.
+    """
+
+    def __init__(self, poll_interval: float = 1.0, lease: float = 300.0) -> None:
+        super().__init__()
+        self.poll_interval = poll_interval
+        self.lease = lease
+
+    def _claimable(self) -> ColumnElement[bool]:
+        return and_(
+            OutboxNotification.failed_at.is_(None),
+            or_(
+                OutboxNotification.claimed_at.is_(None),
+                OutboxNotification.claimed_at
+                < datetime.datetime.now(tz=datetime.UTC) - datetime.timedelta(seconds=self.lease),
+            ),
+        )
+
+    async def put(self, text: str) -> None:
+        async with self.session_scope() as session:
+            session.add(OutboxNotification(message=text))
+            await session.commit()
+
+    async def wait(self) -> None:
+        while True:
+            async with self.session_scope() as session:
+                if await session.scalar(select(exists().where(self._claimable()))):
+                    return
+            await asyncio.sleep(self.poll_interval)
+
+    async def claim(self, limit: int) -> list[OutboxMessage]:
+        claimable = (
+            select(OutboxNotification.id)
+            .where(self._claimable())
+            .order_by(OutboxNotification.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        async with self.session_scope() as session:
+            result = await session.execute(
+                update(OutboxNotification)
+                .where(OutboxNotification.id.in_(claimable.scalar_subquery()))
+                .values(claimed_at=datetime.datetime.now(tz=datetime.UTC))
+                .returning(OutboxNotification.id, OutboxNotification.message)
+            )
+            messages = [OutboxMessage(text=message, id=id) for id, message in result]
+            await session.commit()
+        return sorted(messages, key=lambda message: message.id or 0)
+
+    async def ack(self, messages: list[OutboxMessage]) -> None:
+        async with self.session_scope() as session:
+            await session.execute(
+                delete(OutboxNotification).where(
+                    OutboxNotification.id.in_([message.id for message in messages])
+                )
+            )
+            await session.commit()
+
+    async def fail(self, messages: list[OutboxMessage]) -> None:
+        async with self.session_scope() as session:
+            await session.execute(
+                update(OutboxNotification)
+                .where(OutboxNotification.id.in_([message.id for message in messages]))
+                .values(failed_at=datetime.datetime.now(tz=datetime.UTC))
+            )
+            await session.commit()
+
+
+def _join(
+    pieces: list[tuple[str, set[int]]], separator: str, limit: int
+) -> list[tuple[str, set[int]]]:
+    joined: list[tuple[str, set[int]]] = []
+    for piece, owners in pieces:
+        piece = piece[:limit]
+        if joined and len(joined[-1][0]) + len(separator) + len(piece) <= limit:
+            text, joined_owners = joined[-1]
+            joined[-1] = (f"{text}{separator}{piece}", joined_owners | owners)
+        else:
+            joined.append((piece, owners))
+    return joined
+
+
+def _pack(texts: list[str], limit: int) -> list[tuple[str, set[int]]]:
+    """Pack like ``pack_messages``, along with the indices of the texts in each message."""
+    pieces = [
+        piece
+        for i, text in enumerate(texts)
+        for piece in (
+            _join([(line, {i}) for line in text.split("\n")], "\n", limit)
+            if len(text) > limit
+            else [(text, {i})]
+        )
+    ]
+    return _join(pieces, "\n\n", limit)
+
+
+def pack_messages(texts: list[str], limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[str]:
+    """Join notifications into as few Telegram messages as fit into ``limit`` characters.
+
+    Notifications that are too long on their own are split between lines.
+    """
+    return [text for text, _ in _pack(texts, limit)]
+
+
+class NotificationOutbox:
+    """Queues Telegram notifications and sends them from a background task.
+
+    Requests only store the message. The worker waits ``coalesce_delay`` after a notification
+    arrives so that bursts of changes go out as a few combined messages, keeps at least
+    ``min_interval`` between messages and retries failures with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        storage: OutboxStorage,
+        coalesce_delay: float,
+        min_interval: float,
+        max_retries: int,
+        batch_size: int = 100,
+    ) -> None:
+        self.storage = storage
+        self.coalesce_delay = coalesce_delay
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+        self._last_sent_at: float | None = None
+        self._worker: asyncio.Task[None] | None = None
+
+    async def notify(self, message: str) -> None:
+        await self.storage.put(message)
+
+    def start(self, notifier: Notifier) -> None:
+        self._worker = asyncio.create_task(self._run(notifier))
+
+    async def stop(self, notifier: Notifier) -> None:
+        """Stop the worker and try to send whatever is still pending."""
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+        try:
+            await asyncio.wait_for(self.flush(notifier), DRAIN_TIMEOUT)
+        except TimeoutError:
+            logger.error("Timed out sending pending notifications on shutdown")
+        except Exception:
+            logger.exception("Failed to send pending notifications on shutdown")
+
+    async def _run(self, notifier: Notifier) -> None:
+        while True:
+            try:
+                await self.storage.wait()
+                await asyncio.sleep(self.coalesce_delay)
+                await self.flush(notifier)
+            except Exception:
+                logger.exception("Notification outbox worker failed")
+                await asyncio.sleep(BACKOFF_MAX)
+
+    async def flush(self, notifier: Notifier) -> None:
+        """Send every notification that can be claimed right now."""
+        while messages := await self.storage.claim(self.batch_size):
+            packed = _pack([message.text for message in messages], TELEGRAM_MESSAGE_LIMIT)
+            # A notification split between messages is sent once all of its pieces are
+            unsent = dict.fromkeys(range(len(messages)), 0)
+            for _, owners in packed:
+                for i in owners:
+                    unsent[i] += 1
+            failed: set[int] = set()
+            for text, owners in packed:
+                if not await self._send(notifier, text):
+                    failed |= owners
+                    continue
+                for i in owners:
+                    unsent[i] -= 1
+                # Acked right away, so a later failure doesn't send these again
+                sent = [messages[i] for i in sorted(owners) if not unsent[i] and i not in failed]
+                if sent:
+                    await self.storage.ack(sent)
+            if failed:
+                # Retrying would fail the same way or send its other pieces again
+                await self.storage.fail([messages[i] for i in sorted(failed)])
+
+    async def _throttle(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._last_sent_at is not None:
+            delay = self._last_sent_at + self.min_interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        self._last_sent_at = loop.time()
+
+    async def _send(self, notifier: Notifier, text: str) -> bool:
+        for attempt in range(self.max_retries + 1):
+            await self._throttle()
+            try:
+                await notifier.send(text)
+            except aiogram.exceptions.TelegramRetryAfter as e:
+                delay = float(e.retry_after)
+            except (
+                aiogram.exceptions.TelegramNetworkError,
+                aiogram.exceptions.TelegramServerError,
+            ):
+                delay = min(BACKOFF_BASE * 2**attempt, BACKOFF_MAX)
+            except aiogram.exceptions.TelegramAPIError as e:
+                # The request itself is wrong, retrying won't help
+                logger.error(f"Failed to send notification: {e}")
+                break
+            else:
+                NOTIFICATIONS_SENT_TOTAL.inc()
+                return True
+            if attempt < self.max_retries:
+                logger.warning(f"Failed to send notification, retrying in {delay}s")
+                await asyncio.sleep(delay)
+        NOTIFICATIONS_FAILED_TOTAL.inc()
+        logger.error(f"Giving up sending notification: {text}")
+        return False
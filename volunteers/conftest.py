@@ -0,0 +1,124 @@
+"""Shared fixtures for tests that run against a real PostgreSQL database.
+
+Those tests are skipped unless ``VOLUNTEERS_TEST_DATABASE_URL`` points to a disposable
+database: the schema is dropped and recreated for every test.
+"""
+
+import os
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+from unittest.mock import AsyncMock
+
+import dependency_injector.providers as providers
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.core.config import RateLimitConfig
+from volunteers.core.db import create_engine
+from volunteers.core.di import Container
+from volunteers.models.base import metadata
+
+TEST_DATABASE_URL = os.environ.get("VOLUNTEERS_TEST_DATABASE_URL")
+
+
+@dataclass
+class QueryCounter:
+    statements: list[str] = field(default_factory=list)
+    parameters: list[Any] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine: AsyncEngine) -> Iterator[QueryCounter]:
+    """Count SQL statements emitted through ``engine`` inside the block."""
+    counter = QueryCounter()
+
+    def before_cursor_execute(*args: Any) -> None:
+        counter.statements.append(args[2])
+        counter.parameters.append(args[3])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def rewire_app_container(container: Container) -> None:
+    """Hand the modules wired to ``container`` back to the app's container."""
+    container.unwire()
+    # Not imported at module level: wiring the app container imports every test module
+    from volunteers.app import container as app_container
+
+    app_container.wire()
+
+
+@pytest.fixture
+def container() -> Iterator[Container]:
+    """Container of the test's own, wired in place of the app's until the test ends."""
+    container = Container()
+    yield container
+    rewire_app_container(container)
+
+
+@pytest.fixture
+async def pg_engine() -> AsyncGenerator[AsyncEngine]:
+    if not TEST_DATABASE_URL:
+        pytest.skip("VOLUNTEERS_TEST_DATABASE_URL is not set")
+
+    engine = create_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def pg_container(pg_engine: AsyncEngine) -> Iterator[Container]:
+    """Container wired to the test database, with the notification outbox mocked out."""
+    container = Container()
+    container.db.override(pg_engine)
+    # Wiring resolves service class attributes eagerly, so drop anything built before the override
+    container.session_maker.reset()
+    container.replica_db.reset()
+    container.replica_session_maker.reset()
+    container.notification_outbox.override(providers.Object(AsyncMock()))
+    container.wire(packages=["volunteers.services"])
+    yield container
+    rewire_app_container(container)
+
+
+@pytest.fixture
+def db_queries(pg_container: Container) -> Callable[[], AbstractContextManager[QueryCounter]]:
+    """``count_queries`` over the engine of ``pg_container``, e.g. around a ``pg_client`` call."""
+    return partial(count_queries, pg_container.db())
+
+
+@pytest.fixture
+async def pg_client(pg_container: Container) -> AsyncGenerator[AsyncClient]:
+    """Client of the whole app, with its routes using ``pg_container`` and rate limits off."""
+    # Not imported at module level: wiring the app container imports every test module
+    from volunteers.app import app
+    from volunteers.app import container as app_container
+
+    pg_container.wire(packages=["volunteers.api", "volunteers.auth", "volunteers.services"])
+    # The rate limit middleware reads the app container's settings, and its buckets outlive tests
+    config = pg_container.config().model_copy(update={"rate_limit": RateLimitConfig(enabled=False)})
+    app_container.config.override(providers.Object(config))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app_container.config.reset_override()
+        # pg_container then hands the modules back to the app's container
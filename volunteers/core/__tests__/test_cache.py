@@ -0,0 +1,58 @@
+import pytest
+
+from volunteers.core import cache as cache_module
+from volunteers.core.cache import CACHE_HITS_TOTAL, CACHE_MISSES_TOTAL, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_returns_stored_value(clock: list[float]) -> None:
+    cache: TTLCache[int, str] = TTLCache("test-get", maxsize=2, ttl=10)
+    cache.set(1, "one")
+
+    assert cache.get(1) == "one"
+    assert cache.get(2) is None
+    assert CACHE_HITS_TOTAL.labels(cache="test-get")._value.get() == 1
+    assert CACHE_MISSES_TOTAL.labels(cache="test-get")._value.get() == 1
+
+
+def test_entries_expire(clock: list[float]) -> None:
+    cache: TTLCache[int, str] = TTLCache("test-expire", maxsize=2, ttl=10)
+    cache.set(1, "one")
+    cache.set(2, "two", ttl=30)
+
+    clock[0] += 10
+    assert cache.get(1) is None
+    assert cache.get(2) == "two"
+    assert len(cache) == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock: list[float]) -> None:
+    cache: TTLCache[int, str] = TTLCache("test-lru", maxsize=2, ttl=10)
+    cache.set(1, "one")
+    cache.set(2, "two")
+    cache.get(1)
+    cache.set(3, "three")
+
+    assert cache.get(1) == "one"
+    assert cache.get(2) is None
+    assert cache.get(3) == "three"
+
+
+def test_invalidate_and_clear(clock: list[float]) -> None:
+    cache: TTLCache[int, str] = TTLCache("test-invalidate", maxsize=2, ttl=10)
+    cache.set(1, "one")
+    cache.set(2, "two")
+
+    cache.invalidate(1)
+    cache.invalidate(42)
+    assert cache.get(1) is None
+    assert cache.get(2) == "two"
+
+    cache.clear()
+    assert len(cache) == 0
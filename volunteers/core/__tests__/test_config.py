@@ -0,0 +1,55 @@
+import pytest
+from pydantic import ValidationError
+
+from volunteers.core.config import Config
+from volunteers.core.di import Container, reload_config
+
+
+def test_config_is_parsed_once(container: Container) -> None:
+    assert container.config() is container.config()
+
+
+def test_config_is_immutable(container: Container) -> None:
+    config = container.config()
+    with pytest.raises(ValidationError):
+        config.jwt.expiration = 1  # type: ignore[misc]
+    with pytest.raises(ValidationError):
+        config.jwt = config.jwt  # type: ignore[misc]
+
+
+def test_reload_config(container: Container, monkeypatch: pytest.MonkeyPatch) -> None:
+    old_config = container.config()
+    monkeypatch.setenv("VOLUNTEERS_JWT__EXPIRATION", "123")
+
+    new_config = reload_config(container)
+
+    assert new_config is not old_config
+    assert container.config() is new_config
+    assert container.config().jwt.expiration == 123
+
+
+def test_reload_invalid_config_keeps_current(
+    container: Container, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    old_config = container.config()
+    monkeypatch.setenv("VOLUNTEERS_JWT__EXPIRATION", "not a number")
+
+    with pytest.raises(ValidationError):
+        reload_config(container)
+
+    assert container.config() is old_config
+    assert isinstance(old_config, Config)
+
+
+@pytest.mark.parametrize(("burst", "per_minute"), [("5", "0"), ("0", "5"), ("5", "-1")])
+def test_reload_rejects_empty_rate_limit_budgets(
+    container: Container, monkeypatch: pytest.MonkeyPatch, burst: str, per_minute: str
+) -> None:
+    old_config = container.config()
+    monkeypatch.setenv("VOLUNTEERS_RATE_LIMIT__FORM__BURST", burst)
+    monkeypatch.setenv("VOLUNTEERS_RATE_LIMIT__FORM__PER_MINUTE", per_minute)
+
+    with pytest.raises(ValidationError):
+        reload_config(container)
+
+    assert container.config() is old_config
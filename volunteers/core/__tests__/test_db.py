@@ -0,0 +1,243 @@
+import copy
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from loguru import logger
+from prometheus_client import REGISTRY
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.auth.deps import with_user
+from volunteers.conftest import TEST_DATABASE_URL
+from volunteers.core.db import (
+    create_engine,
+    fingerprint_statement,
+    get_request_session,
+    request_session_scope,
+)
+from volunteers.core.di import Container
+from volunteers.models import Day, Position, User, Year
+from volunteers.services.year import PositionNotFound, YearService
+
+
+@contextmanager
+def count_checkouts(engine: AsyncEngine) -> Iterator[list[Any]]:
+    checkouts: list[Any] = []
+
+    def on_checkout(*args: Any) -> None:
+        checkouts.append(args)
+
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    try:
+        yield checkouts
+    finally:
+        event.remove(engine.sync_engine, "checkout", on_checkout)
+
+
+async def seed_year(engine: AsyncEngine) -> tuple[int, int]:
+    async with engine.begin() as conn:
+        year_id = (
+            await conn.execute(
+                insert(Year).values(year_name="2025", open_for_registration=True).returning(Year.id)
+            )
+        ).scalar_one()
+        await conn.execute(insert(Position).values(year_id=year_id, name="Runner", can_desire=True))
+        await conn.execute(insert(Day).values(year_id=year_id, name="Finals", information=""))
+        user_id = (
+            await conn.execute(
+                insert(User)
+                .values(
+                    first_name_ru="Иван",
+                    last_name_ru="Иванов",
+                    first_name_en="Ivan",
+                    last_name_en="Ivanov",
+                    is_admin=False,
+                )
+                .returning(User.id)
+            )
+        ).scalar_one()
+    return year_id, user_id
+
+
+@pytest.mark.asyncio
+async def test_request_session_scope_is_lazy() -> None:
+    assert get_request_session() is None
+    async with request_session_scope() as request_session:
+        assert get_request_session() is request_session
+    assert get_request_session() is None
+
+
+@pytest.mark.asyncio
+async def test_services_share_request_session(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    year_id, user_id = await seed_year(pg_engine)
+    year_service: YearService = pg_container.year_service()
+
+    async def load_form_page() -> None:
+        await year_service.get_year_by_year_id(year_id)
+        await year_service.get_form_by_year_id_and_user_id(year_id, user_id)
+        await year_service.get_positions_by_year_id(year_id)
+        await year_service.get_days_by_year_id(year_id)
+
+    with count_checkouts(pg_engine) as standalone:
+        await load_form_page()
+    with count_checkouts(pg_engine) as shared:
+        async with request_session_scope():
+            await load_form_page()
+
+    assert len(standalone) == 4
+    assert len(shared) == 1
+
+
+@pytest.mark.asyncio
+async def test_request_session_recovers_after_failed_call(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    year_id, _ = await seed_year(pg_engine)
+    year_service: YearService = pg_container.year_service()
+
+    async with request_session_scope():
+        with pytest.raises(PositionNotFound):
+            await year_service.edit_position_by_position_id(
+                position_id=12345,
+                position_edit_in=None,  # type: ignore[arg-type]
+            )
+        assert await year_service.get_year_by_year_id(year_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_app_checks_out_one_connection_per_request(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    # Not imported at module level: wiring the app container imports every test module
+    from volunteers.app import app
+
+    # Importing the app wires services to its own container, so point them back at the test one
+    pg_container.wire(packages=["volunteers.services"])
+    year_id, user_id = await seed_year(pg_engine)
+
+    async def _override_with_user() -> User:
+        return User(id=user_id, is_admin=False)
+
+    app.dependency_overrides[with_user] = _override_with_user
+    try:
+        with count_checkouts(pg_engine) as checkouts:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                resp = await client.get(f"/api/v1/year/{year_id}")
+    finally:
+        app.dependency_overrides = {}
+
+    assert resp.status_code == 200, resp.json()
+    assert resp.json()["days"] == [{"day_id": 1, "name": "Finals"}]
+    assert len(checkouts) == 1
+
+
+@pytest.mark.asyncio
+async def test_request_session_accumulates_db_time(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    year_id, _ = await seed_year(pg_engine)
+    year_service: YearService = pg_container.year_service()
+
+    async with request_session_scope() as request_session:
+        await year_service.get_year_by_year_id(year_id)
+        after_one = request_session.db_time
+        await year_service.get_days_by_year_id(year_id)
+
+    assert 0 < after_one < request_session.db_time
+
+
+@pytest.mark.asyncio
+async def test_app_records_db_time_per_request(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    from volunteers.app import app
+
+    pg_container.wire(packages=["volunteers.services"])
+    year_id, user_id = await seed_year(pg_engine)
+    labels = {"method": "GET", "endpoint": "/api/v1/year/{year_id}"}
+    count_before = REGISTRY.get_sample_value("http_request_db_seconds_count", labels) or 0
+    sum_before = REGISTRY.get_sample_value("http_request_db_seconds_sum", labels) or 0
+
+    async def _override_with_user() -> User:
+        return User(id=user_id, is_admin=False)
+
+    app.dependency_overrides[with_user] = _override_with_user
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            resp = await client.get(f"/api/v1/year/{year_id}")
+    finally:
+        app.dependency_overrides = {}
+
+    assert resp.status_code == 200, resp.json()
+    assert REGISTRY.get_sample_value("http_request_db_seconds_count", labels) == count_before + 1
+    assert (REGISTRY.get_sample_value("http_request_db_seconds_sum", labels) or 0) > sum_before
+    assert REGISTRY.get_sample_value("http_request_db_queries_count", labels) == count_before + 1
+
+
+def test_fingerprint_statement() -> None:
+    two = fingerprint_statement(
+        "SELECT users.id FROM users\nWHERE users.id IN ($1::INTEGER, $2::INTEGER) LIMIT 10"
+    )
+    three = fingerprint_statement(
+        "SELECT users.id FROM users WHERE users.id IN ($1::INTEGER, $2::INTEGER, $3::INTEGER) "
+        "LIMIT 20"
+    )
+    assert two == three
+    assert two.operation == "SELECT"
+    assert two.table == "users"
+    assert two.normalized == "SELECT users.id FROM users WHERE users.id IN (...) LIMIT ?"
+
+    insert = fingerprint_statement(
+        "INSERT INTO user_days (day_id, information, created_at) VALUES "
+        "($1::INTEGER, 'x', $2::TIMESTAMP WITH TIME ZONE), ($3::INTEGER, 'y', $4::TIMESTAMP WITH TIME ZONE)"
+    )
+    assert insert.operation == "INSERT"
+    assert insert.table == "user_days"
+    assert (
+        insert.normalized == "INSERT INTO user_days (day_id, information, created_at) VALUES (...)"
+    )
+    assert insert.id != two.id
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_with_their_origin(pg_engine: AsyncEngine) -> None:
+    assert TEST_DATABASE_URL
+    engine = create_engine(TEST_DATABASE_URL, slow_query_threshold=0)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, level="WARNING", format="{message}")
+    try:
+        async with request_session_scope(origin=lambda: "GET /api/v1/year/{year_id}") as scope:
+            session = await scope.get(engine)
+            await session.execute(select(Year.id).where(Year.id.in_([1, 2, 3])))
+    finally:
+        logger.remove(handler_id)
+        await engine.dispose()
+
+    assert scope.queries == 1
+    assert len(messages) == 1
+    assert (
+        "in GET /api/v1/year/{year_id}: SELECT years.id FROM years WHERE years.id IN (...)"
+        in (messages[0])
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_queries_leave_nothing_on_the_connection(pg_engine: AsyncEngine) -> None:
+    async with pg_engine.connect() as conn:
+        await conn.execute(select(Year.id))
+        info = copy.deepcopy(conn.info)
+        for _ in range(3):
+            with pytest.raises(DBAPIError):
+                await conn.execute(text("SELECT * FROM missing_table"))
+            await conn.rollback()
+        await conn.execute(select(Year.id))
+
+        assert conn.info == info
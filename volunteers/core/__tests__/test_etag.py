@@ -0,0 +1,38 @@
+from fastapi import Request, Response
+
+from volunteers.core.etag import conditional_response, digest, etag_matches
+
+
+def make_request(if_none_match: str | None = None) -> Request:
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_digest() -> None:
+    assert digest(1, (2, None)) == digest(1, (2, None))
+    assert digest(1, (2, None)) != digest(1, (2, 3))
+
+
+def test_etag_matches() -> None:
+    assert not etag_matches(None, '"a"')
+    assert etag_matches("*", '"a"')
+    assert etag_matches('"b", W/"a"', '"a"')
+    assert not etag_matches('"b", "c"', '"a"')
+
+
+def test_conditional_response() -> None:
+    etag = f'"{digest(1, 2)}"'
+
+    response = Response()
+    assert conditional_response(make_request(), response, 1, 2) is None
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    response = Response()
+    not_modified = conditional_response(make_request(etag), response, 1, 2)
+    assert not_modified is not None
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.body == b""
+
+    assert conditional_response(make_request(etag), Response(), 1, 3) is None
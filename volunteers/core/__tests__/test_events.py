@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.core.events import EventBroker, PostgresEventBroker
+
+
+@pytest.mark.asyncio
+async def test_fan_out() -> None:
+    broker = EventBroker()
+    with (
+        broker.subscribe("a") as first,
+        broker.subscribe("a") as second,
+        broker.subscribe("b") as other,
+    ):
+        await broker.publish("a", ["1", "2"])
+
+        assert [await first.get(), await first.get()] == ["1", "2"]
+        assert [await second.get(), await second.get()] == ["1", "2"]
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(other.get(), 0.01)
+
+    assert broker._subscriptions == {}
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_misses_events() -> None:
+    broker = EventBroker(queue_size=2)
+    with broker.subscribe("a") as subscription:
+        await broker.publish("a", ["1", "2", "3"])
+        await broker.publish("a", ["4"])
+
+        assert await subscription.get() is None
+        assert await subscription.get() == "4"
+
+
+@pytest.mark.asyncio
+async def test_postgres_broker(pg_engine: AsyncEngine) -> None:
+    broker = PostgresEventBroker(pg_engine)
+    other_worker = PostgresEventBroker(pg_engine)
+    with broker.subscribe("a") as subscription:
+        await broker.start()
+        try:
+            # Listening started, and anything published before could have been missed
+            assert await asyncio.wait_for(subscription.get(), 5) is None
+
+            await other_worker.publish("a", ["1", '{"type": "reset"}'])
+            await other_worker.publish("b", ["2"])
+            await broker.publish("a", ["3"])
+
+            assert [await asyncio.wait_for(subscription.get(), 5) for _ in range(3)] == [
+                "1",
+                '{"type": "reset"}',
+                "3",
+            ]
+        finally:
+            await broker.stop()
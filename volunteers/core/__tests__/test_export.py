@@ -0,0 +1,106 @@
+import csv
+import datetime
+import io
+import zipfile
+from collections.abc import AsyncIterator
+from xml.etree import ElementTree
+
+import pytest
+
+import volunteers.core.export as export_module
+from volunteers.core.export import Cells, csv_chunks, to_cell, xlsx_chunks
+from volunteers.models.attendance import Attendance
+
+XLSX_NAMESPACE = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+async def generate_rows(count: int) -> AsyncIterator[Cells]:
+    for i in range(count):
+        yield [i, f"Name <{i}> & co", None, i % 2 == 0, 1.5]
+
+
+def test_to_cell() -> None:
+    assert to_cell(None) is None
+    assert to_cell(True) is True
+    assert to_cell(Attendance.LATE) == "late"
+    assert to_cell(datetime.datetime(2025, 1, 2, 3, 4, tzinfo=datetime.UTC)) == (
+        "2025-01-02T03:04:00+00:00"
+    )
+
+
+@pytest.mark.asyncio
+async def test_csv_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(export_module, "CHUNK_SIZE", 1024)
+
+    chunks = [chunk async for chunk in csv_chunks(["id", "name"], generate_rows(1000))]
+
+    assert len(chunks) > 10
+    assert all(len(chunk) < 2048 for chunk in chunks)
+    content = b"".join(chunks).decode()
+    assert content.startswith("\ufeff")
+    records = list(csv.reader(io.StringIO(content.removeprefix("\ufeff"))))
+    assert records[0] == ["id", "name"]
+    assert records[1] == ["0", "Name <0> & co", "", "True", "1.5"]
+    assert len(records) == 1001
+
+
+@pytest.mark.asyncio
+async def test_xlsx_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(export_module, "CHUNK_SIZE", 1024)
+
+    chunks = [chunk async for chunk in xlsx_chunks(["id", "name"], generate_rows(5000))]
+
+    # The compressor keeps some output back, but the workbook is still sent piece by piece
+    assert len(chunks) > 1
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as workbook:
+        assert workbook.testzip() is None
+        assert "xl/workbook.xml" in workbook.namelist()
+        sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))  # noqa: S314
+    rows = sheet.findall(".//x:row", XLSX_NAMESPACE)
+    assert len(rows) == 5001
+    assert [cell.findtext(".//x:t", namespaces=XLSX_NAMESPACE) for cell in rows[0]] == [
+        "id",
+        "name",
+    ]
+    number, name, empty, flag, fraction = rows[1]
+    assert number.findtext("x:v", namespaces=XLSX_NAMESPACE) == "0"
+    assert name.findtext(".//x:t", namespaces=XLSX_NAMESPACE) == "Name <0> & co"
+    assert len(empty) == 0
+    assert (flag.get("t"), flag.findtext("x:v", namespaces=XLSX_NAMESPACE)) == ("b", "1")
+    assert fraction.findtext("x:v", namespaces=XLSX_NAMESPACE) == "1.5"
+
+
+@pytest.mark.asyncio
+async def test_xlsx_drops_characters_xml_forbids() -> None:
+    async def rows() -> AsyncIterator[Cells]:
+        yield ["bell\x07 and tab\t"]
+
+    content = b"".join([chunk async for chunk in xlsx_chunks(["text"], rows())])
+
+    with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+        sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))  # noqa: S314
+    assert sheet.findall(".//x:t", XLSX_NAMESPACE)[1].text == "bell and tab\t"
+
+
+@pytest.mark.asyncio
+async def test_exports_keep_formulas_as_text() -> None:
+    async def rows() -> AsyncIterator[Cells]:
+        yield ['=HYPERLINK("http://evil.example", "Click")', "+7 900", "-1", "@sum", "ok", -1]
+
+    content = b"".join([chunk async for chunk in csv_chunks(["comment"], rows())]).decode()
+    records = list(csv.reader(io.StringIO(content.removeprefix("\ufeff"))))
+    assert records[1] == [
+        '\'=HYPERLINK("http://evil.example", "Click")',
+        "'+7 900",
+        "'-1",
+        "'@sum",
+        "ok",
+        "-1",
+    ]
+
+    content = b"".join([chunk async for chunk in xlsx_chunks(["comment"], rows())])
+    with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+        sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))  # noqa: S314
+    formula = sheet.findall(".//x:row", XLSX_NAMESPACE)[1][0]
+    assert formula.get("t") == "inlineStr"
+    assert formula.find("x:f", XLSX_NAMESPACE) is None
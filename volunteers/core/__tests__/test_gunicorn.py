@@ -0,0 +1,51 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+from dependency_injector import providers
+
+from volunteers.core.config import Config
+from volunteers.core.gunicorn import connections_per_worker, post_fork, worker_count
+
+
+def make_config(workers: int | None = None, broker: str = "memory", **database: Any) -> Config:
+    config = Config()
+    return config.model_copy(
+        update={
+            "server": config.server.model_copy(update={"workers": workers}),
+            "database": config.database.model_copy(update=database),
+            "events": config.events.model_copy(update={"broker": broker}),
+        }
+    )
+
+
+def test_connections_per_worker() -> None:
+    assert connections_per_worker(make_config(pool_size=5, max_overflow=5)) == 10
+    # The event listener holds a connection of its own
+    assert connections_per_worker(make_config(broker="postgres", pool_size=5, max_overflow=5)) == 11
+
+
+def test_worker_count() -> None:
+    config = make_config(pool_size=5, max_overflow=5, max_connections=80)
+
+    assert worker_count(config, cpu_count=4) == 4
+    assert worker_count(config, cpu_count=32) == 8
+    assert worker_count(make_config(workers=2, max_connections=80), cpu_count=32) == 2
+    assert worker_count(make_config(workers=20, max_connections=80), cpu_count=1) == 8
+    # A budget below a single pool still starts one worker
+    assert worker_count(make_config(max_connections=5), cpu_count=4) == 1
+
+
+def test_post_fork_drops_inherited_connections() -> None:
+    from volunteers.app import container
+
+    primary, replica = MagicMock(), MagicMock()
+    with container.db.override(providers.Object(primary)):
+        with container.replica_db.override(providers.Object(primary)):
+            post_fork(MagicMock(), MagicMock())
+        primary.sync_engine.dispose.assert_called_once_with(close=False)
+
+        primary.reset_mock()
+        with container.replica_db.override(providers.Object(replica)):
+            post_fork(MagicMock(), MagicMock())
+    primary.sync_engine.dispose.assert_called_once_with(close=False)
+    replica.sync_engine.dispose.assert_called_once_with(close=False)
@@ -0,0 +1,58 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.core.config import RateLimitBudget
+from volunteers.core.ratelimit import PostgresRateLimitStore, RateLimitStore
+
+BUDGET = RateLimitBudget(burst=3, per_minute=60)
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills() -> None:
+    store = RateLimitStore()
+    with patch("volunteers.core.ratelimit.time.monotonic", return_value=100.0):
+        assert [await store.take("ip:1", BUDGET) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert await store.take("ip:1", BUDGET) == pytest.approx(1.0)
+        # Other clients have budgets of their own
+        assert await store.take("ip:2", BUDGET) == 0.0
+    with patch("volunteers.core.ratelimit.time.monotonic", return_value=101.5):
+        assert await store.take("ip:1", BUDGET) == 0.0
+        assert await store.take("ip:1", BUDGET) == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_full_buckets_are_forgotten() -> None:
+    store = RateLimitStore()
+    with patch("volunteers.core.cache.time.monotonic", return_value=100.0):
+        await store.take("ip:1", BUDGET)
+        await store.take("ip:1", BUDGET)
+    with patch("volunteers.core.cache.time.monotonic", return_value=102.0):
+        assert store._buckets.get("ip:1") is None
+
+
+@pytest.mark.asyncio
+async def test_postgres_buckets_are_shared(pg_engine: AsyncEngine) -> None:
+    # Two stores on one database stand in for two worker processes
+    first, second = PostgresRateLimitStore(pg_engine), PostgresRateLimitStore(pg_engine)
+    budget = RateLimitBudget(burst=4, per_minute=1)
+
+    results = await asyncio.gather(
+        *(store.take("ip:1", budget) for store in (first, second) for _ in range(3))
+    )
+
+    assert results.count(0.0) == 4
+    assert all(50 < retry_after <= 60 for retry_after in results if retry_after)
+    assert await first.take("ip:2", budget) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_postgres_store_falls_back_to_local_buckets(pg_engine: AsyncEngine) -> None:
+    store = PostgresRateLimitStore(pg_engine)
+    async with pg_engine.begin() as conn:
+        await conn.execute(text("DROP TABLE rate_limit_buckets"))
+
+    assert [await store.take("ip:1", BUDGET) for _ in range(4)][-1] > 0
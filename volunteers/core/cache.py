@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from prometheus_client import Counter
+
+CACHE_HITS_TOTAL = Counter("cache_hits_total", "In-process cache hits", ["cache"])
+CACHE_MISSES_TOTAL = Counter("cache_misses_total", "In-process cache misses", ["cache"])
+
+
+class TTLCache[K: Hashable, V]:
+    """Bounded in-process LRU cache whose entries expire ``ttl`` seconds after being set.
+
+    Every process keeps its own copy, so writers must invalidate entries explicitly and
+    ``ttl`` bounds how stale another worker's copy can get.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._hits = CACHE_HITS_TOTAL.labels(cache=name)
+        self._misses = CACHE_MISSES_TOTAL.labels(cache=name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses.inc()
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._misses.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits.inc()
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
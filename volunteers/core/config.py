@@ -1,39 +1,116 @@
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class JWTConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     secret: str
     algorithm: str
     expiration: int  # in seconds
     refresh_expiration: int  # in seconds
+    # in seconds that a replaced refresh token still gets the token that replaced it, for
+    # concurrent refreshes of tabs and requests that share one token
+    refresh_reuse_grace: int = 10
 
 
 class TelegramConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     token: str
     expiration_time: int
 
 
 class DatabaseConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     url: str
+    slow_query_threshold: float = 0.5  # in seconds, slower statements are logged
+    # Every worker process has a pool of its own, of up to pool_size + max_overflow connections
+    pool_size: int = 5
+    max_overflow: int = 5
+    pool_timeout: float = 10.0  # in seconds to wait for a free connection
+    pool_recycle: int = 1800  # in seconds, reconnect before idle connections get dropped
+    max_connections: int = 80  # for all workers together, keep below Postgres' max_connections
+    # A streaming replica for reads, sized like the primary; reads made by a request after it
+    # committed stay on the primary, so that they see its writes
+    replica_url: str | None = None
 
 
 class ServerConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     port: int
     host: str
+    workers: int | None = None  # derived from the CPU count when unset, see core.gunicorn
+    # Addresses or networks of the proxies trusted to report the client address in
+    # X-Forwarded-For. "*" lets any client pick the address its rate limits are kept under
+    forwarded_allow_ips: str = "127.0.0.1"
 
 
 class LoggingConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     level: str
 
 
 class NotificationConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     tg_chat_id: int
+    outbox: Literal["memory", "database"] = "memory"  # where pending notifications are kept
+    coalesce_delay: float = 2.0  # in seconds
+    min_interval: float = 3.0  # in seconds, Telegram allows about 20 messages a minute per group
+    max_retries: int = 5
+
+
+class EventsConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # "postgres" relays live events between worker processes through LISTEN/NOTIFY
+    broker: Literal["memory", "postgres"] = "memory"
+    queue_size: int = 100  # events kept for a live client that doesn't keep up
+
+
+class RateLimitBudget(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # Both positive: a zero rate would never refill the budget, and divides by zero
+    burst: int = Field(gt=0)  # requests a client may make at once
+    per_minute: float = Field(gt=0)  # requests a client may keep making
+
+    @property
+    def refill_rate(self) -> float:
+        """Requests regained per second."""
+        return self.per_minute / 60
+
+
+class RateLimitConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = True
+    # "postgres" shares the budgets between worker processes, "memory" gives each its own
+    store: Literal["memory", "postgres"] = "memory"
+    # Per client IP, for the Telegram login, registration and migration
+    auth: RateLimitBudget = RateLimitBudget(burst=10, per_minute=10)
+    # Per user, for submitting the registration form
+    form: RateLimitBudget = RateLimitBudget(burst=5, per_minute=20)
 
 
 class Config(BaseSettings):
+    """Application settings.
+
+    Parsed once per process and shared as an immutable snapshot, see ``Container.config``.
+    """
+
     model_config = SettingsConfigDict(
-        env_file=".env", env_prefix="VOLUNTEERS_", env_nested_delimiter="__", extra="allow"
+        env_file=".env",
+        env_prefix="VOLUNTEERS_",
+        env_nested_delimiter="__",
+        extra="allow",
+        frozen=True,
     )
     jwt: JWTConfig
     telegram: TelegramConfig
@@ -41,3 +118,5 @@ class Config(BaseSettings):
     server: ServerConfig
     logging: LoggingConfig
     notification: NotificationConfig
+    events: EventsConfig = EventsConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
@@ -1,13 +1,208 @@
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+import hashlib
+import re
+import time
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
 
+from loguru import logger
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
-def create_engine(url: str) -> AsyncEngine:
-    return create_async_engine(
+DB_POOL_CHECKOUTS_TOTAL = Counter(
+    "db_pool_checkouts_total", "Total connections checked out of the database pool"
+)
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out of the database pool",
+    multiprocess_mode="livesum",
+)
+DB_QUERY_DURATION_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement latency by statement fingerprint",
+    ["operation", "table", "fingerprint"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+SLOW_QUERY_THRESHOLD = 0.5  # in seconds
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Bind parameters as rendered by asyncpg ($1::INTEGER) and literals
+_VALUE_RE = re.compile(
+    r"\$\d+(?:::\w+(?: WITH(?:OUT)? TIME ZONE)?(?:\[\])?)?|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b"
+)
+# IN lists and multi-row VALUES, whose length depends on the data
+_VALUE_LIST_RE = re.compile(r"\(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))*")
+_TABLE_RE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+\"?(\w+)")
+
+
+def _on_checkout(*_: Any) -> None:
+    DB_POOL_CHECKOUTS_TOTAL.inc()
+    DB_POOL_CONNECTIONS_IN_USE.inc()
+
+
+def _on_checkin(*_: Any) -> None:
+    DB_POOL_CONNECTIONS_IN_USE.dec()
+
+
+@dataclass(frozen=True)
+class StatementFingerprint:
+    operation: str
+    table: str
+    normalized: str
+
+    @property
+    def id(self) -> str:
+        return hashlib.blake2b(self.normalized.encode(), digest_size=6).hexdigest()
+
+
+@lru_cache(maxsize=1024)
+def fingerprint_statement(statement: str) -> StatementFingerprint:
+    """Group statements that differ only in parameter values or the length of value lists."""
+    normalized = _WHITESPACE_RE.sub(" ", statement).strip()
+    normalized = _VALUE_LIST_RE.sub("(...)", _VALUE_RE.sub("?", normalized))
+    operation = normalized.split(" ", 1)[0].upper()
+    table = match.group(1) if (match := _TABLE_RE.search(normalized)) else ""
+    return StatementFingerprint(operation=operation, table=table, normalized=normalized)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any
+) -> None:
+    # Kept on the statement's execution context, not the connection, where a failed statement
+    # would leave its start time behind
+    context.query_started_at = time.perf_counter()
+
+
+def _make_after_cursor_execute(slow_query_threshold: float) -> Callable[..., None]:
+    def after_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any
+    ) -> None:
+        elapsed = time.perf_counter() - context.query_started_at
+        fingerprint = fingerprint_statement(statement)
+        DB_QUERY_DURATION_SECONDS.labels(
+            operation=fingerprint.operation, table=fingerprint.table, fingerprint=fingerprint.id
+        ).observe(elapsed)
+
+        request_session = get_request_session()
+        if request_session is not None:
+            request_session.db_time += elapsed
+            request_session.queries += 1
+        if elapsed >= slow_query_threshold:
+            origin = request_session.origin() if request_session is not None else "outside requests"
+            logger.warning(
+                f"Slow query ({elapsed:.3f}s, fingerprint {fingerprint.id}) in {origin}: "
+                f"{fingerprint.normalized}"
+            )
+
+    return after_cursor_execute
+
+
+def create_engine(
+    url: str,
+    slow_query_threshold: float = SLOW_QUERY_THRESHOLD,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = -1,
+) -> AsyncEngine:
+    engine = create_async_engine(
         url,
         pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
         connect_args={
             "server_settings": {
                 "search_path": "public",
             },
         },
     )
+    event.listen(engine.sync_engine, "checkout", _on_checkout)
+    event.listen(engine.sync_engine, "checkin", _on_checkin)
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(
+        engine.sync_engine, "after_cursor_execute", _make_after_cursor_execute(slow_query_threshold)
+    )
+    return engine
+
+
+def create_replica_engine(primary: AsyncEngine, url: str | None, **kwargs: Any) -> AsyncEngine:
+    """Engine for reads that may lag behind writes: the primary itself unless there is a replica."""
+    if url is None:
+        return primary
+    return create_engine(url, **kwargs)
+
+
+def create_session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+class RequestSession:
+    """Session shared by every service call made while handling one HTTP request.
+
+    The connection is checked out of the pool on first use only, so requests that never
+    touch the database cost nothing. There is one session per engine, bound to a single
+    connection: commits issued by services end the transaction but keep the connection.
+    Sessions must not be used by concurrent tasks.
+    ``committed`` tells whether any of them committed, i.e. whether the request wrote.
+
+    It also accumulates the time the request spent in SQL statements and their number, whichever
+    session ran them. ``origin`` describes the request in logs, e.g. the route it matched.
+    """
+
+    def __init__(self, origin: Callable[[], str] = lambda: "request") -> None:
+        self._sessions: dict[AsyncEngine, tuple[AsyncConnection, AsyncSession]] = {}
+        self.origin = origin
+        self.db_time = 0.0  # in seconds
+        self.queries = 0
+        self.committed = False
+
+    async def get(self, engine: AsyncEngine) -> AsyncSession:
+        if engine not in self._sessions:
+            connection = await engine.connect()
+            session = AsyncSession(bind=connection, expire_on_commit=False)
+            event.listen(session.sync_session, "after_commit", self._on_commit)
+            self._sessions[engine] = (connection, session)
+        return self._sessions[engine][1]
+
+    def _on_commit(self, _session: Any) -> None:
+        self.committed = True
+
+    async def close(self) -> None:
+        while self._sessions:
+            _, (connection, session) = self._sessions.popitem()
+            await session.close()
+            await connection.close()
+
+
+_request_session: ContextVar[RequestSession | None] = ContextVar("request_session", default=None)
+
+
+def get_request_session() -> RequestSession | None:
+    return _request_session.get()
+
+
+@asynccontextmanager
+async def request_session_scope(
+    origin: Callable[[], str] = lambda: "request",
+) -> AsyncGenerator[RequestSession]:
+    """Make services share one session until the block exits, then release it."""
+    request_session = RequestSession(origin)
+    token = _request_session.set(request_session)
+    try:
+        yield request_session
+    finally:
+        _request_session.reset(token)
+        await request_session.close()
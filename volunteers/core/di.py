@@ -2,11 +2,15 @@ import dependency_injector.containers as containers
 import dependency_injector.providers as providers
 
 from volunteers.bot.notify import Notifier
+from volunteers.bot.outbox import DatabaseOutboxStorage, MemoryOutboxStorage, NotificationOutbox
 from volunteers.core.config import Config
-from volunteers.core.db import create_engine
+from volunteers.core.db import create_engine, create_replica_engine, create_session_maker
+from volunteers.core.events import EventBroker, PostgresEventBroker
+from volunteers.core.ratelimit import PostgresRateLimitStore, RateLimitStore
 from volunteers.core.tg import get_bot
 from volunteers.services.i18n import I18nService
 from volunteers.services.legacy_user import LegacyUserService
+from volunteers.services.refresh_token import RefreshTokenService
 from volunteers.services.user import UserService
 from volunteers.services.year import YearService
 
@@ -24,13 +28,76 @@ class Container(containers.DeclarativeContainer):
         ],
         warn_unresolved=True,  # type: ignore[call-arg]
     )
-    config = providers.Factory(Config)
-    db = providers.Singleton(create_engine, config.provided.database.url)
+    # Settings are parsed once; use reload_config() to pick up changes without a restart
+    config = providers.Singleton(Config)
+    db = providers.Singleton(
+        create_engine,
+        config.provided.database.url,
+        slow_query_threshold=config.provided.database.slow_query_threshold,
+        pool_size=config.provided.database.pool_size,
+        max_overflow=config.provided.database.max_overflow,
+        pool_timeout=config.provided.database.pool_timeout,
+        pool_recycle=config.provided.database.pool_recycle,
+    )
+    session_maker = providers.Singleton(create_session_maker, db)
+    # The primary itself unless a replica is configured
+    replica_db = providers.Singleton(
+        create_replica_engine,
+        db,
+        config.provided.database.replica_url,
+        slow_query_threshold=config.provided.database.slow_query_threshold,
+        pool_size=config.provided.database.pool_size,
+        max_overflow=config.provided.database.max_overflow,
+        pool_timeout=config.provided.database.pool_timeout,
+        pool_recycle=config.provided.database.pool_recycle,
+    )
+    replica_session_maker = providers.Singleton(create_session_maker, replica_db)
     # logger = providers.Singleton(Logger)
     telegram = providers.Singleton(get_bot, config.provided.telegram.token)
 
     notifier = providers.Singleton(Notifier, bot=telegram, config=config)
+    notification_outbox = providers.Singleton(
+        NotificationOutbox,
+        storage=providers.Selector(
+            config.provided.notification.outbox,
+            memory=providers.Singleton(MemoryOutboxStorage),
+            database=providers.Singleton(DatabaseOutboxStorage),
+        ),
+        coalesce_delay=config.provided.notification.coalesce_delay,
+        min_interval=config.provided.notification.min_interval,
+        max_retries=config.provided.notification.max_retries,
+    )
+    event_broker = providers.Selector(
+        config.provided.events.broker,
+        memory=providers.Singleton(EventBroker, queue_size=config.provided.events.queue_size),
+        postgres=providers.Singleton(
+            PostgresEventBroker, engine=db, queue_size=config.provided.events.queue_size
+        ),
+    )
+    rate_limit_store = providers.Selector(
+        config.provided.rate_limit.store,
+        memory=providers.Singleton(RateLimitStore),
+        postgres=providers.Singleton(PostgresRateLimitStore, engine=db),
+    )
     i18n_service = providers.Singleton(I18nService, locale="en")
-    user_service = providers.Singleton(UserService)
-    year_service = providers.Singleton(YearService, notifier=notifier)
+    user_service = providers.Singleton(UserService, broker=event_broker)
+    year_service = providers.Singleton(YearService, outbox=notification_outbox, broker=event_broker)
     legacy_user_service = providers.Singleton(LegacyUserService)
+    # Reads the settings on every use, so that reload_config() changes token lifetimes
+    refresh_token_service = providers.Singleton(
+        RefreshTokenService, config=config.provider, broker=event_broker
+    )
+
+
+def reload_config(container: Container) -> Config:
+    """Re-read settings and make them the snapshot injected from now on.
+
+    Invalid settings raise and leave the current snapshot in place. Only values read on
+    every call (JWT, Telegram login and rate limit budget settings) change; the database
+    engines, the bot, the notifier, the notification outbox, the event broker and the rate
+    limit store keep the settings they were created with until the process restarts.
+    """
+    config = Config()
+    container.config.reset_override()
+    container.config.override(providers.Object(config))
+    return config
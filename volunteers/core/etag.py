@@ -0,0 +1,38 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+# Responses depend on who asks, and clients must check back before reusing them
+CACHE_CONTROL = "private, no-cache"
+
+
+def digest(*parts: object) -> str:
+    """Hash ``parts`` into a short hex string; equal parts always give equal digests."""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header value names ``etag``.
+
+    ``If-None-Match`` uses weak comparison, so a ``W/`` prefix is ignored.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def conditional_response(request: Request, response: Response, *version: object) -> Response | None:
+    """Tag ``response`` with a strong ETag for ``version`` of the data it is built from.
+
+    Returns a 304 response to send instead when the client already holds that version, so the
+    caller can skip loading and serialising the body.
+    """
+    etag = f'"{digest(*version)}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
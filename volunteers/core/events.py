@@ -0,0 +1,171 @@
+import asyncio
+import contextlib
+import json
+from collections import defaultdict, deque
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from loguru import logger
+from prometheus_client import Gauge
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SUBSCRIBER_QUEUE_SIZE = 100  # events kept for a subscriber that doesn't keep up
+NOTIFY_CHANNEL = "volunteers_events"
+RECONNECT_DELAY = 5.0  # in seconds
+
+EVENT_SUBSCRIBERS = Gauge(
+    "event_subscribers", "Subscribers of the in-process event broker", multiprocess_mode="livesum"
+)
+
+
+class Subscription:
+    """Events published to one channel, in order, for a single subscriber."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._events: deque[str] = deque()
+        self._ready = asyncio.Event()
+        self._missed = False
+
+    def put(self, data: str) -> None:
+        if len(self._events) >= self.maxsize:
+            # Memory stays bounded; the subscriber is told to catch up from scratch instead
+            self._events.clear()
+            self._missed = True
+        else:
+            self._events.append(data)
+        self._ready.set()
+
+    def miss(self) -> None:
+        self._events.clear()
+        self._missed = True
+        self._ready.set()
+
+    async def get(self) -> str | None:
+        """Wait for the next event; ``None`` means that some events were lost on the way."""
+        await self._ready.wait()
+        if self._missed:
+            self._missed = False
+            data = None
+        else:
+            data = self._events.popleft()
+        if not self._events and not self._missed:
+            self._ready.clear()
+        return data
+
+
+class EventBroker:
+    """Fans events out to the subscribers of their channel within this process.
+
+    Publishing costs the same however many subscribers are waiting, and subscribers never
+    touch the database.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._subscriptions: defaultdict[str, set[Subscription]] = defaultdict(set)
+
+    @contextlib.contextmanager
+    def subscribe(self, channel: str) -> Iterator[Subscription]:
+        subscription = Subscription(self.queue_size)
+        self._subscriptions[channel].add(subscription)
+        EVENT_SUBSCRIBERS.inc()
+        try:
+            yield subscription
+        finally:
+            EVENT_SUBSCRIBERS.dec()
+            subscriptions = self._subscriptions[channel]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[channel]
+
+    async def publish(self, channel: str, messages: Sequence[str]) -> None:
+        self.deliver(channel, messages)
+
+    def deliver(self, channel: str, messages: Sequence[str]) -> None:
+        for subscription in self._subscriptions.get(channel, ()):
+            for data in messages:
+                subscription.put(data)
+
+    def miss_all(self) -> None:
+        """Tell every subscriber that events may have been lost."""
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.miss()
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class PostgresEventBroker(EventBroker):
+    """Relays events through Postgres ``LISTEN/NOTIFY``, so subscribers of every worker get them.
+
+    Each process keeps one pooled connection listening for the lifetime of the broker.
+    Notification payloads are limited to about 8000 bytes, so events must stay small.
+    """
+
+    def __init__(self, engine: AsyncEngine, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        super().__init__(queue_size)
+        self.engine = engine
+        self._listener: asyncio.Task[None] | None = None
+        self._lost = asyncio.Event()  # set when the listening connection drops
+
+    async def publish(self, channel: str, messages: Sequence[str]) -> None:
+        # Delivered to this process's subscribers too, once the notification comes back
+        payloads = [json.dumps([channel, data]) for data in messages]
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(
+                    text(
+                        "SELECT pg_notify(:notify_channel, payload) "
+                        "FROM unnest(CAST(:payloads AS text[])) AS payload"
+                    ),
+                    {"notify_channel": NOTIFY_CHANNEL, "payloads": payloads},
+                )
+                await conn.commit()
+        except SQLAlchemyError:
+            logger.exception(f"Failed to publish {len(payloads)} events to {channel}")
+
+    def _on_notify(self, _connection: Any, _pid: int, _channel: str, payload: str) -> None:
+        channel, data = json.loads(payload)
+        self.deliver(channel, [data])
+
+    def _on_termination(self, _connection: Any) -> None:
+        self._lost.set()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.engine.connect() as conn:
+                    try:
+                        raw_connection = await conn.get_raw_connection()
+                        driver_connection: Any = raw_connection.driver_connection
+                        self._lost.clear()
+                        driver_connection.add_termination_listener(self._on_termination)
+                        await driver_connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                        # Whatever was published while not listening is gone
+                        self.miss_all()
+                        await self._lost.wait()
+                    finally:
+                        # Never hand a listening connection back to the pool
+                        await conn.invalidate()
+            except (OSError, SQLAlchemyError):
+                logger.exception("Event listener connection failed")
+            logger.warning(f"Event listener disconnected, reconnecting in {RECONNECT_DELAY}s")
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._listener
+        self._listener = None
@@ -0,0 +1,203 @@
+import csv
+import datetime
+import enum
+import io
+import re
+import zipfile
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from typing import Any
+from xml.sax.saxutils import escape
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+
+type Cell = str | int | float | bool | None
+type Cells = Sequence[Cell]
+
+CHUNK_SIZE = 64 * 1024  # in bytes
+
+# Spreadsheets take text starting with these for a formula, which would run user input
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Control characters aren't allowed in XML 1.0 at all
+_XML_ILLEGAL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = "</sheetData></worksheet>"
+
+
+class ExportFormat(enum.StrEnum):
+    CSV = "csv"
+    XLSX = "xlsx"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def to_cell(value: object) -> Cell:
+    match value:
+        case None | str() | int() | float():
+            return value
+        case enum.Enum():
+            return to_cell(value.value)
+        case datetime.datetime() | datetime.date():
+            return value.isoformat()
+        case _:
+            return str(value)
+
+
+async def pick_cells(rows: AsyncIterable[Row[Any]], columns: Sequence[str]) -> AsyncIterator[Cells]:
+    """Turn database rows into the cells of ``columns``, in that order."""
+    async for row in rows:
+        mapping = row._mapping
+        yield [to_cell(mapping[column]) for column in columns]
+
+
+def _csv_cell(value: Cell) -> Cell:
+    # The leading quote makes Excel read the cell as text; XLSX cells are always text already
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+async def csv_chunks(header: Cells, rows: AsyncIterable[Cells]) -> AsyncIterator[bytes]:
+    """Encode rows as CSV, yielding about ``CHUNK_SIZE`` bytes at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # The BOM makes Excel read the file as UTF-8 rather than the local code page
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    async for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+class _ZipSink:
+    """Write-only file for ``zipfile`` that hands out what has been written so far.
+
+    It has no ``tell``/``seek``, so ``zipfile`` writes entries with data descriptors instead of
+    going back to patch their headers.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _xlsx_cell(value: Cell) -> str:
+    match value:
+        case None:
+            return "<c/>"
+        case bool():
+            return f'<c t="b"><v>{int(value)}</v></c>'
+        case int() | float():
+            return f"<c><v>{value}</v></c>"
+        case _:
+            text = escape(_XML_ILLEGAL_RE.sub("", value))
+            return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(row: Cells) -> bytes:
+    return ("<row>" + "".join(_xlsx_cell(value) for value in row) + "</row>").encode()
+
+
+async def xlsx_chunks(header: Cells, rows: AsyncIterable[Cells]) -> AsyncIterator[bytes]:
+    """Encode rows as a single-sheet XLSX workbook, yielding about ``CHUNK_SIZE`` bytes at a time.
+
+    Cells are written as inline strings, so the sheet never needs to be held in memory to build
+    a shared strings table.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        workbook.writestr("_rels/.rels", _ROOT_RELS)
+        workbook.writestr("xl/workbook.xml", _WORKBOOK)
+        workbook.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with workbook.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(_SHEET_START.encode())
+            sheet.write(_xlsx_row(header))
+            async for row in rows:
+                sheet.write(_xlsx_row(row))
+                if len(sink) >= CHUNK_SIZE:
+                    yield sink.take()
+            sheet.write(_SHEET_END.encode())
+    yield sink.take()
+
+
+def export_response(
+    filename: str,
+    export_format: ExportFormat,
+    columns: Sequence[str],
+    rows: AsyncIterable[Row[Any]],
+) -> StreamingResponse:
+    """Stream ``columns`` of ``rows`` as a download named ``filename`` plus the format's extension.
+
+    Rows are read as the body is sent, so only about one chunk is held in memory at a time.
+    """
+    chunks = csv_chunks if export_format == ExportFormat.CSV else xlsx_chunks
+    return StreamingResponse(
+        chunks(columns, pick_cells(rows, columns)),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
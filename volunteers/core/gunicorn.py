@@ -0,0 +1,105 @@
+"""Gunicorn settings: ``gunicorn -c python:volunteers.core.gunicorn volunteers.app:app``.
+
+Workers are sized so that their connection pools together stay within
+``database.max_connections``.
+"""
+
+import os
+import shutil
+from typing import Any
+
+from loguru import logger
+from prometheus_client import multiprocess
+
+from volunteers.core.config import Config
+
+
+def connections_per_worker(config: Config) -> int:
+    """The most database connections a single worker process may hold."""
+    connections = config.database.pool_size + config.database.max_overflow
+    if config.events.broker == "postgres":
+        # The broker keeps one more connection listening outside of the pool's accounting
+        connections += 1
+    return connections
+
+
+def worker_count(config: Config, cpu_count: int) -> int:
+    """One worker per CPU unless configured, capped by the database connection budget.
+
+    Uvicorn workers serve many requests concurrently on an event loop, so more processes
+    than CPUs only add context switches and connections.
+    """
+    wanted = config.server.workers or cpu_count
+    fitting = max(1, config.database.max_connections // connections_per_worker(config))
+    if wanted > fitting:
+        logger.warning(
+            f"{wanted} workers would need up to {wanted * connections_per_worker(config)} "
+            f"database connections, starting {fitting} to stay within "
+            f"{config.database.max_connections}"
+        )
+    return min(wanted, fitting)
+
+
+_config = Config()
+# Set in the image: every process writes its metrics there and /metrics adds them up
+_metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+bind = f"{_config.server.host}:{_config.server.port}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = worker_count(_config, os.process_cpu_count() or 1)
+# The app is imported once in the master and shared copy-on-write by the forked workers
+preload_app = True
+# Workers are replaced after this many requests to cap slow leaks, at different times thanks
+# to the jitter, and finish the requests they are serving first
+max_requests = 10_000
+max_requests_jitter = 1_000
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+# Behind the proxy, rate limits must see the client's address rather than the proxy's
+forwarded_allow_ips = _config.server.forwarded_allow_ips
+
+
+def on_starting(server: Any) -> None:
+    if _metrics_dir:
+        # Metrics left by the workers of a previous run would be counted as well
+        shutil.rmtree(_metrics_dir, ignore_errors=True)
+        os.makedirs(_metrics_dir)
+
+
+def when_ready(server: Any) -> None:
+    if workers > 1 and _config.events.broker == "memory":
+        server.log.warning(
+            "Live events, revoked sessions and year and user edits only reach the worker they "
+            "were published in, so other workers accept revoked access tokens until they expire "
+            "and keep outdated year pages and users, admin rights included, until their cache "
+            "expires; set VOLUNTEERS_EVENTS__BROKER=postgres to relay them between workers"
+        )
+    if workers > 1 and not _metrics_dir:
+        server.log.warning(
+            "Every worker keeps metrics of its own and /metrics reports a random one, "
+            "set PROMETHEUS_MULTIPROC_DIR to add them up"
+        )
+    if workers > 1 and _config.rate_limit.store == "memory":
+        server.log.warning(
+            f"Every worker keeps rate limit budgets of its own, allowing up to {workers} times "
+            "as many requests; set VOLUNTEERS_RATE_LIMIT__STORE=postgres to share them"
+        )
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    # Pooled connections must never be shared between processes. The master shouldn't have
+    # opened any, but if it did, drop them without closing the parent's sockets.
+    from volunteers.app import container
+
+    primary = container.db()
+    primary.sync_engine.dispose(close=False)
+    replica = container.replica_db()
+    if replica is not primary:
+        replica.sync_engine.dispose(close=False)
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    if _metrics_dir:
+        # Gauges of live workers only; counters and histograms of this one keep counting
+        multiprocess.mark_process_dead(worker.pid, _metrics_dir)  # type: ignore[no-untyped-call]
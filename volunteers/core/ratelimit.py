@@ -0,0 +1,98 @@
+import datetime
+import time
+
+from loguru import logger
+from sqlalchemy import ColumnElement, Double, cast, delete, extract, func, select, true
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.core.cache import TTLCache
+from volunteers.core.config import RateLimitBudget
+from volunteers.models import RateLimitBucket
+
+BUCKET_CACHE_SIZE = 100_000
+PRUNE_INTERVAL = 60.0  # in seconds
+# Buckets untouched for that long are full again, unless a budget refills slower
+STALE_BUCKET_AGE = datetime.timedelta(hours=1)
+
+
+class RateLimitStore:
+    """Token buckets of the clients of this process.
+
+    A bucket holds up to ``budget.burst`` tokens and regains ``budget.refill_rate`` of them
+    per second; each request takes one. Full buckets are forgotten, so memory is only
+    spent on clients that made requests lately.
+    """
+
+    def __init__(self, maxsize: int = BUCKET_CACHE_SIZE) -> None:
+        # By key: tokens left and when they were counted
+        self._buckets: TTLCache[str, tuple[float, float]] = TTLCache(
+            "rate_limit_bucket", maxsize=maxsize, ttl=0
+        )
+
+    async def take(self, key: str, budget: RateLimitBudget) -> float:
+        """Take a token from the bucket of ``key``.
+
+        Returns 0 when the request may go on, or else the seconds until a token is back.
+        """
+        now = time.monotonic()
+        tokens, counted_at = self._buckets.get(key) or (budget.burst, now)
+        tokens = min(budget.burst, tokens + (now - counted_at) * budget.refill_rate)
+        if tokens < 1:
+            return (1 - tokens) / budget.refill_rate
+        tokens -= 1
+        self._buckets.set(key, (tokens, now), ttl=(budget.burst - tokens) / budget.refill_rate)
+        return 0.0
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """Token buckets in Postgres, shared by every worker process.
+
+    Taking a token is a single upsert on an unlogged table. Should the database fail, the
+    buckets of this process are used instead.
+    """
+
+    def __init__(self, engine: AsyncEngine, maxsize: int = BUCKET_CACHE_SIZE) -> None:
+        super().__init__(maxsize)
+        self.engine = engine
+        self._pruned_at = time.monotonic()
+
+    async def take(self, key: str, budget: RateLimitBudget) -> float:
+        tokens = _refilled_tokens(budget)
+        try:
+            async with self.engine.connect() as conn:
+                # Returns a row only if a token was taken
+                taken = await conn.scalar(
+                    insert(RateLimitBucket)
+                    .values(key=key, tokens=budget.burst - 1, updated_at=func.clock_timestamp())
+                    .on_conflict_do_update(
+                        index_elements=[RateLimitBucket.key],
+                        set_={"tokens": tokens - 1, "updated_at": func.clock_timestamp()},
+                        where=tokens >= 1,
+                    )
+                    .returning(true())
+                )
+                retry_after = None
+                if not taken:
+                    retry_after = await conn.scalar(
+                        select((1 - tokens) / budget.refill_rate).where(RateLimitBucket.key == key)
+                    )
+                if time.monotonic() - self._pruned_at > PRUNE_INTERVAL:
+                    self._pruned_at = time.monotonic()
+                    await conn.execute(
+                        delete(RateLimitBucket).where(
+                            RateLimitBucket.updated_at < func.clock_timestamp() - STALE_BUCKET_AGE
+                        )
+                    )
+                await conn.commit()
+        except SQLAlchemyError:
+            logger.exception("Failed to take a rate limit token, using the local bucket")
+            return await super().take(key, budget)
+        return max(0.0, retry_after or 0.0)
+
+
+def _refilled_tokens(budget: RateLimitBudget) -> ColumnElement[float]:
+    """Tokens of the stored bucket by now, on the database's clock shared by all workers."""
+    elapsed = cast(extract("epoch", func.clock_timestamp() - RateLimitBucket.updated_at), Double)
+    return func.least(budget.burst, RateLimitBucket.tokens + elapsed * budget.refill_rate)
@@ -5,7 +5,10 @@ __all__ = [
     "FormPositionAssociation",
     "Hall",
     "LegacyUser",
+    "OutboxNotification",
     "Position",
+    "RateLimitBucket",
+    "RefreshSession",
     "User",
     "UserDay",
     "Year",
@@ -18,7 +21,10 @@ from .models import (
     FormPositionAssociation,
     Hall,
     LegacyUser,
+    OutboxNotification,
     Position,
+    RateLimitBucket,
+    RefreshSession,
     User,
     UserDay,
     Year,
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import uuid
+from datetime import datetime
+
 from sqlalchemy import (
     BigInteger,
     Boolean,
+    DateTime,
     Double,
     Enum,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     UniqueConstraint,
+    Uuid,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -52,6 +59,12 @@ class User(Base, TimestampMixin):
         back_populates="user", cascade="all, delete-orphan"
     )
 
+    # Keyset pagination of the admin user lists, see ``USER_SORT_KEYS``
+    __table_args__ = (
+        Index("ix_users_last_name_ru_first_name_ru_id", "last_name_ru", "first_name_ru", "id"),
+        Index("ix_users_last_name_en_first_name_en_id", "last_name_en", "first_name_en", "id"),
+    )
+
 
 class ApplicationForm(Base, TimestampMixin):
     __tablename__ = "application_forms"
@@ -78,13 +91,15 @@ class ApplicationForm(Base, TimestampMixin):
 
     __table_args__ = (
         UniqueConstraint("year_id", "user_id", name="application_forms_unique_year_id_user_id"),
+        # The unique constraint covers lookups by year, this one covers lookups by user
+        Index("ix_application_forms_user_id_year_id", "user_id", "year_id"),
     )
 
 
 class Position(Base, TimestampMixin):
     __tablename__ = "positions"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    year_id: Mapped[int] = mapped_column(ForeignKey("years.id"))
+    year_id: Mapped[int] = mapped_column(ForeignKey("years.id"), index=True)
     name: Mapped[str] = mapped_column(String, unique=True)
     can_desire: Mapped[bool] = mapped_column(Boolean, default=False)
     has_halls: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -97,7 +112,9 @@ class Position(Base, TimestampMixin):
 class FormPositionAssociation(Base, TimestampMixin):
     __tablename__ = "application_form_position_association"
     form_id: Mapped[int] = mapped_column(ForeignKey("application_forms.id"), primary_key=True)
-    position_id: Mapped[int] = mapped_column(ForeignKey("positions.id"), primary_key=True)
+    position_id: Mapped[int] = mapped_column(
+        ForeignKey("positions.id"), primary_key=True, index=True
+    )
     year_id: Mapped[int] = mapped_column(ForeignKey("years.id"))
 
 
@@ -105,7 +122,7 @@ class Day(Base, TimestampMixin):
     __tablename__ = "days"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
-    year_id: Mapped[int] = mapped_column(ForeignKey("years.id"))
+    year_id: Mapped[int] = mapped_column(ForeignKey("years.id"), index=True)
     year: Mapped[Year] = relationship(back_populates="days")
 
     name: Mapped[str] = mapped_column(String)
@@ -130,7 +147,7 @@ class Hall(Base, TimestampMixin):
     __tablename__ = "halls"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
-    year_id: Mapped[int] = mapped_column(ForeignKey("years.id"))
+    year_id: Mapped[int] = mapped_column(ForeignKey("years.id"), index=True)
     year: Mapped[Year] = relationship(back_populates="halls")
 
     name: Mapped[str] = mapped_column(String)
@@ -148,10 +165,11 @@ class UserDay(Base, TimestampMixin):
     application_form_id: Mapped[int] = mapped_column(ForeignKey("application_forms.id"))
     application_form: Mapped[ApplicationForm] = relationship(back_populates="user_days")
 
-    day_id: Mapped[int] = mapped_column(ForeignKey("days.id"))
+    day_id: Mapped[int] = mapped_column(ForeignKey("days.id"), index=True)
     day: Mapped[Day] = relationship(back_populates="user_days")
 
     __table_args__ = (
+        # Also serves lookups by application form
         UniqueConstraint("application_form_id", "day_id", name="uq_user_day_application_form_day"),
     )
 
@@ -175,7 +193,7 @@ class Assessment(Base, TimestampMixin):
     __tablename__ = "assessments"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
-    user_day_id: Mapped[int] = mapped_column(ForeignKey("user_days.id"))
+    user_day_id: Mapped[int] = mapped_column(ForeignKey("user_days.id"), index=True)
     user_day: Mapped[UserDay] = relationship(back_populates="assessments")
 
     comment: Mapped[str] = mapped_column(String)
@@ -190,3 +208,44 @@ class LegacyUser(Base):
 
     email: Mapped[str] = mapped_column(String)
     password: Mapped[str] = mapped_column(String)
+
+
+class OutboxNotification(Base, TimestampMixin):
+    """Telegram notification waiting to be sent, see ``volunteers.bot.outbox``."""
+
+    __tablename__ = "notification_outbox"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    message: Mapped[str] = mapped_column(String)
+    # Set while a worker is sending the notification; stale claims are picked up again
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Set once sending the notification was given up on; it is kept but never claimed again
+    failed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class RefreshSession(Base, TimestampMixin):
+    """A login session: the family of refresh tokens rotated from one login.
+
+    Only the latest token of the family is valid; ``token_hash`` is the SHA-256 of its id.
+    See ``volunteers.services.refresh_token``.
+    """
+
+    __tablename__ = "refresh_sessions"
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class RateLimitBucket(Base):
+    """Requests a client has left under one rate limit budget, see ``core.ratelimit``.
+
+    Unlogged: the table skips the write-ahead log and is emptied after a crash, which only
+    hands out fresh budgets.
+    """
+
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}  # noqa: RUF012
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    tokens: Mapped[float] = mapped_column(Double)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
@@ -1,11 +1,27 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 
 class DayAssignmentItem(BaseModel):
     """Simplified day assignment item for user-facing API"""
 
+    user_day_id: int
     name: str
     telegram: str | None
     position: str
     hall: str | None
     # attendance: Attendance
+
+
+class DayAssignmentEvent(BaseModel):
+    """Change to the assignments of a day, pushed to live subscribers.
+
+    ``upsert`` carries the new state of an assignment, ``delete`` the id of a removed one and
+    ``reset`` asks to fetch the whole list again, e.g. after the day got (un)published.
+    """
+
+    type: Literal["upsert", "delete", "reset"]
+    assignment: DayAssignmentItem | None = None
+    user_day_id: int | None = None
+    published: bool | None = None  # whether the day's assignments are published, on resets
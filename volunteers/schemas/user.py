@@ -1,3 +1,5 @@
+from enum import StrEnum
+
 from pydantic import BaseModel
 
 
@@ -29,3 +31,23 @@ class UserUpdate(BaseModel):
     telegram_username: str | None = None
     is_admin: bool | None = None
     telegram_id: int | None = None
+
+
+DEFAULT_USER_PAGE_SIZE = 50
+MAX_USER_PAGE_SIZE = 500
+
+
+class UserSort(StrEnum):
+    ID = "id"
+    NAME_RU = "name_ru"  # by last name, then first name
+    NAME_EN = "name_en"
+
+
+class UserListQuery(BaseModel):
+    search: str | None = None  # words to find in names or the telegram username
+    registered: bool | None = None  # only for lists of a specific year
+    itmo_group: str | None = None  # only for lists of a specific year
+    sort: UserSort = UserSort.ID
+    descending: bool = False
+    limit: int | None = None  # every matching user when not set, for exports
+    cursor: str | None = None  # ``next_cursor`` of the previous page
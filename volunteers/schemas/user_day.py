@@ -19,5 +19,22 @@ class UserDayEditIn(BaseModel):
     hall_id: int | None
 
 
+class UserDayBatchAddIn(BaseModel):
+    application_form_id: int
+    information: str
+    attendance: Attendance
+    position_id: int
+    hall_id: int | None = None
+
+
+class UserDayBatchIn(BaseModel):
+    """Assignment changes for one day, applied together."""
+
+    day_id: int
+    add: list[UserDayBatchAddIn] = []
+    edit: dict[int, UserDayEditIn] = {}  # by user day id
+    delete: set[int] = set()
+
+
 class UserDayOut(UserDayIn):
     user_day_id: int
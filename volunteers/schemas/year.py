@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+from .day import DayOutUser
+from .position import PositionOut
 
 
 class YearIn(BaseModel):
@@ -13,3 +16,16 @@ class YearEditIn(BaseModel):
 
 class YearOut(YearIn):
     year_id: int
+
+
+class YearSnapshot(BaseModel):
+    """Part of a year that is the same for every volunteer, cached by ``YearService``."""
+
+    model_config = ConfigDict(frozen=True)
+
+    year_id: int
+    year_name: str
+    open_for_registration: bool
+    positions: tuple[PositionOut, ...]  # only the ones volunteers can desire
+    days: tuple[DayOutUser, ...]
+    version: str  # changes whenever any of the above does
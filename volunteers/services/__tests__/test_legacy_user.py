@@ -0,0 +1,100 @@
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+import bcrypt
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from volunteers.auth.providers.legacy import verify_legacy_user
+from volunteers.models import LegacyUser
+from volunteers.services.legacy_user import (
+    PASSWORD_ATTEMPT_WINDOW,
+    LegacyUserService,
+    TooManyPasswordAttempts,
+)
+
+
+def make_legacy_user(email: str, password: str, rounds: int = 4) -> LegacyUser:
+    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds))
+    return LegacyUser(email=email, password=hashed.decode())
+
+
+@pytest.mark.asyncio
+async def test_verify_password() -> None:
+    service = LegacyUserService()
+    legacy_user = make_legacy_user("ivan@example.com", "secret")
+
+    assert await service.verify_password(legacy_user, "secret")
+    assert not await service.verify_password(legacy_user, "guess")
+
+
+@pytest.mark.asyncio
+async def test_password_attempts_are_limited_per_email() -> None:
+    service = LegacyUserService(password_attempts=3)
+    legacy_user = make_legacy_user("ivan@example.com", "secret")
+    other_user = make_legacy_user("petr@example.com", "secret")
+
+    # A successful attempt starts the count over
+    assert not await service.verify_password(legacy_user, "guess")
+    assert not await service.verify_password(legacy_user, "guess")
+    assert await service.verify_password(legacy_user, "secret")
+
+    for _ in range(3):
+        assert not await service.verify_password(legacy_user, "guess")
+    with pytest.raises(TooManyPasswordAttempts) as exc_info:
+        await service.verify_password(legacy_user, "secret")
+    assert 0 < exc_info.value.retry_after <= PASSWORD_ATTEMPT_WINDOW
+
+    assert await service.verify_password(other_user, "secret")
+
+
+async def p99_while(client: AsyncClient, checks: Callable[[], Awaitable[object]]) -> float:
+    """p99 latency of another endpoint while ``checks`` run, in seconds."""
+    latencies: list[float] = []
+    running = asyncio.ensure_future(checks())
+    while not running.done():
+        started_at = time.perf_counter()
+        response = await client.get("/hc")
+        latencies.append(time.perf_counter() - started_at)
+        assert response.status_code == 200
+        # Let blocking checks get scheduled, as they would between requests of a worker
+        await asyncio.sleep(0)
+    await running
+    return statistics.quantiles(latencies, n=100)[98]
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_password_checks_keep_other_requests_fast() -> None:
+    from volunteers.app import app
+
+    service = LegacyUserService()
+    # The cost factor of real password hashes
+    legacy_users = [make_legacy_user(f"user{i}@example.com", "secret", rounds=12) for i in range(8)]
+
+    async def blocking() -> None:
+        async def check(legacy_user: LegacyUser) -> None:
+            verify_legacy_user("secret", legacy_user)
+
+        await asyncio.gather(*(check(legacy_user) for legacy_user in legacy_users))
+
+    async def offloaded() -> None:
+        await asyncio.gather(
+            *(service.verify_password(legacy_user, "secret") for legacy_user in legacy_users)
+        )
+
+    async def idle() -> None:
+        await asyncio.sleep(1)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        idle_p99 = await p99_while(client, idle)
+        blocking_p99 = await p99_while(client, blocking)
+        offloaded_p99 = await p99_while(client, offloaded)
+
+    # Only roughly: shared machines make timings noisy
+    assert offloaded_p99 < blocking_p99, (
+        f"GET /hc p99: {idle_p99 * 1000:.1f}ms idle, {blocking_p99 * 1000:.1f}ms during "
+        f"blocking password checks, {offloaded_p99 * 1000:.1f}ms during offloaded ones"
+    )
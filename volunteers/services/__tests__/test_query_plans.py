@@ -0,0 +1,214 @@
+"""Check that service lookups are served by indexes.
+
+Every query a service method emits is run through ``EXPLAIN`` against a seeded database and the
+test fails if the plan reads a whole table that holds more than ``SEQ_SCAN_THRESHOLD`` rows.
+Sequential scans and hash and merge joins are disabled while explaining, so that the planner only
+reads a table in full when no index fits, instead of because the test tables are small enough for
+that to be cheaper.
+Methods that list a whole table by design (``get_all_users`` and the like) aren't checked.
+"""
+
+import json
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.models import (
+    ApplicationForm,
+    Assessment,
+    Day,
+    FormPositionAssociation,
+    Hall,
+    Position,
+    User,
+    UserDay,
+    Year,
+)
+from volunteers.models.attendance import Attendance
+from volunteers.schemas.user import UserListQuery, UserSort
+
+SEQ_SCAN_THRESHOLD = 1000  # in rows
+
+YEARS = 50
+USERS = 1500
+FORMS_PER_USER = 4
+DAYS_PER_YEAR = 4
+POSITIONS_PER_YEAR = 5
+HALLS_PER_YEAR = 3
+
+
+async def seed_history(engine: AsyncEngine) -> None:
+    """Seed many years of forms, assignments and assessments, so lookups are selective."""
+    years = [
+        {"id": year_id, "year_name": str(2000 + year_id), "open_for_registration": False}
+        for year_id in range(1, YEARS + 1)
+    ]
+    days = [
+        {"id": (year_id - 1) * DAYS_PER_YEAR + i + 1, "year_id": year_id, "name": f"Day {i}"}
+        for year_id in range(1, YEARS + 1)
+        for i in range(DAYS_PER_YEAR)
+    ]
+    positions = [
+        {
+            "id": (year_id - 1) * POSITIONS_PER_YEAR + i + 1,
+            "year_id": year_id,
+            "name": f"Position {year_id}.{i}",
+        }
+        for year_id in range(1, YEARS + 1)
+        for i in range(POSITIONS_PER_YEAR)
+    ]
+    halls = [
+        {"id": (year_id - 1) * HALLS_PER_YEAR + i + 1, "year_id": year_id, "name": f"Hall {i}"}
+        for year_id in range(1, YEARS + 1)
+        for i in range(HALLS_PER_YEAR)
+    ]
+    users = [
+        {
+            "id": user_id,
+            "telegram_id": user_id,
+            "first_name_ru": f"Imya{user_id}",
+            "last_name_ru": f"Familiya{user_id}",
+            "first_name_en": f"Name{user_id}",
+            "last_name_en": f"Surname{user_id}",
+            "is_admin": False,
+        }
+        for user_id in range(1, USERS + 1)
+    ]
+    forms = [
+        {
+            "id": (user_id - 1) * FORMS_PER_USER + i + 1,
+            "user_id": user_id,
+            # Distinct years for every user, spread evenly over all years
+            "year_id": (user_id + i * (YEARS // FORMS_PER_USER)) % YEARS + 1,
+            "comments": "",
+        }
+        for user_id in range(1, USERS + 1)
+        for i in range(FORMS_PER_USER)
+    ]
+    desired_positions = [
+        {
+            "form_id": form["id"],
+            "position_id": (form["year_id"] - 1) * POSITIONS_PER_YEAR + 1,
+            "year_id": form["year_id"],
+        }
+        for form in forms
+    ]
+    user_days = [
+        {
+            "id": (form["id"] - 1) * 2 + i + 1,
+            "application_form_id": form["id"],
+            "day_id": (form["year_id"] - 1) * DAYS_PER_YEAR + i + 1,
+            "position_id": (form["year_id"] - 1) * POSITIONS_PER_YEAR + i + 1,
+            "information": "",
+            "attendance": Attendance.YES,
+        }
+        for form in forms
+        for i in range(2)
+    ]
+    assessments = [
+        {"user_day_id": user_day["id"], "comment": "", "value": 1.0} for user_day in user_days
+    ]
+
+    async with engine.begin() as conn:
+        for model, rows in [
+            (Year, years),
+            (Day, [{**day, "information": ""} for day in days]),
+            (Position, positions),
+            (Hall, halls),
+            (User, users),
+            (ApplicationForm, forms),
+            (FormPositionAssociation, desired_positions),
+            (UserDay, user_days),
+            (Assessment, assessments),
+        ]:
+            await conn.execute(insert(model), rows)
+    # Fresh statistics, otherwise the planner assumes the tables are tiny
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+
+def full_scans(plan: dict[str, Any], limited: bool = False) -> Iterator[str]:
+    """Yield the tables that ``plan`` reads in full, by a sequential or an unbounded index scan.
+
+    An index scan without a condition under a ``LIMIT`` reads the index in order and stops early,
+    unless something in between, like a sort, has to consume all of its rows first.
+    """
+    if plan["Node Type"] == "Limit":
+        limited = True
+    elif plan["Node Type"] in {"Sort", "Hash", "Aggregate"}:
+        limited = False
+    if plan["Node Type"] == "Seq Scan" or (
+        plan["Node Type"] in {"Index Scan", "Index Only Scan"}
+        and "Index Cond" not in plan
+        and not limited
+    ):
+        yield plan["Relation Name"]
+    for subplan in plan.get("Plans", []):
+        yield from full_scans(subplan, limited)
+
+
+ServiceCall = Callable[[Container], Awaitable[object]]
+
+CALLS: dict[str, ServiceCall] = {
+    "get_positions_by_year_id": lambda c: c.year_service().get_positions_by_year_id(7),
+    "get_days_by_year_id": lambda c: c.year_service().get_days_by_year_id(7),
+    "get_halls_by_year_id": lambda c: c.year_service().get_halls_by_year_id(7),
+    "get_form_by_year_id_and_user_id": (
+        lambda c: c.year_service().get_form_by_year_id_and_user_id(7, 6)
+    ),
+    "get_all_forms_by_year_id": lambda c: c.year_service().get_all_forms_by_year_id(7),
+    "get_all_assignments_by_year_id": lambda c: c.year_service().get_all_assignments_by_year_id(7),
+    "get_all_assignments_by_day_id": lambda c: c.year_service().get_all_assignments_by_day_id(25),
+    "get_users_experience": lambda c: c.year_service().get_users_experience({1, 2, 3}),
+    "get_user_by_id": lambda c: c.user_service().get_user_by_id(42),
+    "get_user_by_telegram_id": lambda c: c.user_service().get_user_by_telegram_id(42),
+    "get_users_page": lambda c: c.user_service().get_users_page(
+        UserListQuery(sort=UserSort.NAME_RU, limit=50)
+    ),
+    "get_users_with_registration_status": (
+        lambda c: c.user_service().get_users_with_registration_status(7, UserListQuery(limit=50))
+    ),
+}
+
+
+@pytest.mark.asyncio
+async def test_service_lookups_use_indexes(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    await seed_history(pg_engine)
+    async with pg_engine.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT relname, reltuples FROM pg_class "
+                "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+            )
+        )
+        table_rows: dict[str, float] = dict(result.tuples().all())
+    assert table_rows["user_days"] >= SEQ_SCAN_THRESHOLD  # the statistics are there
+
+    failures = []
+    for name, call in CALLS.items():
+        with count_queries(pg_engine) as queries:
+            await call(pg_container)
+        assert queries.count > 0
+
+        async with pg_engine.connect() as conn:
+            for setting in ["enable_seqscan", "enable_hashjoin", "enable_mergejoin"]:
+                await conn.exec_driver_sql(f"SET {setting} = off")
+            for statement, parameters in zip(queries.statements, queries.parameters, strict=True):
+                explained = await conn.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = explained.scalar_one()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                failures.extend(
+                    f"{name}: full scan of {table} ({table_rows[table]:.0f} rows) in {statement}"
+                    for table in full_scans(plan[0]["Plan"])
+                    if table_rows[table] > SEQ_SCAN_THRESHOLD
+                )
+
+    assert failures == []
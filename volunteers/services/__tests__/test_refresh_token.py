@@ -0,0 +1,162 @@
+import asyncio
+import datetime
+from collections.abc import Callable
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from volunteers.core.di import Container
+from volunteers.core.events import EventBroker, PostgresEventBroker
+from volunteers.models import RefreshSession
+from volunteers.services.__tests__.test_year_experience import seed_experience
+from volunteers.services.refresh_token import (
+    RefreshTokenReused,
+    RefreshTokenRevoked,
+    RefreshTokenService,
+)
+
+
+@pytest.mark.asyncio
+async def test_rotation_replaces_the_token(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    (user_id,) = await seed_experience(pg_engine, users_count=1)
+    service: RefreshTokenService = pg_container.refresh_token_service()
+
+    session_id, first = await service.start_session(user_id)
+    second = await service.rotate(session_id, first)
+    third = await service.rotate(session_id, second)
+
+    assert len({first, second, third}) == 3
+    assert not service.is_revoked(session_id)
+    async with async_sessionmaker(pg_engine)() as session:
+        row = (await session.scalars(select(RefreshSession))).one()
+    # Only a hash of the current token is stored
+    assert third.encode() not in row.token_hash
+    assert row.revoked_at is None
+
+
+@pytest.mark.asyncio
+async def test_reuse_revokes_the_session(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    (user_id,) = await seed_experience(pg_engine, users_count=1)
+    service: RefreshTokenService = pg_container.refresh_token_service()
+    session_id, first = await service.start_session(user_id)
+    other_session_id, other = await service.start_session(user_id)
+    second = await service.rotate(session_id, first)
+    await age_sessions(pg_engine, seconds=60)
+
+    with pytest.raises(RefreshTokenReused):
+        await service.rotate(session_id, first)
+    assert service.is_revoked(session_id)
+    # Nor does the legitimate holder get through anymore
+    with pytest.raises(RefreshTokenRevoked):
+        await service.rotate(session_id, second)
+
+    await service.rotate(other_session_id, other)
+    assert not service.is_revoked(other_session_id)
+
+
+async def age_sessions(engine: AsyncEngine, seconds: float) -> None:
+    """Move the last rotations of all sessions back in time."""
+    async with async_sessionmaker(engine)() as session:
+        await session.execute(
+            update(RefreshSession).values(
+                updated_at=func.now() - datetime.timedelta(seconds=seconds)
+            )
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_get_the_same_token(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    (user_id,) = await seed_experience(pg_engine, users_count=1)
+    service: RefreshTokenService = pg_container.refresh_token_service()
+    session_id, first = await service.start_session(user_id)
+
+    # Requests and tabs that hit an expired access token at once
+    second, again = await asyncio.gather(
+        service.rotate(session_id, first), service.rotate(session_id, first)
+    )
+    assert second == again
+    assert not service.is_revoked(session_id)
+    # A refresh that comes a bit later gets it too
+    assert await service.rotate(session_id, first) == second
+
+    third = await service.rotate(session_id, second)
+    assert third != second
+    # Older tokens than the one replaced last are reuse, however recent
+    with pytest.raises(RefreshTokenReused):
+        await service.rotate(session_id, first)
+    assert service.is_revoked(session_id)
+
+
+@pytest.mark.asyncio
+async def test_end_sessions(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    first_user_id, second_user_id = await seed_experience(pg_engine, users_count=2)
+    service: RefreshTokenService = pg_container.refresh_token_service()
+    first_sessions = [await service.start_session(first_user_id) for _ in range(3)]
+    other_session_id, other = await service.start_session(second_user_id)
+
+    await service.end_session(first_sessions[0][0])
+    assert await service.end_all_sessions(first_user_id) == 2
+
+    for session_id, token_id in first_sessions:
+        assert service.is_revoked(session_id)
+        with pytest.raises(RefreshTokenRevoked):
+            await service.rotate(session_id, token_id)
+    await service.rotate(other_session_id, other)
+
+    # Ended sessions are cleaned up at the next login
+    await service.start_session(first_user_id)
+    async with async_sessionmaker(pg_engine)() as session:
+        rows = (await session.scalars(select(RefreshSession))).all()
+    assert len(rows) == 2
+
+
+async def wait_until(predicate: Callable[[], bool], timeout: float = 5) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_revocations_reach_other_workers(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    (user_id,) = await seed_experience(pg_engine, users_count=1)
+    brokers = [PostgresEventBroker(pg_engine) for _ in range(2)]
+    workers = [RefreshTokenService(pg_container.config, broker) for broker in brokers]
+    for broker, worker in zip(brokers, workers, strict=True):
+        await broker.start()
+        worker.start()
+    try:
+        session_ids = [(await workers[0].start_session(user_id))[0] for _ in range(3)]
+        await workers[0].end_session(session_ids[0])
+        await wait_until(lambda: workers[1].is_revoked(session_ids[0]))
+        assert not workers[1].is_revoked(session_ids[1])
+
+        await workers[0].end_all_sessions(user_id)
+        await wait_until(lambda: all(workers[1].is_revoked(revoked) for revoked in session_ids))
+    finally:
+        for broker, worker in zip(brokers, workers, strict=True):
+            await worker.stop()
+            await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_started_worker_knows_recent_revocations(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    (user_id,) = await seed_experience(pg_engine, users_count=1)
+    service: RefreshTokenService = pg_container.refresh_token_service()
+    session_id, _ = await service.start_session(user_id)
+    await service.end_session(session_id)
+
+    # A worker started after the revocation, that never got the event
+    late_worker = RefreshTokenService(pg_container.config, EventBroker())
+    late_worker.start()
+    try:
+        await wait_until(lambda: late_worker.is_revoked(session_id))
+    finally:
+        await late_worker.stop()
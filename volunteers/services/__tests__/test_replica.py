@@ -0,0 +1,74 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.conftest import TEST_DATABASE_URL, count_queries
+from volunteers.core.db import create_engine, create_replica_engine, request_session_scope
+from volunteers.core.di import Container
+from volunteers.schemas.application_form import ApplicationFormIn
+from volunteers.services.__tests__.test_year_experience import seed_experience
+from volunteers.services.year import YearService
+
+
+@pytest.fixture
+async def replica(pg_engine: AsyncEngine, pg_container: Container) -> AsyncGenerator[AsyncEngine]:
+    # A second engine on the same database stands in for the replica
+    assert TEST_DATABASE_URL
+    replica = create_engine(TEST_DATABASE_URL)
+    pg_container.replica_db.override(replica)
+    pg_container.replica_session_maker.reset()
+    pg_container.wire(packages=["volunteers.services"])
+    yield replica
+    pg_container.replica_db.reset_override()
+    await replica.dispose()
+
+
+def test_replica_engine_defaults_to_primary() -> None:
+    primary = create_engine("postgresql+asyncpg://localhost/primary")
+    assert create_replica_engine(primary, None) is primary
+    assert create_replica_engine(primary, "postgresql+asyncpg://localhost/replica") is not primary
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(
+    pg_engine: AsyncEngine, pg_container: Container, replica: AsyncEngine
+) -> None:
+    await seed_experience(pg_engine, users_count=1)
+    year_service: YearService = pg_container.year_service()
+
+    with count_queries(pg_engine) as primary_queries, count_queries(replica) as replica_queries:
+        assert len(await year_service.get_years()) == 3
+        async with request_session_scope():
+            assert len(await year_service.get_days_by_year_id(2)) == 2
+        rows = [row async for row in year_service.stream_registrations(year_id=3)]
+
+    assert rows
+    assert primary_queries.count == 0
+    assert replica_queries.count == 3
+
+
+@pytest.mark.asyncio
+async def test_reads_stick_to_primary_after_commit(
+    pg_engine: AsyncEngine, pg_container: Container, replica: AsyncEngine
+) -> None:
+    user_ids = await seed_experience(pg_engine, users_count=1)
+    year_service: YearService = pg_container.year_service()
+    form_in = ApplicationFormIn(
+        year_id=3, user_id=user_ids[0], desired_positions_ids={2}, itmo_group=None
+    )
+
+    async with request_session_scope() as request_session:
+        with count_queries(replica) as before_write:
+            await year_service.get_form_by_year_id_and_user_id(year_id=3, user_id=user_ids[0])
+        await year_service.save_form(form_in)
+        assert request_session.committed
+        with count_queries(replica) as after_write:
+            form = await year_service.get_form_by_year_id_and_user_id(
+                year_id=3, user_id=user_ids[0]
+            )
+
+    assert before_write.count > 0
+    assert after_write.count == 0
+    assert form is not None
+    assert {position.id for position in form.desired_positions} == {2}
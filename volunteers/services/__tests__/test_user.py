@@ -5,8 +5,9 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from volunteers.core.events import EventBroker
 from volunteers.models import User
-from volunteers.schemas.user import UserIn
+from volunteers.schemas.user import UserIn, UserUpdate
 from volunteers.services.user import UserService
 
 
@@ -17,7 +18,7 @@ def mock_db() -> MagicMock:
 
 @pytest.fixture
 def user_service(mock_db: MagicMock) -> UserService:
-    return UserService(db=mock_db)
+    return UserService(EventBroker())
 
 
 def make_async_cm(mock_session: Any) -> Any:
@@ -95,3 +96,53 @@ async def test_create_user(user_service: UserService) -> None:
         assert result.is_admin == user_in.is_admin
         mock_session.add.assert_called_once_with(result)
         mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_cached_user_by_id_hits_database_once() -> None:
+    user_service = UserService(EventBroker())
+    dummy_user = User(id=7, first_name_ru="Имя", first_name_en="Name", is_admin=True)
+    with patch.object(
+        user_service, "get_user_by_id", AsyncMock(return_value=dummy_user)
+    ) as get_user_by_id:
+        first = await user_service.get_cached_user_by_id(7)
+        second = await user_service.get_cached_user_by_id(7)
+
+    get_user_by_id.assert_awaited_once_with(7)
+    assert first is dummy_user
+    assert second is not None
+    assert second is not dummy_user
+    assert second.id == 7
+    assert second.first_name_en == "Name"
+    assert second.is_admin is True
+
+
+@pytest.mark.asyncio
+async def test_get_cached_user_by_id_does_not_cache_missing_users() -> None:
+    user_service = UserService(EventBroker())
+    with patch.object(user_service, "get_user_by_id", AsyncMock(return_value=None)) as get:
+        assert await user_service.get_cached_user_by_id(7) is None
+        assert await user_service.get_cached_user_by_id(7) is None
+    assert get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_update_user_invalidates_cached_user() -> None:
+    user_service = UserService(EventBroker())
+    admin = User(id=7, first_name_en="Name", is_admin=True)
+    with patch.object(user_service, "get_user_by_id", AsyncMock(return_value=admin)):
+        await user_service.get_cached_user_by_id(7)
+
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = admin
+    mock_session = MagicMock()
+    mock_session.execute = AsyncMock(return_value=mock_result)
+    mock_session.commit = AsyncMock()
+    with patch.object(user_service, "session_scope", return_value=make_async_cm(mock_session)):
+        await user_service.update_user(7, UserUpdate(is_admin=False))
+
+    demoted = User(id=7, first_name_en="Name", is_admin=False)
+    with patch.object(user_service, "get_user_by_id", AsyncMock(return_value=demoted)):
+        user = await user_service.get_cached_user_by_id(7)
+    assert user is not None
+    assert user.is_admin is False
@@ -0,0 +1,193 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.models import ApplicationForm, User, Year
+from volunteers.schemas.user import UserListQuery, UserSort
+from volunteers.services.user import InvalidCursor, UserService
+
+# (first name, last name, telegram username, itmo group of the form in the current year)
+PEOPLE = [
+    ("Ivan", "Petrov", "ivan_p", "M3234"),
+    ("Anna", "Sidorova", "anna", "M3235"),
+    ("Petr", "Ivanov", "petya", None),
+    ("Olga", "Petrova", None, "M3234"),
+    ("Boris", "Abramov", "boris_100%", None),
+    ("Anna", "Abramova", "anna_a", "M3235"),
+]
+REGISTERED = {0, 1, 3, 5}
+
+
+async def seed_people(engine: AsyncEngine) -> tuple[int, list[int]]:
+    async with engine.begin() as conn:
+        year_id, other_year_id = (
+            await conn.execute(
+                insert(Year).returning(Year.id),
+                [
+                    {"year_name": "2025", "open_for_registration": True},
+                    {"year_name": "2024", "open_for_registration": False},
+                ],
+            )
+        ).scalars()
+        user_ids = list(
+            (
+                await conn.execute(
+                    insert(User).returning(User.id).execution_options(sort_by_parameter_order=True),
+                    [
+                        {
+                            "first_name_ru": f"Imya {first}",
+                            "last_name_ru": f"Familiya {last}",
+                            "first_name_en": first,
+                            "last_name_en": last,
+                            "telegram_username": username,
+                            "is_admin": False,
+                        }
+                        for first, last, username, _ in PEOPLE
+                    ],
+                )
+            ).scalars()
+        )
+        await conn.execute(
+            insert(ApplicationForm),
+            [
+                {"year_id": year_id, "user_id": user_ids[i], "itmo_group": group, "comments": ""}
+                for i, (_, _, _, group) in enumerate(PEOPLE)
+                if i in REGISTERED
+            ]
+            # Forms of other years must not count as registrations
+            + [
+                {
+                    "year_id": other_year_id,
+                    "user_id": user_id,
+                    "itmo_group": "M0000",
+                    "comments": "",
+                }
+                for user_id in user_ids
+            ],
+        )
+    return year_id, user_ids
+
+
+async def read_all_pages(
+    user_service: UserService, year_id: int, query: UserListQuery
+) -> list[list[tuple[str, bool, str | None]]]:
+    pages = []
+    cursor = None
+    while True:
+        page = await user_service.get_users_with_registration_status(
+            year_id, query.model_copy(update={"cursor": cursor})
+        )
+        pages.append(
+            [(user.last_name_en, registered, group) for user, registered, group in page.items]
+        )
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.asyncio
+async def test_registration_status(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    year_id, _ = await seed_people(pg_engine)
+    user_service: UserService = pg_container.user_service()
+
+    page = await user_service.get_users_with_registration_status(year_id)
+
+    assert page.next_cursor is None
+    assert [(user.first_name_en, registered, group) for user, registered, group in page.items] == [
+        ("Ivan", True, "M3234"),
+        ("Anna", True, "M3235"),
+        ("Petr", False, None),
+        ("Olga", True, "M3234"),
+        ("Boris", False, None),
+        ("Anna", True, "M3235"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    year_id, _ = await seed_people(pg_engine)
+    user_service: UserService = pg_container.user_service()
+
+    query = UserListQuery(sort=UserSort.NAME_EN, descending=True, limit=4)
+    with count_queries(pg_engine) as queries:
+        pages = await read_all_pages(user_service, year_id, query)
+
+    assert pages == [
+        [
+            ("Sidorova", True, "M3235"),
+            ("Petrova", True, "M3234"),
+            ("Petrov", True, "M3234"),
+            ("Ivanov", False, None),
+        ],
+        [("Abramova", True, "M3235"), ("Abramov", False, None)],
+    ]
+    assert queries.count == 2
+
+    query = UserListQuery(sort=UserSort.NAME_RU, limit=2)
+    assert await read_all_pages(user_service, year_id, query) == [
+        [("Abramov", False, None), ("Abramova", True, "M3235")],
+        [("Ivanov", False, None), ("Petrov", True, "M3234")],
+        [("Petrova", True, "M3234"), ("Sidorova", True, "M3235")],
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        (UserListQuery(search="anna"), ["Sidorova", "Abramova"]),
+        (UserListQuery(search="Anna abram"), ["Abramova"]),
+        (UserListQuery(search="@petya"), ["Ivanov"]),
+        (UserListQuery(search="familiya petr"), ["Petrov", "Ivanov", "Petrova"]),
+        (UserListQuery(search="100%"), ["Abramov"]),
+        (UserListQuery(search="_"), ["Petrov", "Abramov", "Abramova"]),
+        (UserListQuery(registered=False), ["Ivanov", "Abramov"]),
+        (UserListQuery(registered=True, itmo_group="M3235"), ["Sidorova", "Abramova"]),
+        (UserListQuery(registered=True, search="petr", limit=1), ["Petrov"]),
+    ],
+)
+async def test_filters(
+    pg_engine: AsyncEngine, pg_container: Container, query: UserListQuery, expected: list[str]
+) -> None:
+    year_id, _ = await seed_people(pg_engine)
+    user_service: UserService = pg_container.user_service()
+
+    page = await user_service.get_users_with_registration_status(year_id, query)
+
+    assert [user.last_name_en for user, _, _ in page.items] == expected
+
+
+@pytest.mark.asyncio
+async def test_users_page(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    await seed_people(pg_engine)
+    user_service: UserService = pg_container.user_service()
+
+    page = await user_service.get_users_page(UserListQuery(search="anna", limit=1))
+    assert [user.last_name_en for user in page.items] == ["Sidorova"]
+    assert page.next_cursor is not None
+
+    page = await user_service.get_users_page(
+        UserListQuery(search="anna", limit=1, cursor=page.next_cursor)
+    )
+    assert [user.last_name_en for user in page.items] == ["Abramova"]
+    assert page.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    await seed_people(pg_engine)
+    user_service: UserService = pg_container.user_service()
+    page = await user_service.get_users_page(UserListQuery(limit=1))
+    assert page.next_cursor is not None
+
+    for query in [
+        UserListQuery(limit=1, cursor="not a cursor"),
+        UserListQuery(limit=1, cursor="bm90IGpzb24="),  # not JSON
+        # A cursor only continues the order it was issued for
+        UserListQuery(limit=1, cursor=page.next_cursor, sort=UserSort.NAME_EN),
+        UserListQuery(limit=1, cursor=page.next_cursor, descending=True),
+    ]:
+        with pytest.raises(InvalidCursor):
+            await user_service.get_users_page(query)
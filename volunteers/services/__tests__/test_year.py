@@ -6,14 +6,12 @@ import pytest
 
 from volunteers.models import ApplicationForm, Assessment, Day, Position, UserDay, Year
 from volunteers.models.attendance import Attendance
-from volunteers.schemas.application_form import ApplicationFormIn
 from volunteers.schemas.assessment import AssessmentEditIn, AssessmentIn
 from volunteers.schemas.day import DayEditIn, DayIn
 from volunteers.schemas.position import PositionEditIn, PositionIn
 from volunteers.schemas.user_day import UserDayEditIn, UserDayIn
 from volunteers.schemas.year import YearEditIn, YearIn
 from volunteers.services.year import (
-    ApplicationFormNotFound,
     AssessmentNotFound,
     DayNotFound,
     PositionNotFound,
@@ -101,62 +99,6 @@ async def test_get_form_by_year_id_and_user_id(year_service: YearService) -> Non
         assert form == dummy_form
 
 
-@pytest.mark.asyncio
-async def test_create_form(year_service: YearService) -> None:
-    form_data: ApplicationFormIn = ApplicationFormIn(
-        year_id=1, user_id=2, itmo_group="A", comments="test", desired_positions_ids={7, 9}
-    )
-    mock_session: MagicMock = MagicMock()
-    mock_session.add = MagicMock()
-    mock_session.flush = AsyncMock()
-    mock_session.commit = AsyncMock()
-    with patch.object(year_service, "session_scope", return_value=make_async_cm(mock_session)):
-        await year_service.create_form(form_data)
-        assert mock_session.add.call_count == 1 + len(form_data.desired_positions_ids)
-        mock_session.flush.assert_awaited_once()
-        mock_session.commit.assert_awaited_once()
-
-
-@pytest.mark.asyncio
-async def test_update_form_success(year_service: YearService) -> None:
-    form_data: ApplicationFormIn = ApplicationFormIn(
-        year_id=1, user_id=2, itmo_group="G2", comments="updated", desired_positions_ids={4, 5}
-    )
-    dummy_form: ApplicationForm = ApplicationForm(
-        id=100, year_id=1, user_id=2, itmo_group="A", comments="old"
-    )
-    mock_result: MagicMock = MagicMock()
-    mock_result.scalar_one_or_none.return_value = dummy_form
-    mock_session: MagicMock = MagicMock()
-    mock_session.execute = AsyncMock(return_value=mock_result)
-    mock_session.flush = AsyncMock()
-    mock_session.commit = AsyncMock()
-    mock_session.add = MagicMock()
-    with patch.object(year_service, "session_scope", return_value=make_async_cm(mock_session)):
-        await year_service.update_form(form_data)
-        assert dummy_form.itmo_group == form_data.itmo_group
-        assert dummy_form.comments == form_data.comments
-        mock_session.flush.assert_awaited_once()
-        mock_session.commit.assert_awaited_once()
-        assert mock_session.add.call_count == len(form_data.desired_positions_ids)
-
-
-@pytest.mark.asyncio
-async def test_update_form_not_found(year_service: YearService) -> None:
-    form_data: ApplicationFormIn = ApplicationFormIn(
-        year_id=1, user_id=2, itmo_group="G2", comments="updated", desired_positions_ids={4, 5}
-    )
-    mock_result: MagicMock = MagicMock()
-    mock_result.scalar_one_or_none.return_value = None
-    mock_session: MagicMock = MagicMock()
-    mock_session.execute = AsyncMock(return_value=mock_result)
-    with (
-        patch.object(year_service, "session_scope", return_value=make_async_cm(mock_session)),
-        pytest.raises(ApplicationFormNotFound),
-    ):
-        await year_service.update_form(form_data)
-
-
 @pytest.mark.asyncio
 async def test_add_year(year_service: YearService) -> None:
     year_in = YearIn(year_name="2025", open_for_registration=True)
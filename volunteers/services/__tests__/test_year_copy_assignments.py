@@ -0,0 +1,201 @@
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.models import ApplicationForm, Assessment, Day, Position, User, UserDay, Year
+from volunteers.models.attendance import Attendance
+from volunteers.services.year import DayNotFound, SameDayCopy, YearService
+
+
+async def seed_days(engine: AsyncEngine, users_count: int) -> tuple[int, int, list[int]]:
+    """Seed a source day with one assignment per user and an empty target day."""
+    async with engine.begin() as conn:
+        year_id = await conn.scalar(
+            insert(Year).returning(Year.id), {"year_name": "2025", "open_for_registration": True}
+        )
+        position_id = await conn.scalar(
+            insert(Position).returning(Position.id),
+            {"year_id": year_id, "name": "Hall", "can_desire": True},
+        )
+        source_day_id, target_day_id = (
+            await conn.execute(
+                insert(Day).returning(Day.id),
+                [
+                    {"year_id": year_id, "name": "Practice", "information": ""},
+                    {"year_id": year_id, "name": "Finals", "information": ""},
+                ],
+            )
+        ).scalars()
+        user_ids = list(
+            (
+                await conn.execute(
+                    insert(User).returning(User.id),
+                    [
+                        {
+                            "first_name_ru": f"Имя{i}",
+                            "last_name_ru": f"Фамилия{i}",
+                            "first_name_en": f"Name{i}",
+                            "last_name_en": f"Surname{i}",
+                            "is_admin": False,
+                        }
+                        for i in range(users_count)
+                    ],
+                )
+            ).scalars()
+        )
+        form_ids = list(
+            (
+                await conn.execute(
+                    insert(ApplicationForm).returning(ApplicationForm.id),
+                    [
+                        {"year_id": year_id, "user_id": user_id, "comments": ""}
+                        for user_id in user_ids
+                    ],
+                )
+            ).scalars()
+        )
+        await conn.execute(
+            insert(UserDay),
+            [
+                {
+                    "application_form_id": form_id,
+                    "day_id": source_day_id,
+                    "position_id": position_id,
+                    "information": f"source {form_id}",
+                    "attendance": Attendance.YES,
+                }
+                for form_id in form_ids
+            ],
+        )
+    return source_day_id, target_day_id, form_ids
+
+
+async def add_target_assignment(engine: AsyncEngine, form_id: int, day_id: int) -> int:
+    async with engine.begin() as conn:
+        position_id = await conn.scalar(select(Position.id))
+        user_day_id = await conn.scalar(
+            insert(UserDay).returning(UserDay.id),
+            {
+                "application_form_id": form_id,
+                "day_id": day_id,
+                "position_id": position_id,
+                "information": "target",
+                "attendance": Attendance.UNKNOWN,
+            },
+        )
+        await conn.execute(
+            insert(Assessment), {"user_day_id": user_day_id, "comment": "Good", "value": 5.0}
+        )
+    assert user_day_id is not None
+    return user_day_id
+
+
+async def target_assignments(engine: AsyncEngine, day_id: int) -> dict[int, tuple[int, str]]:
+    async with engine.connect() as conn:
+        rows = await conn.execute(
+            select(UserDay.application_form_id, UserDay.id, UserDay.information).where(
+                UserDay.day_id == day_id
+            )
+        )
+    return {form_id: (user_day_id, information) for form_id, user_day_id, information in rows}
+
+
+@pytest.mark.asyncio
+async def test_copy_assignments_skips_existing(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    source_day_id, target_day_id, form_ids = await seed_days(pg_engine, users_count=3)
+    existing_id = await add_target_assignment(pg_engine, form_ids[0], target_day_id)
+    year_service: YearService = pg_container.year_service()
+
+    copied = await year_service.copy_assignments_from_day(source_day_id, target_day_id)
+
+    assert copied == 2
+    assignments = await target_assignments(pg_engine, target_day_id)
+    assert {form_id: information for form_id, (_, information) in assignments.items()} == {
+        form_ids[0]: "target",
+        form_ids[1]: f"source {form_ids[1]}",
+        form_ids[2]: f"source {form_ids[2]}",
+    }
+    assert assignments[form_ids[0]][0] == existing_id
+
+
+@pytest.mark.asyncio
+async def test_copy_assignments_overwrites_existing(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    source_day_id, target_day_id, form_ids = await seed_days(pg_engine, users_count=3)
+    existing_id = await add_target_assignment(pg_engine, form_ids[0], target_day_id)
+    year_service: YearService = pg_container.year_service()
+
+    copied = await year_service.copy_assignments_from_day(
+        source_day_id, target_day_id, overwrite_existing=True
+    )
+
+    assert copied == 3
+    assignments = await target_assignments(pg_engine, target_day_id)
+    assert {form_id: information for form_id, (_, information) in assignments.items()} == {
+        form_id: f"source {form_id}" for form_id in form_ids
+    }
+    # The overwritten assignment keeps its id, but not its attendance or assessments
+    assert assignments[form_ids[0]][0] == existing_id
+    async with pg_engine.connect() as conn:
+        attendance = await conn.scalar(select(UserDay.attendance).where(UserDay.id == existing_id))
+        assessments = await conn.scalar(
+            select(func.count(Assessment.id)).where(Assessment.user_day_id == existing_id)
+        )
+    assert attendance == Attendance.YES
+    assert assessments == 0
+
+
+@pytest.mark.asyncio
+async def test_copy_assignments_unknown_day(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    source_day_id, _, _ = await seed_days(pg_engine, users_count=1)
+    year_service: YearService = pg_container.year_service()
+
+    with pytest.raises(DayNotFound):
+        await year_service.copy_assignments_from_day(source_day_id, 12345)
+    with pytest.raises(DayNotFound):
+        await year_service.copy_assignments_from_day(12345, source_day_id)
+
+
+@pytest.mark.asyncio
+async def test_copy_assignments_to_same_day(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    source_day_id, _, _ = await seed_days(pg_engine, users_count=2)
+    year_service: YearService = pg_container.year_service()
+
+    with count_queries(pg_engine) as queries:
+        for overwrite_existing in (False, True):
+            with pytest.raises(SameDayCopy):
+                await year_service.copy_assignments_from_day(
+                    source_day_id, source_day_id, overwrite_existing=overwrite_existing
+                )
+    assert queries.count == 0
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_copy_assignments_benchmark(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    source_day_id, target_day_id, form_ids = await seed_days(pg_engine, users_count=5000)
+    year_service: YearService = pg_container.year_service()
+
+    with count_queries(pg_engine) as queries:
+        copied = await year_service.copy_assignments_from_day(source_day_id, target_day_id)
+
+    assert copied == 5000
+    assert len(await target_assignments(pg_engine, target_day_id)) == 5000
+    assert queries.count <= 3
+
+    with count_queries(pg_engine) as queries:
+        copied = await year_service.copy_assignments_from_day(
+            source_day_id, target_day_id, overwrite_existing=True
+        )
+    assert copied == 5000
+    assert queries.count <= 3
@@ -0,0 +1,181 @@
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.api.v1.admin.year.schemas import ExperienceItem
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.models import ApplicationForm, Assessment, Day, Position, User, UserDay, Year
+from volunteers.models.attendance import Attendance
+from volunteers.services.year import YearService
+
+
+async def seed_experience(engine: AsyncEngine, users_count: int) -> list[int]:
+    """Seed two past years of assignments and a current year of forms for ``users_count`` users."""
+    async with engine.begin() as conn:
+        year_ids = list(
+            (
+                await conn.execute(
+                    insert(Year).returning(Year.id),
+                    [
+                        {"year_name": "2023", "open_for_registration": False},
+                        {"year_name": "2024", "open_for_registration": False},
+                        {"year_name": "2025", "open_for_registration": True},
+                    ],
+                )
+            ).scalars()
+        )
+        position_ids = list(
+            (
+                await conn.execute(
+                    insert(Position).returning(Position.id),
+                    [
+                        {"year_id": year_ids[0], "name": "Hall", "can_desire": True},
+                        {"year_id": year_ids[1], "name": "Runner", "can_desire": True},
+                        {"year_id": year_ids[1], "name": "Printer", "can_desire": True},
+                    ],
+                )
+            ).scalars()
+        )
+        day_ids = list(
+            (
+                await conn.execute(
+                    insert(Day).returning(Day.id),
+                    [
+                        {"year_id": year_ids[0], "name": "Finals 2023", "information": ""},
+                        {"year_id": year_ids[1], "name": "Practice 2024", "information": ""},
+                        {"year_id": year_ids[1], "name": "Finals 2024", "information": ""},
+                    ],
+                )
+            ).scalars()
+        )
+        user_ids = list(
+            (
+                await conn.execute(
+                    insert(User).returning(User.id),
+                    [
+                        {
+                            "first_name_ru": f"Имя{i}",
+                            "last_name_ru": f"Фамилия{i}",
+                            "first_name_en": f"Name{i}",
+                            "last_name_en": f"Surname{i}",
+                            "is_admin": False,
+                        }
+                        for i in range(users_count)
+                    ],
+                )
+            ).scalars()
+        )
+        form_rows = (
+            await conn.execute(
+                insert(ApplicationForm).returning(
+                    ApplicationForm.id, ApplicationForm.user_id, ApplicationForm.year_id
+                ),
+                [
+                    {"year_id": year_id, "user_id": user_id, "comments": ""}
+                    for user_id in user_ids
+                    for year_id in year_ids
+                ],
+            )
+        ).all()
+        forms = {(user_id, year_id): form_id for form_id, user_id, year_id in form_rows}
+        user_day_ids = list(
+            (
+                await conn.execute(
+                    insert(UserDay).returning(UserDay.id),
+                    [
+                        row
+                        for user_id in user_ids
+                        for row in (
+                            {
+                                "application_form_id": forms[user_id, year_ids[0]],
+                                "day_id": day_ids[0],
+                                "position_id": position_ids[0],
+                                "information": "",
+                                "attendance": Attendance.YES,
+                            },
+                            {
+                                "application_form_id": forms[user_id, year_ids[1]],
+                                "day_id": day_ids[1],
+                                "position_id": position_ids[2],
+                                "information": "",
+                                "attendance": Attendance.LATE,
+                            },
+                            {
+                                "application_form_id": forms[user_id, year_ids[1]],
+                                "day_id": day_ids[2],
+                                "position_id": position_ids[1],
+                                "information": "",
+                                "attendance": Attendance.YES,
+                            },
+                        )
+                    ],
+                )
+            ).scalars()
+        )
+        await conn.execute(
+            insert(Assessment),
+            [
+                {"user_day_id": user_day_id, "comment": "Good", "value": 5.0}
+                for user_day_id in user_day_ids[::3]
+            ],
+        )
+    return user_ids
+
+
+@pytest.mark.asyncio
+async def test_get_users_experience(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    user_ids = await seed_experience(pg_engine, users_count=3)
+    year_service: YearService = pg_container.year_service()
+
+    experience_by_user = await year_service.get_users_experience(set(user_ids))
+
+    assert experience_by_user.keys() == set(user_ids)
+    assert experience_by_user[user_ids[0]] == [
+        ExperienceItem(
+            year_name="2023",
+            positions=["Hall"],
+            attendance_stats={Attendance.YES: 1},
+            assessments=["5.0: Good"],
+        ),
+        ExperienceItem(
+            year_name="2024",
+            positions=["Printer", "Runner"],
+            attendance_stats={Attendance.LATE: 1, Attendance.YES: 1},
+            assessments=[],
+        ),
+    ]
+    for user_id in user_ids:
+        assert await year_service.get_user_experience(user_id) == experience_by_user[user_id]
+
+
+@pytest.mark.asyncio
+async def test_get_users_experience_unknown_users(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    year_service: YearService = pg_container.year_service()
+
+    assert await year_service.get_users_experience(set()) == {}
+    assert await year_service.get_users_experience({12345}) == {}
+    assert await year_service.get_user_experience(12345) == []
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_get_users_experience_query_count_does_not_grow(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    user_ids = await seed_experience(pg_engine, users_count=3000)
+    year_service: YearService = pg_container.year_service()
+
+    with count_queries(pg_engine) as few:
+        await year_service.get_users_experience(set(user_ids[:10]))
+    with count_queries(pg_engine) as many:
+        experience_by_user = await year_service.get_users_experience(set(user_ids))
+
+    assert len(experience_by_user) == 3000
+    assert many.count == few.count <= 2
+
+    async with pg_engine.connect() as conn:
+        forms_count = len((await conn.execute(select(ApplicationForm.id))).all())
+    assert forms_count == 9000
@@ -0,0 +1,141 @@
+import csv
+import io
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.auth.deps import with_admin
+from volunteers.core.db import DB_POOL_CONNECTIONS_IN_USE
+from volunteers.core.di import Container
+from volunteers.models import ApplicationForm, FormPositionAssociation, Position, User
+from volunteers.schemas.user import UserListQuery, UserSort
+from volunteers.services.__tests__.test_year_experience import seed_experience
+from volunteers.services.user import UserService
+from volunteers.services.year import YearService
+
+XLSX_NAMESPACE = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+async def seed_export(engine: AsyncEngine) -> int:
+    """Seed two applicants to the current year, the first one with desired positions."""
+    user_ids = await seed_experience(engine, users_count=2)
+    async with engine.begin() as conn:
+        form_id = await conn.scalar(
+            select(ApplicationForm.id).where(
+                ApplicationForm.user_id == user_ids[0], ApplicationForm.year_id == 3
+            )
+        )
+        await conn.execute(
+            insert(FormPositionAssociation),
+            [
+                {"form_id": form_id, "position_id": position_id, "year_id": 3}
+                for position_id in (await conn.scalars(select(Position.id))).all()
+            ],
+        )
+    return 3
+
+
+@pytest.mark.asyncio
+async def test_stream_registrations(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    year_id = await seed_export(pg_engine)
+    year_service: YearService = pg_container.year_service()
+
+    rows = [row async for row in year_service.stream_registrations(year_id)]
+
+    assert [(row.first_name_en, row.desired_positions, row.previous_years) for row in rows] == [
+        ("Name0", "Hall, Printer, Runner", "2023, 2024"),
+        ("Name1", None, "2023, 2024"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_day_assignments(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    await seed_export(pg_engine)
+    year_service: YearService = pg_container.year_service()
+
+    rows = [row async for row in year_service.stream_day_assignments(day_id=2)]
+
+    assert [(row.first_name_en, row.position, row.hall, row.attendance) for row in rows] == [
+        ("Name0", "Printer", None, "late"),
+        ("Name1", "Printer", None, "late"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_users(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    await seed_export(pg_engine)
+    user_service: UserService = pg_container.user_service()
+
+    # Paging parameters are ignored, exports always contain every matching user
+    query = UserListQuery(search="name", sort=UserSort.NAME_EN, descending=True, limit=1)
+    rows = [row async for row in user_service.stream_users(query)]
+
+    assert [row.first_name_en for row in rows] == ["Name1", "Name0"]
+
+
+def read_xlsx(content: bytes) -> list[list[str | None]]:
+    with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+        sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))  # noqa: S314
+    return [
+        [cell.findtext(".//x:t", namespaces=XLSX_NAMESPACE) for cell in row]
+        for row in sheet.iterfind(".//x:row", XLSX_NAMESPACE)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_endpoints(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    # Not imported at module level: wiring the app container imports every test module
+    from volunteers.app import app
+
+    pg_container.wire(packages=["volunteers.services"])
+    year_id = await seed_export(pg_engine)
+    in_use_before = DB_POOL_CONNECTIONS_IN_USE._value.get()
+
+    async def _override_with_admin() -> User:
+        return User(id=1, is_admin=True)
+
+    app.dependency_overrides[with_admin] = _override_with_admin
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            registrations = await client.get(
+                f"/api/v1/admin/year/{year_id}/registration-forms/export"
+            )
+            assignments = await client.get(
+                "/api/v1/admin/user-day/day/2/assignments/export", params={"format": "xlsx"}
+            )
+            users = await client.get("/api/v1/admin/user/export", params={"search": "name1"})
+    finally:
+        app.dependency_overrides = {}
+
+    assert registrations.status_code == 200
+    assert registrations.headers["content-type"] == "text/csv; charset=utf-8"
+    assert registrations.headers["content-disposition"] == (
+        f'attachment; filename="registrations-{year_id}.csv"'
+    )
+    records = list(csv.DictReader(io.StringIO(registrations.content.decode("utf-8-sig"))))
+    assert [(record["first_name_en"], record["desired_positions"]) for record in records] == [
+        ("Name0", "Hall, Printer, Runner"),
+        ("Name1", ""),
+    ]
+
+    assert assignments.status_code == 200
+    assert assignments.headers["content-disposition"] == (
+        'attachment; filename="assignments-2.xlsx"'
+    )
+    sheet = read_xlsx(assignments.content)
+    assert sheet[0][:3] == ["user_day_id", "form_id", "user_id"]
+    assert [row[5:12] for row in sheet[1:]] == [
+        ["Name0", "Surname0", None, None, "Printer", None, "late"],
+        ["Name1", "Surname1", None, None, "Printer", None, "late"],
+    ]
+
+    assert users.status_code == 200
+    assert [record["first_name_en"] for record in csv.DictReader(io.StringIO(users.text))] == [
+        "Name1"
+    ]
+    # The streaming sessions gave their connections back
+    assert DB_POOL_CONNECTIONS_IN_USE._value.get() == in_use_before
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.auth.deps import with_user
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.models import ApplicationForm, FormPositionAssociation, User
+from volunteers.schemas.application_form import ApplicationFormIn
+from volunteers.services.__tests__.test_year_experience import seed_experience
+from volunteers.services.year import YearService
+
+
+async def desired_positions(engine: AsyncEngine, user_id: int) -> dict[int, object]:
+    """Position ids of the user's form of year 3, with when they were added."""
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(FormPositionAssociation.position_id, FormPositionAssociation.updated_at)
+            .join(ApplicationForm, ApplicationForm.id == FormPositionAssociation.form_id)
+            .where(ApplicationForm.year_id == 3, ApplicationForm.user_id == user_id)
+        )
+        return dict(result.tuples().all())
+
+
+async def delete_forms_of_year_3(engine: AsyncEngine) -> None:
+    """Drop the forms the seed gives everyone for the open year."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            delete(FormPositionAssociation).where(FormPositionAssociation.year_id == 3)
+        )
+        await conn.execute(delete(ApplicationForm).where(ApplicationForm.year_id == 3))
+
+
+@pytest.mark.asyncio
+async def test_save_form(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    user_ids = await seed_experience(pg_engine, users_count=1)
+    year_service: YearService = pg_container.year_service()
+    await delete_forms_of_year_3(pg_engine)
+    form_in = ApplicationFormIn(
+        year_id=3, user_id=user_ids[0], desired_positions_ids={1, 2}, itmo_group="M3100"
+    )
+
+    with count_queries(pg_engine) as created_queries:
+        assert await year_service.save_form(form_in)
+    before = await desired_positions(pg_engine, user_ids[0])
+
+    with count_queries(pg_engine) as updated_queries:
+        assert not await year_service.save_form(
+            form_in.model_copy(update={"desired_positions_ids": {2, 3}, "comments": "again"})
+        )
+    after = await desired_positions(pg_engine, user_ids[0])
+
+    assert created_queries.count == 2
+    assert updated_queries.count == 3
+    assert set(before) == {1, 2}
+    assert set(after) == {2, 3}
+    # The position kept is not written again
+    assert after[2] == before[2]
+    form = await year_service.get_form_by_year_id_and_user_id(year_id=3, user_id=user_ids[0])
+    assert form is not None
+    assert form.comments == "again"
+    assert form.itmo_group == "M3100"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_dont_conflict(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    user_ids = await seed_experience(pg_engine, users_count=1)
+    year_service: YearService = pg_container.year_service()
+    await delete_forms_of_year_3(pg_engine)
+    form_in = ApplicationFormIn(
+        year_id=3, user_id=user_ids[0], desired_positions_ids={2, 3}, itmo_group=None
+    )
+
+    created = await asyncio.gather(*(year_service.save_form(form_in) for _ in range(5)))
+
+    assert created.count(True) == 1
+    assert set(await desired_positions(pg_engine, user_ids[0])) == {2, 3}
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    # Not imported at module level: wiring the app container imports every test module
+    from volunteers.app import app
+
+    pg_container.wire(packages=["volunteers.services"])
+    user_ids = await seed_experience(pg_engine, users_count=1)
+    await delete_forms_of_year_3(pg_engine)
+
+    async def _override_with_user() -> User:
+        return User(id=user_ids[0], is_admin=False)
+
+    app.dependency_overrides[with_user] = _override_with_user
+    body = {"desired_positions_ids": [2], "itmo_group": None}
+    headers = {"Idempotency-Key": "form-3-first-save"}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.post("/api/v1/year/3", json=body, headers=headers)
+            with count_queries(pg_engine) as queries:
+                retried = await client.post("/api/v1/year/3", json=body, headers=headers)
+            without_key = await client.post("/api/v1/year/3", json=body)
+            reused = await client.post(
+                "/api/v1/year/3", json={**body, "desired_positions_ids": [3]}, headers=headers
+            )
+    finally:
+        app.dependency_overrides = {}
+
+    assert first.status_code == 201
+    assert retried.status_code == 201
+    assert queries.count == 0
+    assert without_key.status_code == 204
+    assert reused.status_code == 422
+    assert set(await desired_positions(pg_engine, user_ids[0])) == {2}
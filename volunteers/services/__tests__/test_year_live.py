@@ -0,0 +1,138 @@
+import json
+from typing import Any
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.core.di import Container
+from volunteers.core.events import EventBroker, Subscription
+from volunteers.models import User
+from volunteers.models.attendance import Attendance
+from volunteers.schemas.day import DayEditIn, DayIn
+from volunteers.schemas.user_day import (
+    UserDayBatchAddIn,
+    UserDayBatchIn,
+    UserDayEditIn,
+    UserDayIn,
+)
+from volunteers.services.__tests__.test_year_user_day_batch import seed_board
+from volunteers.services.year import YearService, day_assignments_channel
+
+
+async def read_events(subscription: Subscription, count: int) -> list[dict[str, Any]]:
+    events = []
+    for _ in range(count):
+        data = await subscription.get()
+        assert data is not None
+        events.append(json.loads(data))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_mutations_publish_events(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    board = await seed_board(pg_engine, users_count=4)
+    year_service: YearService = pg_container.year_service()
+    broker: EventBroker = pg_container.event_broker()
+    author = User(telegram_username="admin")
+
+    with broker.subscribe(day_assignments_channel(board.day_id)) as subscription:
+        user_day = await year_service.add_user_day(
+            UserDayIn(
+                application_form_id=board.form_ids[2],
+                day_id=board.day_id,
+                information="",
+                attendance=Attendance.UNKNOWN,
+                position_id=board.runner_id,
+            ),
+            author=author,
+        )
+        await year_service.edit_user_day_by_user_day_id(
+            user_day.id,
+            UserDayEditIn(
+                information=None,
+                attendance=None,
+                position_id=board.hall_position_id,
+                hall_id=board.hall_id,
+            ),
+            author=author,
+        )
+        await year_service.delete_user_day_by_user_day_id(user_day.id, author=author)
+
+        assert await read_events(subscription, 3) == [
+            {
+                "type": "upsert",
+                "assignment": {
+                    "user_day_id": user_day.id,
+                    "name": "Name2 Surname2",
+                    "telegram": "user2",
+                    "position": "Runner",
+                },
+            },
+            {
+                "type": "upsert",
+                "assignment": {
+                    "user_day_id": user_day.id,
+                    "name": "Name2 Surname2",
+                    "telegram": "user2",
+                    "position": "Hall",
+                    "hall": "Main",
+                },
+            },
+            {"type": "delete", "user_day_id": user_day.id},
+        ]
+
+        added = await year_service.apply_user_day_batch(
+            UserDayBatchIn(
+                day_id=board.day_id,
+                add=[
+                    UserDayBatchAddIn(
+                        application_form_id=board.form_ids[3],
+                        information="",
+                        attendance=Attendance.UNKNOWN,
+                        position_id=board.runner_id,
+                    )
+                ],
+                edit={
+                    board.user_day_ids[1]: UserDayEditIn(
+                        information=None,
+                        attendance=None,
+                        position_id=board.hall_position_id,
+                        hall_id=board.hall_id,
+                    )
+                },
+                delete={board.user_day_ids[0]},
+            ),
+            author=author,
+        )
+        assert [
+            (event["type"], event.get("user_day_id") or event["assignment"]["user_day_id"])
+            for event in await read_events(subscription, 3)
+        ] == [
+            ("delete", board.user_day_ids[0]),
+            ("upsert", board.user_day_ids[1]),
+            ("upsert", added[0].id),
+        ]
+
+        day_edit_in = DayEditIn(
+            name=None, information=None, score=None, mandatory=None, assignment_published=True
+        )
+        await year_service.edit_day_by_day_id(board.day_id, day_edit_in)
+        # Unchanged publication status isn't announced again
+        await year_service.edit_day_by_day_id(board.day_id, day_edit_in)
+        # Nor is a copy that copies nothing
+        day = await year_service.get_day_by_id(board.day_id)
+        assert day is not None
+        empty_day = await year_service.add_day(
+            DayIn(
+                year_id=day.year_id,
+                name="Empty",
+                information="",
+                score=0,
+                mandatory=False,
+                assignment_published=False,
+            )
+        )
+        await year_service.copy_assignments_from_day(empty_day.id, board.day_id)
+
+        assert await read_events(subscription, 1) == [{"type": "reset", "published": True}]
+        assert not subscription._events
@@ -0,0 +1,173 @@
+import asyncio
+import contextlib
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.core.events import PostgresEventBroker
+from volunteers.models import Day, Position, Year
+from volunteers.schemas.day import DayEditIn, DayIn
+from volunteers.schemas.position import PositionEditIn, PositionIn
+from volunteers.schemas.year import YearEditIn
+from volunteers.services.__tests__.test_refresh_token import wait_until
+from volunteers.services.year import YearService
+
+
+async def seed_year(engine: AsyncEngine) -> tuple[int, int, int]:
+    async with engine.begin() as conn:
+        year_id = await conn.scalar(
+            insert(Year).returning(Year.id),
+            [{"year_name": "2025", "open_for_registration": False}],
+        )
+        position_id = await conn.scalar(
+            insert(Position).returning(Position.id),
+            [
+                {"year_id": year_id, "name": "Runner", "can_desire": True},
+                {"year_id": year_id, "name": "Coordinator", "can_desire": False},
+            ],
+        )
+        day_id = await conn.scalar(
+            insert(Day).returning(Day.id),
+            [{"year_id": year_id, "name": "Finals", "information": ""}],
+        )
+    assert year_id is not None
+    assert position_id is not None
+    assert day_id is not None
+    return year_id, position_id, day_id
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_cached(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    year_id, _, _ = await seed_year(pg_engine)
+    year_service: YearService = pg_container.year_service()
+
+    snapshot = await year_service.get_year_snapshot(year_id)
+    assert snapshot is not None
+    assert (snapshot.year_name, snapshot.open_for_registration) == ("2025", False)
+    assert [position.name for position in snapshot.positions] == ["Runner"]
+    assert [day.name for day in snapshot.days] == ["Finals"]
+
+    with count_queries(pg_engine) as queries:
+        assert await year_service.get_year_snapshot(year_id) is snapshot
+    assert queries.count == 0
+
+    # Missing years aren't cached, they may be created later
+    assert await year_service.get_year_snapshot(year_id + 1) is None
+    assert len(year_service._year_snapshots) == 1
+
+
+@pytest.mark.asyncio
+async def test_mutators_invalidate_snapshot(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    year_id, position_id, day_id = await seed_year(pg_engine)
+    year_service: YearService = pg_container.year_service()
+
+    async def read_snapshot() -> tuple[bool, list[str], list[str]]:
+        snapshot = await year_service.get_year_snapshot(year_id)
+        assert snapshot is not None
+        return (
+            snapshot.open_for_registration,
+            [position.name for position in snapshot.positions],
+            [day.name for day in snapshot.days],
+        )
+
+    await read_snapshot()
+    await year_service.edit_year_by_year_id(
+        year_id, YearEditIn(year_name=None, open_for_registration=True)
+    )
+    assert await read_snapshot() == (True, ["Runner"], ["Finals"])
+
+    await year_service.add_position(
+        PositionIn(year_id=year_id, name="Hall", can_desire=True, has_halls=True)
+    )
+    assert await read_snapshot() == (True, ["Runner", "Hall"], ["Finals"])
+
+    await year_service.edit_position_by_position_id(
+        position_id, PositionEditIn(name=None, can_desire=False, has_halls=None)
+    )
+    assert await read_snapshot() == (True, ["Hall"], ["Finals"])
+
+    await year_service.add_day(
+        DayIn(
+            year_id=year_id,
+            name="Practice",
+            information="",
+            score=1,
+            mandatory=False,
+            assignment_published=False,
+        )
+    )
+    assert await read_snapshot() == (True, ["Hall"], ["Finals", "Practice"])
+
+    await year_service.edit_day_by_day_id(
+        day_id,
+        DayEditIn(
+            name="Grand finals",
+            information=None,
+            score=None,
+            mandatory=None,
+            assignment_published=None,
+        ),
+    )
+    assert await read_snapshot() == (True, ["Hall"], ["Grand finals", "Practice"])
+
+
+@pytest.mark.asyncio
+async def test_load_racing_with_edit_is_not_cached(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    year_id, _, _ = await seed_year(pg_engine)
+    year_service: YearService = pg_container.year_service()
+
+    def edit_committed(*_: object) -> None:
+        year_service.invalidate_year_snapshot(year_id)
+
+    # An admin edit lands while the snapshot is being read
+    event.listen(pg_engine.sync_engine, "before_cursor_execute", edit_committed, once=True)
+    assert await year_service.get_year_snapshot(year_id) is not None
+
+    assert len(year_service._year_snapshots) == 0
+
+
+async def wait_listening(publisher: PostgresEventBroker, listener: PostgresEventBroker) -> None:
+    """Wait until the events of one broker reach the other."""
+    with listener.subscribe("probe") as subscription:
+        async with asyncio.timeout(5):
+            while True:
+                await publisher.publish("probe", ["ping"])
+                with contextlib.suppress(TimeoutError):
+                    if await asyncio.wait_for(subscription.get(), 0.1) == "ping":
+                        return
+
+
+@pytest.mark.asyncio
+async def test_edits_invalidate_snapshot_of_other_workers(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    year_id, _, _ = await seed_year(pg_engine)
+    brokers = [PostgresEventBroker(pg_engine) for _ in range(2)]
+    workers = [YearService(pg_container.notification_outbox(), broker) for broker in brokers]
+    for broker, worker in zip(brokers, workers, strict=True):
+        await broker.start()
+        worker.start()
+    try:
+        await wait_listening(brokers[0], brokers[1])
+        snapshot = await workers[1].get_year_snapshot(year_id)
+        assert snapshot is not None
+        assert not snapshot.open_for_registration
+
+        await workers[0].edit_year_by_year_id(
+            year_id, YearEditIn(year_name=None, open_for_registration=True)
+        )
+        await wait_until(lambda: len(workers[1]._year_snapshots) == 0)
+        snapshot = await workers[1].get_year_snapshot(year_id)
+        assert snapshot is not None
+        assert snapshot.open_for_registration
+    finally:
+        for broker, worker in zip(brokers, workers, strict=True):
+            await worker.stop()
+            await broker.stop()
@@ -0,0 +1,86 @@
+from typing import cast
+from unittest.mock import AsyncMock, call
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.models import User
+from volunteers.models.attendance import Attendance
+from volunteers.schemas.user_day import UserDayEditIn, UserDayIn
+from volunteers.services.__tests__.test_year_user_day_batch import assignments, seed_board
+from volunteers.services.year import HallNotFound, YearService
+
+
+@pytest.mark.asyncio
+async def test_user_day_mutations(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    board = await seed_board(pg_engine, users_count=4)
+    year_service: YearService = pg_container.year_service()
+    author = User(telegram_username="admin")
+
+    with count_queries(pg_engine) as added_queries:
+        user_day = await year_service.add_user_day(
+            UserDayIn(
+                application_form_id=board.form_ids[2],
+                day_id=board.day_id,
+                information="",
+                attendance=Attendance.UNKNOWN,
+                position_id=board.hall_position_id,
+                hall_id=board.hall_id,
+            ),
+            author=author,
+        )
+    with count_queries(pg_engine) as edited_queries:
+        await year_service.edit_user_day_by_user_day_id(
+            user_day.id,
+            UserDayEditIn(
+                information=None, attendance=None, position_id=board.runner_id, hall_id=None
+            ),
+            author=author,
+        )
+    # The user day outlives losing its hall
+    assert (await assignments(pg_engine, board.day_id))[board.form_ids[2]] == (
+        board.runner_id,
+        None,
+    )
+    with count_queries(pg_engine) as deleted_queries:
+        await year_service.delete_user_day_by_user_day_id(user_day.id, author=author)
+
+    # The user day's context comes with a single query
+    assert added_queries.count == 2
+    assert edited_queries.count == 2
+    # And deleting it looks for its assessments
+    assert deleted_queries.count == 3
+    assert board.form_ids[2] not in await assignments(pg_engine, board.day_id)
+    outbox = cast(AsyncMock, pg_container.notification_outbox())
+    assert outbox.notify.await_args_list == [
+        call("[Finals] Imya2 Familiya2 (@user2) \n(unassigned) -> Hall Main\n(by @admin)"),
+        call("[Finals] Imya2 Familiya2 (@user2)\nHall Main -> Runner \n(by @admin)"),
+        call("[Finals] Imya2 Familiya2 (@user2)\nRunner  -> (unassigned)\n(by @admin)"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_edit_user_day_to_unknown_hall(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    board = await seed_board(pg_engine, users_count=2)
+    year_service: YearService = pg_container.year_service()
+
+    with pytest.raises(HallNotFound):
+        await year_service.edit_user_day_by_user_day_id(
+            board.user_day_ids[0],
+            UserDayEditIn(
+                information=None,
+                attendance=None,
+                position_id=board.hall_position_id,
+                hall_id=12345,
+            ),
+            author=User(telegram_username="admin"),
+        )
+
+    assert (await assignments(pg_engine, board.day_id))[board.form_ids[0]] == (
+        board.runner_id,
+        None,
+    )
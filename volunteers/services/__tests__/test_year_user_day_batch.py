@@ -0,0 +1,371 @@
+import asyncio
+from dataclasses import dataclass
+from typing import cast
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.models import ApplicationForm, Day, Hall, Position, User, UserDay, Year
+from volunteers.models.attendance import Attendance
+from volunteers.schemas.user_day import UserDayBatchAddIn, UserDayBatchIn, UserDayEditIn
+from volunteers.services.year import (
+    HallNotFound,
+    PositionNotFound,
+    UserDayAlreadyExists,
+    UserDayNotFound,
+    YearService,
+)
+
+
+@dataclass
+class Board:
+    day_id: int
+    runner_id: int
+    hall_position_id: int
+    hall_id: int
+    other_year_position_id: int
+    form_ids: list[int]
+    user_day_ids: list[int]  # assignments of the first half of the forms
+
+
+async def seed_board(engine: AsyncEngine, users_count: int) -> Board:
+    async with engine.begin() as conn:
+        year_id, other_year_id = (
+            await conn.execute(
+                insert(Year).returning(Year.id),
+                [
+                    {"year_name": "2025", "open_for_registration": True},
+                    {"year_name": "2024", "open_for_registration": False},
+                ],
+            )
+        ).scalars()
+        runner_id, hall_position_id, other_year_position_id = (
+            await conn.execute(
+                insert(Position).returning(Position.id),
+                [
+                    {"year_id": year_id, "name": "Runner", "has_halls": False},
+                    {"year_id": year_id, "name": "Hall", "has_halls": True},
+                    {"year_id": other_year_id, "name": "Old runner", "has_halls": False},
+                ],
+            )
+        ).scalars()
+        hall_id = await conn.scalar(
+            insert(Hall).returning(Hall.id), {"year_id": year_id, "name": "Main"}
+        )
+        day_id = await conn.scalar(
+            insert(Day).returning(Day.id),
+            {"year_id": year_id, "name": "Finals", "information": ""},
+        )
+        user_ids = list(
+            (
+                await conn.execute(
+                    insert(User).returning(User.id),
+                    [
+                        {
+                            "first_name_ru": f"Imya{i}",
+                            "last_name_ru": f"Familiya{i}",
+                            "first_name_en": f"Name{i}",
+                            "last_name_en": f"Surname{i}",
+                            "telegram_username": f"user{i}",
+                            "is_admin": False,
+                        }
+                        for i in range(users_count)
+                    ],
+                )
+            ).scalars()
+        )
+        form_ids = list(
+            (
+                await conn.execute(
+                    insert(ApplicationForm).returning(ApplicationForm.id),
+                    [
+                        {"year_id": year_id, "user_id": user_id, "comments": ""}
+                        for user_id in user_ids
+                    ],
+                )
+            ).scalars()
+        )
+        user_day_ids = list(
+            (
+                await conn.execute(
+                    insert(UserDay).returning(UserDay.id),
+                    [
+                        {
+                            "application_form_id": form_id,
+                            "day_id": day_id,
+                            "position_id": runner_id,
+                            "information": "",
+                            "attendance": Attendance.UNKNOWN,
+                        }
+                        for form_id in form_ids[: users_count // 2]
+                    ],
+                )
+            ).scalars()
+        )
+    assert day_id is not None
+    assert hall_id is not None
+    return Board(
+        day_id=day_id,
+        runner_id=runner_id,
+        hall_position_id=hall_position_id,
+        hall_id=hall_id,
+        other_year_position_id=other_year_position_id,
+        form_ids=form_ids,
+        user_day_ids=user_day_ids,
+    )
+
+
+async def assignments(engine: AsyncEngine, day_id: int) -> dict[int, tuple[int, int | None]]:
+    async with engine.connect() as conn:
+        rows = await conn.execute(
+            select(UserDay.application_form_id, UserDay.position_id, UserDay.hall_id).where(
+                UserDay.day_id == day_id
+            )
+        )
+    return {form_id: (position_id, hall_id) for form_id, position_id, hall_id in rows}
+
+
+@pytest.mark.asyncio
+async def test_apply_user_day_batch(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    board = await seed_board(pg_engine, users_count=4)
+    year_service: YearService = pg_container.year_service()
+    author = User(telegram_username="admin")
+
+    added = await year_service.apply_user_day_batch(
+        UserDayBatchIn(
+            day_id=board.day_id,
+            add=[
+                UserDayBatchAddIn(
+                    application_form_id=board.form_ids[0],
+                    information="",
+                    attendance=Attendance.UNKNOWN,
+                    position_id=board.hall_position_id,
+                    hall_id=board.hall_id,
+                ),
+                UserDayBatchAddIn(
+                    application_form_id=board.form_ids[2],
+                    information="",
+                    attendance=Attendance.UNKNOWN,
+                    position_id=board.runner_id,
+                ),
+            ],
+            edit={
+                board.user_day_ids[1]: UserDayEditIn(
+                    information=None,
+                    attendance=Attendance.YES,
+                    position_id=board.hall_position_id,
+                    hall_id=board.hall_id,
+                )
+            },
+            # Freeing the first form lets it be re-added in the same batch
+            delete={board.user_day_ids[0]},
+        ),
+        author=author,
+    )
+
+    assert [user_day.application_form_id for user_day in added] == [
+        board.form_ids[0],
+        board.form_ids[2],
+    ]
+    assert await assignments(pg_engine, board.day_id) == {
+        board.form_ids[0]: (board.hall_position_id, board.hall_id),
+        board.form_ids[1]: (board.hall_position_id, board.hall_id),
+        board.form_ids[2]: (board.runner_id, None),
+    }
+
+    outbox = cast(AsyncMock, pg_container.notification_outbox())
+    outbox.notify.assert_awaited_once_with(
+        "[Finals] 2 added, 1 changed, 1 removed (by @admin)\n"
+        "Imya0 Familiya0 (@user0): Runner -> (unassigned)\n"
+        "Imya1 Familiya1 (@user1): Runner -> Hall Main\n"
+        "Imya0 Familiya0 (@user0): (unassigned) -> Hall Main\n"
+        "Imya2 Familiya2 (@user2): (unassigned) -> Runner"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("change", "error"),
+    [
+        ({"position_id": "other_year_position_id"}, PositionNotFound),
+        ({"hall_id": "hall_id"}, HallNotFound),
+        ({"user_day_id": 12345}, UserDayNotFound),
+    ],
+)
+async def test_apply_user_day_batch_is_atomic(
+    pg_engine: AsyncEngine,
+    pg_container: Container,
+    change: dict[str, str | int],
+    error: type[Exception],
+) -> None:
+    board = await seed_board(pg_engine, users_count=4)
+    year_service: YearService = pg_container.year_service()
+    before = await assignments(pg_engine, board.day_id)
+
+    edited_id = change.get("user_day_id", board.user_day_ids[1])
+    position_id = getattr(board, str(change.get("position_id", "runner_id")))
+    hall_id = getattr(board, str(change["hall_id"])) if "hall_id" in change else None
+    with pytest.raises(error):
+        await year_service.apply_user_day_batch(
+            UserDayBatchIn(
+                day_id=board.day_id,
+                add=[
+                    UserDayBatchAddIn(
+                        application_form_id=board.form_ids[3],
+                        information="",
+                        attendance=Attendance.UNKNOWN,
+                        position_id=board.runner_id,
+                    )
+                ],
+                edit={
+                    int(edited_id): UserDayEditIn(
+                        information=None, attendance=None, position_id=position_id, hall_id=hall_id
+                    )
+                },
+                delete={board.user_day_ids[0]},
+            ),
+            author=User(telegram_username="admin"),
+        )
+
+    assert await assignments(pg_engine, board.day_id) == before
+    cast(AsyncMock, pg_container.notification_outbox()).notify.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_apply_user_day_batch_adds_assigned_form(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    board = await seed_board(pg_engine, users_count=4)
+    year_service: YearService = pg_container.year_service()
+    before = await assignments(pg_engine, board.day_id)
+
+    # The first form is freed by the batch, the second one is not
+    with pytest.raises(UserDayAlreadyExists):
+        await year_service.apply_user_day_batch(
+            UserDayBatchIn(
+                day_id=board.day_id,
+                add=[
+                    UserDayBatchAddIn(
+                        application_form_id=form_id,
+                        information="",
+                        attendance=Attendance.UNKNOWN,
+                        position_id=board.runner_id,
+                    )
+                    for form_id in board.form_ids[:2]
+                ],
+                delete={board.user_day_ids[0]},
+            ),
+            author=User(telegram_username="admin"),
+        )
+
+    assert await assignments(pg_engine, board.day_id) == before
+    cast(AsyncMock, pg_container.notification_outbox()).notify.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_add_same_form(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    board = await seed_board(pg_engine, users_count=4)
+    year_service: YearService = pg_container.year_service()
+    batch = UserDayBatchIn(
+        day_id=board.day_id,
+        add=[
+            UserDayBatchAddIn(
+                application_form_id=board.form_ids[3],
+                information="",
+                attendance=Attendance.UNKNOWN,
+                position_id=board.runner_id,
+            )
+        ],
+    )
+
+    # Both batches pass the up-front check, the unique constraint refuses the second insert
+    results = await asyncio.gather(
+        *(
+            year_service.apply_user_day_batch(batch, author=User(telegram_username="admin"))
+            for _ in range(2)
+        ),
+        return_exceptions=True,
+    )
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    assert [type(error) for error in errors] == [UserDayAlreadyExists]
+
+
+@pytest.mark.asyncio
+async def test_apply_user_day_batch_query_count(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    board = await seed_board(pg_engine, users_count=400)
+    year_service: YearService = pg_container.year_service()
+
+    # Reshuffle 200 volunteers: move the assigned half to halls and assign the other half
+    batch = UserDayBatchIn(
+        day_id=board.day_id,
+        add=[
+            UserDayBatchAddIn(
+                application_form_id=form_id,
+                information="",
+                attendance=Attendance.UNKNOWN,
+                position_id=board.runner_id,
+            )
+            for form_id in board.form_ids[200:300]
+        ],
+        edit={
+            user_day_id: UserDayEditIn(
+                information=None,
+                attendance=None,
+                position_id=board.hall_position_id,
+                hall_id=board.hall_id,
+            )
+            for user_day_id in board.user_day_ids[:50]
+        },
+        delete=set(board.user_day_ids[150:]),
+    )
+    with count_queries(pg_engine) as queries:
+        added = await year_service.apply_user_day_batch(batch, author=User(telegram_username="a"))
+
+    assert len(added) == 100
+    assert len(await assignments(pg_engine, board.day_id)) == 250
+    # One query per table to validate, one statement per kind of change
+    assert queries.count <= 15
+
+
+@pytest.mark.asyncio
+async def test_apply_user_day_batch_moves_out_of_hall(
+    pg_engine: AsyncEngine, pg_container: Container
+) -> None:
+    board = await seed_board(pg_engine, users_count=2)
+    year_service: YearService = pg_container.year_service()
+    author = User(telegram_username="admin")
+
+    for position_id, hall_id in ((board.hall_position_id, board.hall_id), (board.runner_id, None)):
+        await year_service.apply_user_day_batch(
+            UserDayBatchIn(
+                day_id=board.day_id,
+                edit={
+                    board.user_day_ids[0]: UserDayEditIn(
+                        information=None,
+                        attendance=None,
+                        position_id=position_id,
+                        hall_id=hall_id,
+                    )
+                },
+            ),
+            author=author,
+        )
+
+    # The user day outlives losing its hall
+    assert await assignments(pg_engine, board.day_id) == {
+        board.form_ids[0]: (board.runner_id, None)
+    }
+    outbox = cast(AsyncMock, pg_container.notification_outbox())
+    assert outbox.notify.await_args is not None
+    assert outbox.notify.await_args.args[0].endswith(
+        "Imya0 Familiya0 (@user0): Hall Main -> Runner"
+    )
@@ -0,0 +1,107 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from volunteers.auth.deps import with_user
+from volunteers.conftest import count_queries
+from volunteers.core.di import Container
+from volunteers.models import Position, User, UserDay
+from volunteers.schemas.application_form import ApplicationFormIn
+from volunteers.services.__tests__.test_year_experience import seed_experience
+from volunteers.services.year import YearService
+
+
+@pytest.mark.asyncio
+async def test_day_assignments_version(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    user_ids = await seed_experience(pg_engine, users_count=2)
+    year_service: YearService = pg_container.year_service()
+
+    versions = [await year_service.get_day_assignments_version(day_id=2)]
+    assert versions[0][0] == 2
+
+    # Volunteers' names are shown next to their assignments
+    async with pg_engine.begin() as conn:
+        await conn.execute(
+            update(User).where(User.id == user_ids[0]).values(telegram_username="renamed")
+        )
+    versions.append(await year_service.get_day_assignments_version(day_id=2))
+
+    async with pg_engine.begin() as conn:
+        user_day_id = await conn.scalar(select(UserDay.id).where(UserDay.day_id == 2).limit(1))
+        await conn.execute(delete(UserDay).where(UserDay.id == user_day_id))
+    versions.append(await year_service.get_day_assignments_version(day_id=2))
+
+    assert len(set(versions)) == 3
+    assert await year_service.get_day_assignments_version(day_id=2) == versions[-1]
+
+
+@pytest.mark.asyncio
+async def test_form_version(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    user_ids = await seed_experience(pg_engine, users_count=1)
+    year_service: YearService = pg_container.year_service()
+    form_in = ApplicationFormIn(
+        year_id=3, user_id=user_ids[0], desired_positions_ids=set(), itmo_group=None
+    )
+
+    versions = [await year_service.get_form_version(year_id=3, user_id=user_ids[0])]
+    await year_service.save_form(form_in.model_copy(update={"desired_positions_ids": {1}}))
+    versions.append(await year_service.get_form_version(year_id=3, user_id=user_ids[0]))
+    # Dropping the only desired position leaves nothing newer behind, the count still changes
+    await year_service.save_form(form_in)
+    versions.append(await year_service.get_form_version(year_id=3, user_id=user_ids[0]))
+
+    assert len(set(versions)) == 3
+    assert await year_service.get_form_version(year_id=3, user_id=user_ids[0]) == versions[-1]
+    assert await year_service.get_form_version(year_id=3, user_id=user_ids[0] + 1) == (
+        0,
+        0,
+        0,
+        None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_conditional_get(pg_engine: AsyncEngine, pg_container: Container) -> None:
+    # Not imported at module level: wiring the app container imports every test module
+    from volunteers.app import app
+
+    pg_container.wire(packages=["volunteers.services"])
+    user_ids = await seed_experience(pg_engine, users_count=1)
+    year_service: YearService = pg_container.year_service()
+
+    async def _override_with_user() -> User:
+        return User(id=user_ids[0], is_admin=False)
+
+    app.dependency_overrides[with_user] = _override_with_user
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.get("/api/v1/year/3")
+            etag = first.headers["etag"]
+
+            with count_queries(pg_engine) as queries:
+                not_modified = await client.get("/api/v1/year/3", headers={"If-None-Match": etag})
+
+            async with pg_engine.begin() as conn:
+                await conn.execute(update(Position).where(Position.id == 1).values(name="Usher"))
+            await year_service.save_form(
+                ApplicationFormIn(
+                    year_id=3, user_id=user_ids[0], desired_positions_ids={1}, itmo_group=None
+                )
+            )
+            modified = await client.get("/api/v1/year/3", headers={"If-None-Match": etag})
+    finally:
+        app.dependency_overrides = {}
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+    # The year comes from the snapshot cache, only the form's version is read
+    assert queries.count == 1
+
+    assert modified.status_code == 200
+    assert modified.headers["etag"] != etag
+    assert [position["name"] for position in modified.json()["desired_positions"]] == ["Usher"]
@@ -1,20 +1,99 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
 from contextlib import asynccontextmanager
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Any
 
 import loguru
 from dependency_injector.wiring import Provide
+from sqlalchemy import ColumnElement, Row, Select, func
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import InstrumentedAttribute
+
+from volunteers.core.db import get_request_session
+
+STREAM_BATCH_SIZE = 1000  # rows fetched from a server-side cursor at a time
+
+type RowVersion = tuple[Any, ...]
+
+
+def row_version(*updated_at: InstrumentedAttribute[datetime]) -> list[ColumnElement[Any]]:
+    """Columns that sum up the version of the selected rows of one or more joined tables.
+
+    That's how many rows of each table there are, which changes on inserts and deletes, and
+    the latest ``updated_at`` among them, which changes on updates. An edit made by a
+    transaction that started before the latest committed one is stamped with an older time,
+    so it may go unnoticed until the next change.
+    """
+    return [
+        *(func.count(column) for column in updated_at),
+        func.max(func.greatest(*updated_at)),
+    ]
 
 
 class BaseService:
     db: Annotated[AsyncEngine, Provide["db"]]
+    session_maker: Annotated[async_sessionmaker[AsyncSession], Provide["session_maker"]]
+    # The same as db and session_maker unless a read replica is configured
+    replica_db: Annotated[AsyncEngine, Provide["replica_db"]]
+    replica_session_maker: Annotated[
+        async_sessionmaker[AsyncSession], Provide["replica_session_maker"]
+    ]
 
     def __init__(self) -> None:
         self.logger = loguru.logger.bind(service=self.__class__.__name__)
 
     @asynccontextmanager
     async def session_scope(self) -> AsyncGenerator[AsyncSession]:
-        async_session = async_sessionmaker(self.db, expire_on_commit=False)
-        async with async_session() as session:
+        """Yield a session on the primary, for writes and for reads that must not lag.
+
+        That's the session of the current request, or a standalone one outside of requests.
+        """
+        async with self._scope(self.db, self.session_maker) as session:
             yield session
+
+    @asynccontextmanager
+    async def read_session_scope(self) -> AsyncGenerator[AsyncSession]:
+        """Yield a session for reads, on the replica if there is one.
+
+        Once the current request has committed, its reads go to the primary instead, so that
+        they see its writes whatever the replication lag.
+        """
+        request_session = get_request_session()
+        if request_session is not None and request_session.committed:
+            engine, session_maker = self.db, self.session_maker
+        else:
+            engine, session_maker = self.replica_db, self.replica_session_maker
+        async with self._scope(engine, session_maker) as session:
+            yield session
+
+    @asynccontextmanager
+    async def _scope(
+        self, engine: AsyncEngine, session_maker: async_sessionmaker[AsyncSession]
+    ) -> AsyncGenerator[AsyncSession]:
+        request_session = get_request_session()
+        if request_session is None:
+            async with session_maker() as session:
+                yield session
+            return
+
+        session = await request_session.get(engine)
+        try:
+            yield session
+        except Exception:
+            # Don't let a failed call leave its changes for later calls of the same request
+            await session.rollback()
+            raise
+
+    async def stream_rows(
+        self, statement: Select[Any], batch_size: int = STREAM_BATCH_SIZE
+    ) -> AsyncIterator[Row[Any]]:
+        """Yield the rows of ``statement`` from a server-side cursor, ``batch_size`` at a time.
+
+        Reads from the replica if there is one, always in a session of its own: streamed
+        response bodies are sent after the request session is released.
+        """
+        async with self.replica_session_maker() as session:
+            result = await session.stream(statement.execution_options(yield_per=batch_size))
+            async for partition in result.partitions():
+                for row in partition:
+                    yield row
@@ -1,12 +1,53 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
+from volunteers.auth.providers.legacy import verify_legacy_user
+from volunteers.core.cache import TTLCache
 from volunteers.models import LegacyUser
 
 from .base import BaseService
+from .errors import DomainError
+
+# A bcrypt check keeps a core busy for 0.1-0.3s, more checks at once only queue up in threads
+PASSWORD_CHECK_CONCURRENCY = 2
+PASSWORD_ATTEMPTS = 5  # per email and window, successful attempts reset the count
+PASSWORD_ATTEMPT_WINDOW = 15 * 60  # in seconds
+PASSWORD_ATTEMPT_CACHE_SIZE = 10_000
+
+
+class TooManyPasswordAttempts(DomainError):
+    """Too many password attempts for one legacy user"""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Too many password attempts")
+        self.retry_after = retry_after  # in seconds
 
 
 class LegacyUserService(BaseService):
+    def __init__(
+        self,
+        password_check_concurrency: int = PASSWORD_CHECK_CONCURRENCY,
+        password_attempts: int = PASSWORD_ATTEMPTS,
+    ) -> None:
+        super().__init__()
+        self.password_attempts = password_attempts
+        # bcrypt releases the GIL, so checks in these threads don't hold up the event loop
+        self._password_checks = ThreadPoolExecutor(
+            max_workers=password_check_concurrency, thread_name_prefix="password-check"
+        )
+        # Waiting here rather than in the executor's queue lets abandoned requests drop out
+        self._password_check_slots = asyncio.Semaphore(password_check_concurrency)
+        # Per email: when the window started and how many attempts were made in it
+        self._password_attempts: TTLCache[str, tuple[float, int]] = TTLCache(
+            "legacy_password_attempts",
+            maxsize=PASSWORD_ATTEMPT_CACHE_SIZE,
+            ttl=PASSWORD_ATTEMPT_WINDOW,
+        )
+
     async def get_user_by_email(self, email: str) -> LegacyUser | None:
         async with self.session_scope() as session:
             result = await session.execute(
@@ -15,3 +56,27 @@ class LegacyUserService(BaseService):
                 .options(selectinload(LegacyUser.new_user))
             )
             return result.scalar_one_or_none()
+
+    async def verify_password(self, legacy_user: LegacyUser, password: str) -> bool:
+        """Check the password of a legacy user without blocking the event loop.
+
+        Raises ``TooManyPasswordAttempts`` once the user has had ``password_attempts`` checks
+        in a window without success. The count is kept per process.
+        """
+        self._count_password_attempt(legacy_user.email)
+        async with self._password_check_slots:
+            valid = await asyncio.get_running_loop().run_in_executor(
+                self._password_checks, verify_legacy_user, password, legacy_user
+            )
+        if valid:
+            self._password_attempts.invalidate(legacy_user.email)
+        return valid
+
+    def _count_password_attempt(self, email: str) -> None:
+        # Counted before checking, so that concurrent attempts can't slip past the limit
+        now = time.monotonic()
+        started_at, attempts = self._password_attempts.get(email) or (now, 0)
+        window_left = started_at + PASSWORD_ATTEMPT_WINDOW - now
+        if attempts >= self.password_attempts:
+            raise TooManyPasswordAttempts(retry_after=window_left)
+        self._password_attempts.set(email, (started_at, attempts + 1), ttl=window_left)
@@ -0,0 +1,250 @@
+import asyncio
+import base64
+import contextlib
+import datetime
+import hashlib
+import hmac
+import secrets
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.sql.dml import ReturningUpdate
+
+from volunteers.core.cache import TTLCache
+from volunteers.core.config import Config
+from volunteers.core.events import EventBroker
+from volunteers.models import RefreshSession
+
+from .base import BaseService
+from .errors import DomainError
+
+REVOKED_SESSION_CACHE_SIZE = 10_000
+# Event broker channel of the ids of revoked sessions
+REVOKED_SESSIONS_CHANNEL = "revoked_sessions"
+
+
+class RefreshTokenRevoked(DomainError):
+    """Refresh token was replaced, revoked or never recorded"""
+
+    def __init__(self) -> None:
+        super().__init__("Refresh token revoked")
+
+
+class RefreshTokenReused(DomainError):
+    """A replaced refresh token was presented again, so its session is revoked"""
+
+    def __init__(self) -> None:
+        super().__init__("Refresh token reused")
+
+
+def _hash_token_id(token_id: str) -> bytes:
+    return hashlib.sha256(token_id.encode()).digest()
+
+
+def _new_token_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def _next_token_id(secret: str, token_id: str) -> str:
+    """The id of the token that replaces ``token_id``, which only the server can derive.
+
+    Being derived rather than random, it can be handed out again to a concurrent refresh
+    with the same token without storing it.
+    """
+    digest = hmac.digest(secret.encode(), token_id.encode(), hashlib.sha256)
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b"=").decode()
+
+
+def _revoke() -> ReturningUpdate[tuple[uuid.UUID]]:
+    return (
+        update(RefreshSession)
+        .where(RefreshSession.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+        .returning(RefreshSession.id)
+    )
+
+
+class RefreshTokenService(BaseService):
+    """Login sessions whose refresh tokens are rotated on every use.
+
+    A session is the family of refresh tokens rotated from one login, and only its latest
+    token is valid. Presenting one that was already exchanged means that it leaked, so the
+    whole session is revoked; except for the token replaced last, which gets the same
+    successor for ``jwt.refresh_reuse_grace`` seconds after it was exchanged. That's what
+    tabs and concurrent requests that refresh with one token at once do.
+
+    Revoked sessions are also remembered in memory for as long as their access tokens last,
+    so that those are refused without asking the database. Revocations are shared with the
+    other processes through the event broker; once ``start`` has run, this process also
+    picks up the ones it may have missed from the database.
+    """
+
+    def __init__(self, config: Callable[[], Config], broker: EventBroker) -> None:
+        super().__init__()
+        self._config = config
+        self._broker = broker
+        self._revoked_sessions: TTLCache[str, bool] = TTLCache(
+            "revoked_session",
+            maxsize=REVOKED_SESSION_CACHE_SIZE,
+            ttl=config().jwt.expiration,
+        )
+        self._listener: asyncio.Task[None] | None = None
+
+    def is_revoked(self, session_id: str) -> bool:
+        return self._revoked_sessions.get(session_id) is not None
+
+    async def start_session(self, user_id: int) -> tuple[str, str]:
+        """Start a session for the user; returns its id and the id of its first refresh token."""
+        session_id = uuid.uuid4()
+        token_id = _new_token_id()
+        async with self.session_scope() as session:
+            # Forget the user's sessions that can't be refreshed anymore
+            await session.execute(
+                delete(RefreshSession).where(
+                    RefreshSession.user_id == user_id,
+                    or_(
+                        RefreshSession.revoked_at.is_not(None),
+                        RefreshSession.expires_at < func.now(),
+                    ),
+                )
+            )
+            session.add(
+                RefreshSession(
+                    id=session_id,
+                    user_id=user_id,
+                    token_hash=_hash_token_id(token_id),
+                    expires_at=self._expires_at(),
+                )
+            )
+            await session.commit()
+        return str(session_id), token_id
+
+    async def rotate(self, session_id: str, token_id: str) -> str:
+        """Replace the current refresh token of a session; returns the id of the next one.
+
+        Raises ``RefreshTokenReused`` when ``token_id`` was replaced before, outside of the
+        grace period, and ``RefreshTokenRevoked`` when the session is over or unknown.
+        """
+        if self.is_revoked(session_id):
+            raise RefreshTokenRevoked()
+
+        config = self._config()
+        next_token_id = _next_token_id(config.jwt.secret, token_id)
+        session_uuid = uuid.UUID(session_id)
+        reused: Any = None
+        async with self.session_scope() as session:
+            # A concurrent rotation with the same token holds the row until it commits, and
+            # then this one no longer matches
+            rotated = await session.scalar(
+                update(RefreshSession)
+                .where(
+                    RefreshSession.id == session_uuid,
+                    RefreshSession.token_hash == _hash_token_id(token_id),
+                    RefreshSession.revoked_at.is_(None),
+                )
+                .values(token_hash=_hash_token_id(next_token_id), expires_at=self._expires_at())
+                .returning(RefreshSession.id)
+            )
+            if rotated is None:
+                # Replaced just now by the token this one would be replaced with
+                rotated = await session.scalar(
+                    select(RefreshSession.id).where(
+                        RefreshSession.id == session_uuid,
+                        RefreshSession.token_hash == _hash_token_id(next_token_id),
+                        RefreshSession.revoked_at.is_(None),
+                        RefreshSession.updated_at
+                        > func.now() - datetime.timedelta(seconds=config.jwt.refresh_reuse_grace),
+                    )
+                )
+            if rotated is None:
+                # A live session whose current token is another one: this one was replaced
+                reused = await session.scalar(_revoke().where(RefreshSession.id == session_uuid))
+            await session.commit()
+
+        if reused is not None:
+            self.logger.warning(f"Refresh token reused, revoked session {session_id}")
+            await self._share_revoked([session_id])
+            raise RefreshTokenReused()
+        if rotated is None:
+            raise RefreshTokenRevoked()
+        return next_token_id
+
+    async def end_session(self, session_id: str) -> None:
+        async with self.session_scope() as session:
+            await session.execute(_revoke().where(RefreshSession.id == uuid.UUID(session_id)))
+            await session.commit()
+        await self._share_revoked([session_id])
+
+    async def end_all_sessions(self, user_id: int) -> int:
+        """Revoke every session of the user; returns how many were live."""
+        async with self.session_scope() as session:
+            session_ids = (
+                await session.scalars(_revoke().where(RefreshSession.user_id == user_id))
+            ).all()
+            await session.commit()
+        await self._share_revoked([str(session_id) for session_id in session_ids])
+        return len(session_ids)
+
+    def start(self) -> None:
+        """Start picking up the sessions other processes revoke."""
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._listener
+        self._listener = None
+
+    def _remember_revoked(self, session_id: str, ttl: float | None = None) -> None:
+        # Read on every call, so that reload_config() changes how long that is
+        expiration = self._config().jwt.expiration
+        self._revoked_sessions.set(session_id, True, ttl=expiration if ttl is None else ttl)
+
+    async def _share_revoked(self, session_ids: list[str]) -> None:
+        for session_id in session_ids:
+            self._remember_revoked(session_id)
+        if session_ids:
+            await self._broker.publish(REVOKED_SESSIONS_CHANNEL, session_ids)
+
+    async def _load_revoked(self) -> None:
+        """Remember the sessions revoked recently enough for their access tokens to be valid."""
+        expiration = self._config().jwt.expiration
+        try:
+            async with self.session_scope() as session:
+                rows = (
+                    await session.execute(
+                        select(RefreshSession.id, RefreshSession.revoked_at).where(
+                            RefreshSession.revoked_at
+                            > func.now() - datetime.timedelta(seconds=expiration)
+                        )
+                    )
+                ).all()
+        except Exception:
+            # Revocations keep coming through the broker; the missed ones expire with their tokens
+            self.logger.exception("Failed to load revoked sessions")
+            return
+        now = datetime.datetime.now(tz=datetime.UTC)
+        for session_id, revoked_at in rows:
+            left = expiration - (now - revoked_at).total_seconds()
+            self._remember_revoked(str(session_id), ttl=left)
+
+    async def _listen(self) -> None:
+        with self._broker.subscribe(REVOKED_SESSIONS_CHANNEL) as subscription:
+            # Sessions revoked before this process started
+            await self._load_revoked()
+            while True:
+                session_id = await subscription.get()
+                if session_id is None:
+                    # Some revocations were lost on the way, the database has them all
+                    await self._load_revoked()
+                else:
+                    self._remember_revoked(session_id)
+
+    def _expires_at(self) -> datetime.datetime:
+        return datetime.datetime.now(tz=datetime.UTC) + datetime.timedelta(
+            seconds=self._config().jwt.refresh_expiration
+        )
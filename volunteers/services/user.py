@@ -1,28 +1,222 @@
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+import asyncio
+import base64
+import binascii
+import contextlib
+import json
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from typing import Any
 
+from sqlalchemy import Row, Select, and_, or_, select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, make_transient_to_detached
+
+from volunteers.core.cache import TTLCache
+from volunteers.core.events import EventBroker
 from volunteers.models import ApplicationForm, User
-from volunteers.schemas.user import UserIn, UserUpdate
+from volunteers.schemas.user import UserIn, UserListQuery, UserSort, UserUpdate
+
+from .base import BaseService, RowVersion, row_version
+from .errors import DomainError
+
+USER_CACHE_SIZE = 4096
+USER_CACHE_TTL = 60  # in seconds
+# Event broker channel of the ids of users whose cached copies are out of date
+USERS_CHANNEL = "users"
+
+# Every sort key ends with the id, so that keys are unique and cursors never skip users
+USER_SORT_KEYS: dict[UserSort, tuple[InstrumentedAttribute[Any], ...]] = {
+    UserSort.ID: (User.id,),
+    UserSort.NAME_RU: (User.last_name_ru, User.first_name_ru, User.id),
+    UserSort.NAME_EN: (User.last_name_en, User.first_name_en, User.id),
+}
+USER_SEARCH_COLUMNS = (
+    User.first_name_ru,
+    User.last_name_ru,
+    User.patronymic_ru,
+    User.first_name_en,
+    User.last_name_en,
+    User.telegram_username,
+)
+
+
+class InvalidCursor(DomainError):
+    """Pagination cursor is malformed or belongs to a different sort order"""
+
+    def __init__(self) -> None:
+        super().__init__("Invalid cursor")
+
+
+@dataclass
+class UserPage[T]:
+    items: list[T]
+    next_cursor: str | None  # None on the last page
+
+
+def _snapshot_user(user: User) -> dict[str, Any]:
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
+def _user_from_snapshot(snapshot: dict[str, Any]) -> User:
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def _encode_cursor(query: UserListQuery, user: User) -> str:
+    key = [getattr(user, column.key) for column in USER_SORT_KEYS[query.sort]]
+    payload = json.dumps([query.sort, query.descending, key]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(query: UserListQuery, cursor: str) -> list[Any]:
+    columns = USER_SORT_KEYS[query.sort]
+    try:
+        sort, descending, key = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor from e
+    if (
+        sort != query.sort
+        or descending != query.descending
+        or not isinstance(key, list)
+        or len(key) != len(columns)
+        or not all(
+            isinstance(value, column.type.python_type)
+            for value, column in zip(key, columns, strict=True)
+        )
+    ):
+        raise InvalidCursor
+    return key
+
+
+def _search_users[T: Select[Any]](statement: T, query: UserListQuery) -> T:
+    """Keep users that have every word of the search in one of their names or username."""
+    for word in (query.search or "").split():
+        word = word.removeprefix("@")
+        if word:
+            statement = statement.where(
+                or_(*(column.icontains(word, autoescape=True) for column in USER_SEARCH_COLUMNS))
+            )
+    return statement
+
+
+def _paginate[T: Select[Any]](statement: T, query: UserListQuery) -> T:
+    """Order by the sort key and select the page after ``query.cursor``.
 
-from .base import BaseService
+    One extra row is selected to find out whether there is a next page.
+    """
+    columns = USER_SORT_KEYS[query.sort]
+    if query.cursor is not None:
+        key = tuple_(*columns)
+        after = tuple_(*_decode_cursor(query, query.cursor))
+        statement = statement.where(key < after if query.descending else key > after)
+    statement = statement.order_by(
+        *(column.desc() if query.descending else column for column in columns)
+    )
+    if query.limit is not None:
+        statement = statement.limit(query.limit + 1)
+    return statement
+
+
+def _make_page[T](
+    items: list[T], query: UserListQuery, user_of: Callable[[T], User]
+) -> UserPage[T]:
+    if query.limit is None or len(items) <= query.limit:
+        return UserPage(items=items, next_cursor=None)
+    items = items[: query.limit]
+    return UserPage(items=items, next_cursor=_encode_cursor(query, user_of(items[-1])))
 
 
 class UserService(BaseService):
+    def __init__(self, broker: EventBroker) -> None:
+        super().__init__()
+        self.broker = broker
+        # Column snapshots rather than ORM instances, so requests never share mutable objects
+        self._user_cache: TTLCache[int, dict[str, Any]] = TTLCache(
+            "user", maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL
+        )
+        self._listener: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start picking up the users other processes update."""
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._listener
+        self._listener = None
+
     async def get_user_by_telegram_id(self, telegram_id: int) -> User | None:
+        # From the primary: logging in right after registering must find the new user
         async with self.session_scope() as session:
             result = await session.execute(select(User).where(User.telegram_id == telegram_id))
             return result.scalar_one_or_none()
 
     async def get_user_by_id(self, id: int) -> User | None:
+        # From the primary: users read from a lagging replica would be cached after an update
         async with self.session_scope() as session:
             result = await session.execute(select(User).where(User.id == id))
             return result.scalar_one_or_none()
 
+    async def get_cached_user_by_id(self, id: int) -> User | None:
+        """Get a user by id, served from the in-process cache when possible.
+
+        Meant for authenticating requests; the returned user is detached from any session.
+        Updates invalidate it in every process, through the event broker.
+        """
+        if (snapshot := self._user_cache.get(id)) is not None:
+            return _user_from_snapshot(snapshot)
+
+        user = await self.get_user_by_id(id)
+        if user:
+            self._user_cache.set(id, _snapshot_user(user))
+        return user
+
+    def invalidate_cached_user(self, id: int) -> None:
+        """Forget the cached user in this process."""
+        self._user_cache.invalidate(id)
+
+    async def _share_user_invalidation(self, id: int) -> None:
+        self.invalidate_cached_user(id)
+        await self.broker.publish(USERS_CHANNEL, [str(id)])
+
+    async def _listen(self) -> None:
+        with self.broker.subscribe(USERS_CHANNEL) as subscription:
+            while True:
+                user_id = await subscription.get()
+                if user_id is None:
+                    # Some invalidations were lost on the way
+                    self._user_cache.clear()
+                else:
+                    self.invalidate_cached_user(int(user_id))
+
     async def get_all_users(self) -> list[User]:
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(select(User).order_by(User.id))
             return list(result.scalars().all())
 
+    async def get_users_page(self, query: UserListQuery) -> UserPage[User]:
+        """Get a page of users matching ``query.search``, ignoring the per-year filters."""
+        statement = _paginate(_search_users(select(User), query), query)
+        async with self.read_session_scope() as session:
+            result = await session.execute(statement)
+            users = list(result.scalars().all())
+        return _make_page(users, query, user_of=lambda user: user)
+
+    async def get_users_version(self) -> RowVersion:
+        async with self.read_session_scope() as session:
+            result = await session.execute(select(*row_version(User.updated_at)))
+            return tuple(result.one())
+
+    def stream_users(self, query: UserListQuery) -> AsyncIterator[Row[Any]]:
+        """Stream every user matching ``query.search`` for exports, ignoring the page."""
+        query = query.model_copy(update={"limit": None, "cursor": None})
+        return self.stream_rows(
+            _paginate(_search_users(select(*User.__table__.columns), query), query)
+        )
+
     async def create_user(self, user_in: UserIn) -> User:
         user = User(
             telegram_id=user_in.telegram_id,
@@ -73,40 +267,46 @@ class UserService(BaseService):
                 user.telegram_username = user_update.telegram_username
 
             await session.commit()
+            await self._share_user_invalidation(user_id)
             return user
 
     async def get_users_with_registration_status(
-        self, year_id: int
-    ) -> list[tuple[User, bool, str | None]]:
+        self, year_id: int, query: UserListQuery | None = None
+    ) -> UserPage[tuple[User, bool, str | None]]:
         """
-        Get all users with their registration status for a specific year.
-        Returns a list of tuples: (user, is_registered, itmo_group)
+        Get a page of users with their registration status for a specific year.
+        Items are tuples: (user, is_registered, itmo_group)
         """
-        async with self.session_scope() as session:
-            # Get all users with their application forms, ordered by id
-            result = await session.execute(
-                select(User).options(selectinload(User.application_forms)).order_by(User.id)
+        query = query or UserListQuery()
+        # A single form at most per user thanks to the (year_id, user_id) unique constraint
+        statement = select(
+            User, ApplicationForm.id.is_not(None), ApplicationForm.itmo_group
+        ).outerjoin(
+            ApplicationForm,
+            and_(ApplicationForm.user_id == User.id, ApplicationForm.year_id == year_id),
+        )
+        if query.registered is not None:
+            statement = statement.where(
+                ApplicationForm.id.is_not(None)
+                if query.registered
+                else ApplicationForm.id.is_(None)
             )
-            all_users = result.scalars().all()
+        if query.itmo_group is not None:
+            statement = statement.where(ApplicationForm.itmo_group == query.itmo_group)
+        statement = _paginate(_search_users(statement, query), query)
 
-            # Get registered user IDs for this year
-            registered_result = await session.execute(
-                select(ApplicationForm.user_id).where(ApplicationForm.year_id == year_id)
+        async with self.read_session_scope() as session:
+            result = await session.execute(statement)
+            rows = [(user, is_registered, itmo_group) for user, is_registered, itmo_group in result]
+        return _make_page(rows, query, user_of=lambda row: row[0])
+
+    async def get_registration_status_version(self, year_id: int) -> RowVersion:
+        """Version of every user together with their form of the year, if any."""
+        async with self.read_session_scope() as session:
+            result = await session.execute(
+                select(*row_version(User.updated_at, ApplicationForm.updated_at)).outerjoin(
+                    ApplicationForm,
+                    and_(ApplicationForm.user_id == User.id, ApplicationForm.year_id == year_id),
+                )
             )
-            registered_user_ids = set(registered_result.scalars())
-
-            # Build the response
-            user_data: list[tuple[User, bool, str | None]] = []
-            for user in all_users:
-                # Find the application form for this year if it exists
-                application_form = None
-                for app_form in user.application_forms:
-                    if app_form.year_id == year_id:
-                        application_form = app_form
-                        break
-
-                is_registered = user.id in registered_user_ids
-                itmo_group = application_form.itmo_group if application_form else None
-                user_data.append((user, is_registered, itmo_group))
-
-            return user_data
+            return tuple(result.one())
@@ -1,8 +1,20 @@
-from sqlalchemy import and_, delete, select
-from sqlalchemy.orm import selectinload
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Integer, Row, and_, delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
 
 from volunteers.api.v1.admin.year.schemas import ExperienceItem
-from volunteers.bot.notify import Notifier
+from volunteers.bot.outbox import NotificationOutbox
+from volunteers.core.cache import TTLCache
+from volunteers.core.etag import digest
+from volunteers.core.events import EventBroker
 from volunteers.models import (
     ApplicationForm,
     Assessment,
@@ -16,15 +28,26 @@ from volunteers.models import (
 )
 from volunteers.schemas.application_form import ApplicationFormIn
 from volunteers.schemas.assessment import AssessmentEditIn, AssessmentIn
-from volunteers.schemas.day import DayEditIn, DayIn
+from volunteers.schemas.day import DayEditIn, DayIn, DayOutUser
+from volunteers.schemas.day_assignment import DayAssignmentEvent, DayAssignmentItem
 from volunteers.schemas.hall import HallEditIn, HallIn
-from volunteers.schemas.position import PositionEditIn, PositionIn
-from volunteers.schemas.user_day import UserDayEditIn, UserDayIn
-from volunteers.schemas.year import YearEditIn, YearIn
+from volunteers.schemas.position import PositionEditIn, PositionIn, PositionOut
+from volunteers.schemas.user_day import (
+    UserDayBatchAddIn,
+    UserDayBatchIn,
+    UserDayEditIn,
+    UserDayIn,
+)
+from volunteers.schemas.year import YearEditIn, YearIn, YearSnapshot
 
-from .base import BaseService
+from .base import BaseService, RowVersion, row_version
 from .errors import DomainError
 
+YEAR_SNAPSHOT_CACHE_SIZE = 64
+YEAR_SNAPSHOT_TTL = 30  # in seconds
+# Event broker channel of the ids of years whose snapshots are out of date
+YEAR_SNAPSHOTS_CHANNEL = "year_snapshots"
+
 
 class ApplicationFormNotFound(DomainError):
     """Application form not found"""
@@ -43,14 +66,37 @@ class YearNotFound(DomainError):
 class PositionNotFound(DomainError):
     """Position not found"""
 
+    def __init__(self) -> None:
+        super().__init__("Position not found")
+
 
 class DayNotFound(DomainError):
     """Day not found"""
 
+    def __init__(self) -> None:
+        super().__init__("Day not found")
+
 
 class UserDayNotFound(DomainError):
     """User day not found"""
 
+    def __init__(self) -> None:
+        super().__init__("User day not found")
+
+
+class UserDayAlreadyExists(DomainError):
+    """Application form already has a user day on this day"""
+
+    def __init__(self) -> None:
+        super().__init__("Application form is already assigned on this day")
+
+
+class SameDayCopy(DomainError):
+    """Assignments can't be copied from a day to itself"""
+
+    def __init__(self) -> None:
+        super().__init__("Source and target day must differ")
+
 
 class AssessmentNotFound(DomainError):
     """Assessment not found"""
@@ -59,48 +105,291 @@ class AssessmentNotFound(DomainError):
 class HallNotFound(DomainError):
     """Hall not found"""
 
+    def __init__(self) -> None:
+        super().__init__("Hall not found")
+
+
+def _violates(error: IntegrityError, constraint: str) -> bool:
+    """Whether the database raised ``error`` for the constraint named ``constraint``"""
+    return getattr(error.orig.__cause__, "constraint_name", None) == constraint
+
+
+def _describe_user(user: User) -> str:
+    return f"{user.first_name_ru} {user.last_name_ru} (@{user.telegram_username})"
+
+
+def _describe_assignment(position: Position, hall: Hall | None) -> str:
+    return f"{position.name} {hall.name}" if hall else position.name
+
+
+def day_assignments_channel(day_id: int) -> str:
+    """Event broker channel of the day's ``DayAssignmentEvent``s."""
+    return f"day-assignments:{day_id}"
+
+
+def _upsert_event(
+    user_day_id: int, user: User, position: Position, hall: Hall | None
+) -> DayAssignmentEvent:
+    return DayAssignmentEvent(
+        type="upsert",
+        assignment=DayAssignmentItem(
+            user_day_id=user_day_id,
+            name=f"{user.first_name_en} {user.last_name_en}",
+            telegram=user.telegram_username,
+            position=position.name,
+            hall=hall.name if hall else None,
+        ),
+    )
+
+
+@dataclass
+class _UserDayContext:
+    """A user day with what its notifications and live events describe."""
+
+    user_day: UserDay
+    day: Day
+    user: User
+    position: Position
+    hall: Hall | None
+    # Looked up by the ids given, for edits
+    new_position: Position | None
+    new_hall: Hall | None
+
+
+async def _load_user_day_context(
+    session: AsyncSession,
+    user_day_id: int,
+    new_position_id: int | None = None,
+    new_hall_id: int | None = None,
+) -> _UserDayContext | None:
+    """Load a user day with its day, user, position and hall, and a new position and hall.
+
+    One query instead of a lazy load per relationship.
+    """
+    new_position = aliased(Position)
+    new_hall = aliased(Hall)
+    result = await session.execute(
+        select(UserDay, Day, User, Position, Hall, new_position, new_hall)
+        .join(UserDay.day)
+        .join(UserDay.application_form)
+        .join(ApplicationForm.user)
+        .join(UserDay.position)
+        .outerjoin(UserDay.hall)
+        .outerjoin(new_position, new_position.id == new_position_id)
+        .outerjoin(new_hall, new_hall.id == new_hall_id)
+        .where(UserDay.id == user_day_id)
+    )
+    row = result.one_or_none()
+    return _UserDayContext(*row) if row else None
+
 
 class YearService(BaseService):
-    def __init__(self, notifier: Notifier) -> None:
-        self.notifier = notifier
+    def __init__(self, outbox: NotificationOutbox, broker: EventBroker) -> None:
+        self.outbox = outbox
+        self.broker = broker
         super().__init__()
+        self._year_snapshots: TTLCache[int, YearSnapshot] = TTLCache(
+            "year_snapshot", maxsize=YEAR_SNAPSHOT_CACHE_SIZE, ttl=YEAR_SNAPSHOT_TTL
+        )
+        # Bumped on every invalidation, so that a load racing with an edit isn't cached
+        self._year_snapshot_generation = 0
+        self._listener: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start picking up the year snapshots other processes invalidate."""
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._listener
+        self._listener = None
+
+    async def publish_day_events(self, day_id: int, events: Sequence[DayAssignmentEvent]) -> None:
+        """Push committed changes of the day's assignments to its live subscribers."""
+        if events:
+            await self.broker.publish(
+                day_assignments_channel(day_id),
+                [event.model_dump_json(exclude_none=True) for event in events],
+            )
 
     async def get_years(self) -> list[Year]:
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(select(Year).order_by(Year.id))
             return list(result.scalars().all())
 
     async def get_year_by_year_id(self, year_id: int) -> Year | None:
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(select(Year).where(Year.id == year_id))
             return result.scalar_one_or_none()
 
-    async def get_positions_by_year_id(self, year_id: int) -> list[Position]:
+    async def get_year_snapshot(self, year_id: int) -> YearSnapshot | None:
+        """Get the year with its desirable positions and days, as volunteers see it.
+
+        Served from the in-process cache; the mutators of years, positions and days invalidate
+        it in every process, through the event broker.
+        """
+        if (snapshot := self._year_snapshots.get(year_id)) is not None:
+            return snapshot
+
+        generation = self._year_snapshot_generation
+        # From the primary: a snapshot read from a lagging replica would outlive the invalidation
         async with self.session_scope() as session:
+            year = await session.scalar(select(Year).where(Year.id == year_id))
+            if not year:
+                return None
+            positions = (
+                await session.scalars(
+                    select(Position)
+                    .where(Position.year_id == year_id, Position.can_desire)
+                    .order_by(Position.id)
+                )
+            ).all()
+            days = (
+                await session.scalars(select(Day).where(Day.year_id == year_id).order_by(Day.id))
+            ).all()
+            snapshot = YearSnapshot(
+                year_id=year.id,
+                year_name=year.year_name,
+                open_for_registration=year.open_for_registration,
+                positions=tuple(
+                    PositionOut(
+                        position_id=p.id,
+                        year_id=p.year_id,
+                        name=p.name,
+                        can_desire=p.can_desire,
+                        has_halls=p.has_halls,
+                    )
+                    for p in positions
+                ),
+                days=tuple(DayOutUser(day_id=d.id, name=d.name) for d in days),
+                version=digest(
+                    year.updated_at,
+                    [(p.id, p.updated_at) for p in positions],
+                    [(d.id, d.updated_at) for d in days],
+                ),
+            )
+
+        if generation == self._year_snapshot_generation:
+            self._year_snapshots.set(year_id, snapshot)
+        return snapshot
+
+    def invalidate_year_snapshot(self, year_id: int) -> None:
+        """Forget the cached snapshot of the year in this process."""
+        self._year_snapshot_generation += 1
+        self._year_snapshots.invalidate(year_id)
+
+    async def _share_year_snapshot_invalidation(self, year_id: int) -> None:
+        self.invalidate_year_snapshot(year_id)
+        await self.broker.publish(YEAR_SNAPSHOTS_CHANNEL, [str(year_id)])
+
+    async def _listen(self) -> None:
+        with self.broker.subscribe(YEAR_SNAPSHOTS_CHANNEL) as subscription:
+            while True:
+                year_id = await subscription.get()
+                if year_id is None:
+                    # Some invalidations were lost on the way
+                    self._year_snapshot_generation += 1
+                    self._year_snapshots.clear()
+                else:
+                    self.invalidate_year_snapshot(int(year_id))
+
+    async def get_positions_by_year_id(self, year_id: int) -> list[Position]:
+        async with self.read_session_scope() as session:
             result = await session.execute(
                 select(Position).where(Position.year_id == year_id).order_by(Position.id)
             )
             return list(result.scalars().all())
 
     async def get_days_by_year_id(self, year_id: int) -> list[Day]:
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(
                 select(Day).where(Day.year_id == year_id).order_by(Day.id)
             )
             return list(result.scalars().all())
 
     async def get_day_by_id(self, day_id: int) -> Day | None:
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(select(Day).where(Day.id == day_id))
             return result.scalar_one_or_none()
 
     async def get_halls_by_year_id(self, year_id: int) -> list[Hall]:
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(
                 select(Hall).where(Hall.year_id == year_id).order_by(Hall.id)
             )
             return list(result.scalars().all())
 
+    async def get_years_version(self) -> RowVersion:
+        async with self.read_session_scope() as session:
+            result = await session.execute(select(*row_version(Year.updated_at)))
+            return tuple(result.one())
+
+    async def get_positions_version(self, year_id: int) -> RowVersion:
+        async with self.read_session_scope() as session:
+            result = await session.execute(
+                select(*row_version(Position.updated_at)).where(Position.year_id == year_id)
+            )
+            return tuple(result.one())
+
+    async def get_days_version(self, year_id: int) -> RowVersion:
+        async with self.read_session_scope() as session:
+            result = await session.execute(
+                select(*row_version(Day.updated_at)).where(Day.year_id == year_id)
+            )
+            return tuple(result.one())
+
+    async def get_halls_version(self, year_id: int) -> RowVersion:
+        async with self.read_session_scope() as session:
+            result = await session.execute(
+                select(*row_version(Hall.updated_at)).where(Hall.year_id == year_id)
+            )
+            return tuple(result.one())
+
+    async def get_form_version(self, year_id: int, user_id: int) -> RowVersion:
+        """Version of the user's form of the year together with its desired positions."""
+        async with self.read_session_scope() as session:
+            result = await session.execute(
+                select(
+                    *row_version(
+                        ApplicationForm.updated_at,
+                        FormPositionAssociation.updated_at,
+                        Position.updated_at,
+                    )
+                )
+                .select_from(ApplicationForm)
+                .outerjoin(
+                    FormPositionAssociation,
+                    FormPositionAssociation.form_id == ApplicationForm.id,
+                )
+                .outerjoin(Position, Position.id == FormPositionAssociation.position_id)
+                .where(ApplicationForm.year_id == year_id, ApplicationForm.user_id == user_id)
+            )
+            return tuple(result.one())
+
+    async def get_day_assignments_version(self, day_id: int) -> RowVersion:
+        """Version of the day's assignments and of the users, positions and halls they show."""
+        async with self.read_session_scope() as session:
+            result = await session.execute(
+                select(
+                    *row_version(
+                        UserDay.updated_at,
+                        User.updated_at,
+                        Position.updated_at,
+                        Hall.updated_at,
+                    )
+                )
+                .select_from(UserDay)
+                .join(ApplicationForm, ApplicationForm.id == UserDay.application_form_id)
+                .join(User, User.id == ApplicationForm.user_id)
+                .join(Position, Position.id == UserDay.position_id)
+                .outerjoin(Hall, Hall.id == UserDay.hall_id)
+                .where(UserDay.day_id == day_id)
+            )
+            return tuple(result.one())
+
     async def add_hall(self, hall_in: HallIn) -> Hall:
         created_hall = Hall(
             year_id=hall_in.year_id,
@@ -130,7 +419,7 @@ class YearService(BaseService):
     async def get_form_by_year_id_and_user_id(
         self, year_id: int, user_id: int
     ) -> ApplicationForm | None:
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(
                 select(ApplicationForm)
                 .where(
@@ -145,7 +434,7 @@ class YearService(BaseService):
 
     async def get_all_forms_by_year_id(self, year_id: int) -> list[ApplicationForm]:
         """Get all application forms for a specific year with user and position data."""
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(
                 select(ApplicationForm)
                 .where(ApplicationForm.year_id == year_id)
@@ -159,7 +448,7 @@ class YearService(BaseService):
 
     async def get_all_assignments_by_year_id(self, year_id: int) -> list[UserDay]:
         """Get all user day assignments for a specific year with related data."""
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(
                 select(UserDay)
                 .join(ApplicationForm)
@@ -176,7 +465,7 @@ class YearService(BaseService):
 
     async def get_all_assignments_by_day_id(self, day_id: int) -> list[UserDay]:
         """Get all user day assignments for a specific day with related data."""
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(
                 select(UserDay)
                 .where(UserDay.day_id == day_id)
@@ -190,6 +479,87 @@ class YearService(BaseService):
             )
             return list(result.scalars().all())
 
+    def stream_registrations(self, year_id: int) -> AsyncIterator[Row[Any]]:
+        """Stream the application forms of a year for exports, oldest first.
+
+        Desired positions and the names of the previous years the applicant worked in
+        come as comma-separated strings.
+        """
+        desired_positions = (
+            select(
+                func.string_agg(
+                    Position.name, aggregate_order_by(literal_column("', '"), Position.name)
+                )
+            )
+            .join(FormPositionAssociation, FormPositionAssociation.position_id == Position.id)
+            .where(FormPositionAssociation.form_id == ApplicationForm.id)
+            .scalar_subquery()
+        )
+        past_form = aliased(ApplicationForm)
+        previous_years = (
+            select(
+                func.string_agg(
+                    Year.year_name.distinct(),
+                    aggregate_order_by(literal_column("', '"), Year.year_name),
+                )
+            )
+            .join(past_form, past_form.year_id == Year.id)
+            .join(UserDay, UserDay.application_form_id == past_form.id)
+            .where(past_form.user_id == ApplicationForm.user_id, past_form.year_id != year_id)
+            .scalar_subquery()
+        )
+        return self.stream_rows(
+            select(
+                ApplicationForm.id.label("form_id"),
+                User.id.label("user_id"),
+                User.first_name_ru,
+                User.last_name_ru,
+                User.patronymic_ru,
+                User.first_name_en,
+                User.last_name_en,
+                User.isu_id,
+                User.phone,
+                User.email,
+                User.telegram_username,
+                ApplicationForm.itmo_group,
+                ApplicationForm.comments,
+                ApplicationForm.needs_invitation,
+                desired_positions.label("desired_positions"),
+                previous_years.label("previous_years"),
+                ApplicationForm.created_at,
+                ApplicationForm.updated_at,
+            )
+            .join(User, ApplicationForm.user_id == User.id)
+            .where(ApplicationForm.year_id == year_id)
+            .order_by(ApplicationForm.created_at, ApplicationForm.id)
+        )
+
+    def stream_day_assignments(self, day_id: int) -> AsyncIterator[Row[Any]]:
+        """Stream the assignments of a day for exports, ordered by position and hall."""
+        return self.stream_rows(
+            select(
+                UserDay.id.label("user_day_id"),
+                ApplicationForm.id.label("form_id"),
+                User.id.label("user_id"),
+                User.first_name_ru,
+                User.last_name_ru,
+                User.first_name_en,
+                User.last_name_en,
+                User.phone,
+                User.telegram_username,
+                Position.name.label("position"),
+                Hall.name.label("hall"),
+                UserDay.attendance,
+                UserDay.information,
+            )
+            .join(ApplicationForm, UserDay.application_form_id == ApplicationForm.id)
+            .join(User, ApplicationForm.user_id == User.id)
+            .join(Position, UserDay.position_id == Position.id)
+            .outerjoin(Hall, UserDay.hall_id == Hall.id)
+            .where(UserDay.day_id == day_id)
+            .order_by(Position.name, Hall.name.nulls_first(), User.last_name_ru, UserDay.id)
+        )
+
     async def add_year(self, year_in: YearIn) -> Year:
         created_year = Year(
             year_name=year_in.year_name, open_for_registration=year_in.open_for_registration
@@ -213,9 +583,10 @@ class YearService(BaseService):
                 updated_year.open_for_registration = open_for_registration
 
             await session.commit()
+        await self._share_year_snapshot_invalidation(year_id)
 
     async def get_position_by_id(self, position_id: int) -> Position | None:
-        async with self.session_scope() as session:
+        async with self.read_session_scope() as session:
             result = await session.execute(select(Position).where(Position.id == position_id))
             return result.scalar_one_or_none()
 
@@ -229,6 +600,7 @@ class YearService(BaseService):
         async with self.session_scope() as session:
             session.add(created_position)
             await session.commit()
+        await self._share_year_snapshot_invalidation(position_in.year_id)
         return created_position
 
     async def edit_position_by_position_id(
@@ -250,7 +622,9 @@ class YearService(BaseService):
             if (has_halls := position_edit_in.has_halls) is not None:
                 updated_position.has_halls = has_halls
 
+            year_id = updated_position.year_id
             await session.commit()
+        await self._share_year_snapshot_invalidation(year_id)
 
     async def add_day(self, day_in: DayIn) -> Day:
         created_day = Day(
@@ -264,6 +638,7 @@ class YearService(BaseService):
         async with self.session_scope() as session:
             session.add(created_day)
             await session.commit()
+        await self._share_year_snapshot_invalidation(day_in.year_id)
         return created_day
 
     async def edit_day_by_day_id(self, day_id: int, day_edit_in: DayEditIn) -> None:
@@ -282,10 +657,21 @@ class YearService(BaseService):
                 updated_day.score = score
             if (mandatory := day_edit_in.mandatory) is not None:
                 updated_day.mandatory = mandatory
+            published_changed = (
+                day_edit_in.assignment_published is not None
+                and day_edit_in.assignment_published != updated_day.assignment_published
+            )
             if (assignment_published := day_edit_in.assignment_published) is not None:
                 updated_day.assignment_published = assignment_published
 
+            year_id = updated_day.year_id
             await session.commit()
+        await self._share_year_snapshot_invalidation(year_id)
+        if published_changed:
+            await self.publish_day_events(
+                day_id,
+                [DayAssignmentEvent(type="reset", published=day_edit_in.assignment_published)],
+            )
 
     async def add_user_day(self, user_day_in: UserDayIn, author: User) -> UserDay:
         created_user_day = UserDay(
@@ -299,81 +685,262 @@ class YearService(BaseService):
         async with self.session_scope() as session:
             session.add(created_user_day)
             await session.commit()
-            day = await created_user_day.awaitable_attrs.day
-            application_form = await created_user_day.awaitable_attrs.application_form
-            user = await application_form.awaitable_attrs.user
-            position = await created_user_day.awaitable_attrs.position
-            hall = await created_user_day.awaitable_attrs.hall
-            await self.notifier.notify(
+            context = await _load_user_day_context(session, created_user_day.id)
+            if not context:
+                # Deleted right after it was added
+                raise UserDayNotFound()
+            day, user, position, hall = context.day, context.user, context.position, context.hall
+            await self.outbox.notify(
                 f"[{day.name}] {user.first_name_ru} {user.last_name_ru} (@{user.telegram_username}) \n(unassigned) -> {position.name} {hall.name if hall else ''}\n(by @{author.telegram_username})"
             )
+        await self.publish_day_events(
+            day.id, [_upsert_event(created_user_day.id, user, position, hall)]
+        )
         return created_user_day
 
     async def edit_user_day_by_user_day_id(
         self, user_day_id: int, user_day_edit_in: UserDayEditIn, author: User
     ) -> None:
         async with self.session_scope() as session:
-            existing_user_day = await session.execute(
-                select(UserDay).where(UserDay.id == user_day_id)
+            context = await _load_user_day_context(
+                session,
+                user_day_id,
+                new_position_id=user_day_edit_in.position_id,
+                new_hall_id=user_day_edit_in.hall_id,
             )
-
-            updated_user_day = existing_user_day.scalar_one_or_none()
-            if not updated_user_day:
+            if not context:
                 raise UserDayNotFound()
 
-            old_position = await updated_user_day.awaitable_attrs.position
-            old_hall = await updated_user_day.awaitable_attrs.hall
-
-            new_position = await session.get(Position, user_day_edit_in.position_id)
+            new_position = context.new_position
             if not new_position:
                 raise PositionNotFound()
 
             if not new_position.has_halls and user_day_edit_in.hall_id:
                 raise HallNotFound()
 
-            new_hall = (
-                await session.get(Hall, user_day_edit_in.hall_id)
-                if user_day_edit_in.hall_id
-                else None
-            )
+            new_hall = context.new_hall
+            if user_day_edit_in.hall_id and not new_hall:
+                raise HallNotFound()
 
+            updated_user_day = context.user_day
             if (information := user_day_edit_in.information) is not None:
                 updated_user_day.information = information
             if (attendance := user_day_edit_in.attendance) is not None:
                 updated_user_day.attendance = attendance
-            updated_user_day.position = new_position
-            updated_user_day.hall = new_hall
+            # Foreign keys rather than relationships, which would lazy load the old position
+            # and hall, and let delete-orphan delete the user day once it has no hall
+            updated_user_day.position_id = new_position.id
+            updated_user_day.hall_id = new_hall.id if new_hall else None
             await session.commit()
 
-            day = await updated_user_day.awaitable_attrs.day
-            application_form = await updated_user_day.awaitable_attrs.application_form
-            user = await application_form.awaitable_attrs.user
-
-            await self.notifier.notify(
+            day, user = context.day, context.user
+            old_position, old_hall = context.position, context.hall
+            await self.outbox.notify(
                 f"[{day.name}] {user.first_name_ru} {user.last_name_ru} (@{user.telegram_username})\n{old_position.name} {old_hall.name if old_hall else ''} -> {new_position.name} {new_hall.name if new_hall else ''}\n(by @{author.telegram_username})"
             )
+        await self.publish_day_events(
+            day.id, [_upsert_event(user_day_id, user, new_position, new_hall)]
+        )
 
     async def delete_user_day_by_user_day_id(self, user_day_id: int, author: User) -> None:
         """Delete a user day by its ID."""
         async with self.session_scope() as session:
-            existing_user_day = await session.execute(
-                select(UserDay).where(UserDay.id == user_day_id)
-            )
-            user_day = existing_user_day.scalar_one_or_none()
-            if not user_day:
+            context = await _load_user_day_context(session, user_day_id)
+            if not context:
                 raise UserDayNotFound()
 
-            await session.delete(user_day)
+            await session.delete(context.user_day)
             await session.commit()
 
-            day = await user_day.awaitable_attrs.day
-            application_form = await user_day.awaitable_attrs.application_form
-            user = await application_form.awaitable_attrs.user
-            position = await user_day.awaitable_attrs.position
-            hall = await user_day.awaitable_attrs.hall
-            await self.notifier.notify(
+            day, user, position, hall = context.day, context.user, context.position, context.hall
+            await self.outbox.notify(
                 f"[{day.name}] {user.first_name_ru} {user.last_name_ru} (@{user.telegram_username})\n{position.name} {hall.name if hall else ''} -> (unassigned)\n(by @{author.telegram_username})"
             )
+        await self.publish_day_events(
+            day.id, [DayAssignmentEvent(type="delete", user_day_id=user_day_id)]
+        )
+
+    async def apply_user_day_batch(self, batch: UserDayBatchIn, author: User) -> list[UserDay]:
+        """Add, edit and delete assignments of one day in a single transaction.
+
+        Everything referenced by the batch is loaded and validated up front with one query per
+        table, and a single notification summarises all the changes.
+
+        Returns:
+            The added user days, in the order of ``batch.add``
+        """
+        async with self.session_scope() as session:
+            day = await session.get(Day, batch.day_id)
+            if not day:
+                raise DayNotFound()
+
+            user_day_ids = batch.edit.keys() | batch.delete
+            user_days = {
+                user_day.id: user_day
+                for user_day in await session.scalars(
+                    select(UserDay)
+                    .where(UserDay.id.in_(user_day_ids), UserDay.day_id == day.id)
+                    .options(
+                        selectinload(UserDay.application_form).selectinload(ApplicationForm.user),
+                        selectinload(UserDay.position),
+                        selectinload(UserDay.hall),
+                    )
+                )
+            }
+            if user_days.keys() != user_day_ids:
+                raise UserDayNotFound()
+
+            form_ids = {user_day_in.application_form_id for user_day_in in batch.add}
+            forms = {
+                form.id: form
+                for form in await session.scalars(
+                    select(ApplicationForm)
+                    .where(ApplicationForm.id.in_(form_ids), ApplicationForm.year_id == day.year_id)
+                    .options(selectinload(ApplicationForm.user))
+                )
+            }
+            if forms.keys() != form_ids:
+                raise ApplicationFormNotFound()
+            if form_ids:
+                # Forms may only be added again if the batch deletes their assignment
+                assigned = await session.scalar(
+                    select(UserDay.application_form_id)
+                    .where(
+                        UserDay.day_id == day.id,
+                        UserDay.application_form_id.in_(form_ids),
+                        UserDay.id.not_in(batch.delete),
+                    )
+                    .limit(1)
+                )
+                if assigned is not None:
+                    raise UserDayAlreadyExists()
+
+            changes: list[UserDayBatchAddIn | UserDayEditIn] = [*batch.add, *batch.edit.values()]
+            position_ids = {change.position_id for change in changes}
+            positions = {
+                position.id: position
+                for position in await session.scalars(
+                    select(Position).where(
+                        Position.id.in_(position_ids), Position.year_id == day.year_id
+                    )
+                )
+            }
+            if positions.keys() != position_ids:
+                raise PositionNotFound()
+
+            hall_ids = {change.hall_id for change in changes if change.hall_id is not None}
+            halls = {
+                hall.id: hall
+                for hall in await session.scalars(
+                    select(Hall).where(Hall.id.in_(hall_ids), Hall.year_id == day.year_id)
+                )
+            }
+            if halls.keys() != hall_ids:
+                raise HallNotFound()
+            for change in changes:
+                if change.hall_id is not None and not positions[change.position_id].has_halls:
+                    raise HallNotFound()
+
+            lines: list[str] = []
+
+            for user_day_id in sorted(batch.delete):
+                user_day = user_days[user_day_id]
+                lines.append(
+                    f"{_describe_user(user_day.application_form.user)}: "
+                    f"{_describe_assignment(user_day.position, user_day.hall)} -> (unassigned)"
+                )
+            if batch.delete:
+                # Deleted right away, so re-added assignments can reuse the freed (form, day) pairs
+                await session.execute(
+                    delete(Assessment).where(Assessment.user_day_id.in_(batch.delete))
+                )
+                await session.execute(delete(UserDay).where(UserDay.id.in_(batch.delete)))
+
+            edited_events = []
+            for user_day_id, user_day_edit_in in sorted(batch.edit.items()):
+                user_day = user_days[user_day_id]
+                new_position = positions[user_day_edit_in.position_id]
+                new_hall = (
+                    halls[user_day_edit_in.hall_id]
+                    if user_day_edit_in.hall_id is not None
+                    else None
+                )
+                lines.append(
+                    f"{_describe_user(user_day.application_form.user)}: "
+                    f"{_describe_assignment(user_day.position, user_day.hall)} -> "
+                    f"{_describe_assignment(new_position, new_hall)}"
+                )
+                if (information := user_day_edit_in.information) is not None:
+                    user_day.information = information
+                if (attendance := user_day_edit_in.attendance) is not None:
+                    user_day.attendance = attendance
+                # Foreign keys rather than relationships, which would let delete-orphan
+                # delete the user day once it has no hall
+                user_day.position_id = new_position.id
+                user_day.hall_id = new_hall.id if new_hall else None
+                edited_events.append(
+                    _upsert_event(
+                        user_day_id, user_day.application_form.user, new_position, new_hall
+                    )
+                )
+
+            added_user_days = []
+            for user_day_in in batch.add:
+                position = positions[user_day_in.position_id]
+                hall = halls[user_day_in.hall_id] if user_day_in.hall_id is not None else None
+                lines.append(
+                    f"{_describe_user(forms[user_day_in.application_form_id].user)}: "
+                    f"(unassigned) -> {_describe_assignment(position, hall)}"
+                )
+                added_user_days.append(
+                    UserDay(
+                        application_form_id=user_day_in.application_form_id,
+                        day_id=day.id,
+                        information=user_day_in.information,
+                        attendance=user_day_in.attendance,
+                        position=position,
+                        hall=hall,
+                    )
+                )
+            session.add_all(added_user_days)
+            try:
+                await session.commit()
+            except IntegrityError as e:
+                # Another request assigned one of the forms after the check above
+                if _violates(e, "uq_user_day_application_form_day"):
+                    raise UserDayAlreadyExists() from e
+                raise
+
+        await self.publish_day_events(
+            day.id,
+            [
+                *(
+                    DayAssignmentEvent(type="delete", user_day_id=user_day_id)
+                    for user_day_id in sorted(batch.delete)
+                ),
+                *edited_events,
+                *(
+                    _upsert_event(
+                        user_day.id,
+                        forms[user_day.application_form_id].user,
+                        user_day.position,
+                        user_day.hall,
+                    )
+                    for user_day in added_user_days
+                ),
+            ],
+        )
+        if lines:
+            await self.outbox.notify(
+                "\n".join(
+                    [
+                        f"[{day.name}] {len(batch.add)} added, {len(batch.edit)} changed, "
+                        f"{len(batch.delete)} removed (by @{author.telegram_username})",
+                        *lines,
+                    ]
+                )
+            )
+        return added_user_days
 
     async def copy_assignments_from_day(
         self, source_day_id: int, target_day_id: int, overwrite_existing: bool = False
@@ -383,82 +950,83 @@ class YearService(BaseService):
         Args:
             source_day_id: The ID of the day to copy assignments from
             target_day_id: The ID of the day to copy assignments to
-            overwrite_existing: If True, overwrite existing assignments for users who already have assignments on target day
+            overwrite_existing: If True, overwrite existing assignments for users who already have assignments on target day,
+                dropping their assessments
 
         Returns:
             The number of assignments copied
         """
-        async with self.session_scope() as session:
-            # Verify both days exist
-            source_day = await session.execute(select(Day).where(Day.id == source_day_id))
-            source_day_obj = source_day.scalar_one_or_none()
-            if not source_day_obj:
-                raise DayNotFound()
+        if source_day_id == target_day_id:
+            raise SameDayCopy()
 
-            target_day = await session.execute(select(Day).where(Day.id == target_day_id))
-            target_day_obj = target_day.scalar_one_or_none()
-            if not target_day_obj:
-                raise DayNotFound()
-
-            # Get all assignments from source day
-            source_assignments = await session.execute(
-                select(UserDay)
-                .where(UserDay.day_id == source_day_id)
-                .options(
-                    selectinload(UserDay.application_form),
-                    selectinload(UserDay.position),
-                    selectinload(UserDay.hall),
-                )
+        async with self.session_scope() as session:
+            days_found = await session.scalar(
+                select(func.count(Day.id)).where(Day.id.in_({source_day_id, target_day_id}))
             )
-            source_assignments_list = list(source_assignments.scalars().all())
-
-            if not source_assignments_list:
-                return 0
+            if days_found != len({source_day_id, target_day_id}):
+                raise DayNotFound()
 
-            # Get existing assignments for target day (to check for conflicts)
-            existing_assignments = await session.execute(
-                select(UserDay).where(UserDay.day_id == target_day_id)
+            # One INSERT ... SELECT for the whole day, conflicts resolved by the unique constraint
+            copy = insert(UserDay).from_select(
+                [
+                    UserDay.application_form_id,
+                    UserDay.day_id,
+                    UserDay.information,
+                    UserDay.attendance,
+                    UserDay.position_id,
+                    UserDay.hall_id,
+                ],
+                select(
+                    UserDay.application_form_id,
+                    literal(target_day_id, Integer),
+                    UserDay.information,
+                    UserDay.attendance,
+                    UserDay.position_id,
+                    UserDay.hall_id,
+                ).where(UserDay.day_id == source_day_id),
             )
-            existing_assignments_list = list(existing_assignments.scalars().all())
-            existing_application_form_ids = {
-                assignment.application_form_id for assignment in existing_assignments_list
-            }
-
-            copied_count = 0
-
-            for source_assignment in source_assignments_list:
-                # Check if user already has an assignment on target day
-                if source_assignment.application_form_id in existing_application_form_ids:
-                    if overwrite_existing:
-                        # Delete existing assignment
-                        existing_assignment = next(
-                            (
-                                a
-                                for a in existing_assignments_list
-                                if a.application_form_id == source_assignment.application_form_id
-                            ),
-                            None,
-                        )
-                        if existing_assignment:
-                            await session.delete(existing_assignment)
-                    else:
-                        # Skip this assignment
-                        continue
-
-                # Create new assignment for target day
-                new_assignment = UserDay(
-                    application_form_id=source_assignment.application_form_id,
-                    day_id=target_day_id,
-                    information=source_assignment.information,
-                    attendance=source_assignment.attendance,
-                    position_id=source_assignment.position_id,
-                    hall_id=source_assignment.hall_id,
-                )
-                session.add(new_assignment)
-                copied_count += 1
+            count_copied = select(func.count())
+            if overwrite_existing:
+                copy = copy.on_conflict_do_update(
+                    constraint="uq_user_day_application_form_day",
+                    set_={
+                        "information": copy.excluded.information,
+                        "attendance": copy.excluded.attendance,
+                        "position_id": copy.excluded.position_id,
+                        "hall_id": copy.excluded.hall_id,
+                        "updated_at": func.now(),
+                    },
+                )
+                # An overwritten assignment starts over, as if it were recreated: the
+                # assessments of the old one go in the same statement
+                source = aliased(UserDay)
+                overwritten = select(UserDay.id).where(
+                    UserDay.day_id == target_day_id,
+                    UserDay.application_form_id.in_(
+                        select(source.application_form_id).where(source.day_id == source_day_id)
+                    ),
+                )
+                count_copied = count_copied.add_cte(
+                    delete(Assessment)
+                    .where(Assessment.user_day_id.in_(overwritten))
+                    .cte("overwritten_assessments")
+                )
+            else:
+                copy = copy.on_conflict_do_nothing(constraint="uq_user_day_application_form_day")
 
+            copied = copy.returning(UserDay.id).cte("copied")
+            copied_count = await session.scalar(count_copied.select_from(copied))
             await session.commit()
-            return copied_count
+
+            if copied_count:
+                # Too many changes to send one by one, live subscribers reload the whole day
+                published = await session.scalar(
+                    select(Day.assignment_published).where(Day.id == target_day_id)
+                )
+                await self.publish_day_events(
+                    target_day_id, [DayAssignmentEvent(type="reset", published=published)]
+                )
+            return copied_count or 0
 
     async def add_assessment(self, assessment_in: AssessmentIn) -> Assessment:
         created_assessment = Assessment(
@@ -490,109 +1058,134 @@ class YearService(BaseService):
 
             await session.commit()
 
-    async def create_form(self, form: ApplicationFormIn) -> None:
+    async def save_form(self, form: ApplicationFormIn) -> bool:
+        """Create or update the user's form of the year; returns whether it was created.
+
+        Saving the same form again changes nothing but its ``updated_at``, so concurrent
+        or repeated saves can't conflict. Takes at most three statements.
+        """
         async with self.session_scope() as session:
-            created_form = ApplicationForm(
+            upsert = insert(ApplicationForm).values(
                 year_id=form.year_id,
                 user_id=form.user_id,
                 itmo_group=form.itmo_group,
                 comments=form.comments,
                 needs_invitation=form.needs_invitation,
             )
-            session.add(created_form)
-            await session.flush()
-
-            for pos_id in form.desired_positions_ids:
-                association = FormPositionAssociation(
-                    form_id=created_form.id,
-                    position_id=pos_id,
-                    year_id=form.year_id,
+            upsert = upsert.on_conflict_do_update(
+                constraint="application_forms_unique_year_id_user_id",
+                set_={
+                    "itmo_group": upsert.excluded.itmo_group,
+                    "comments": upsert.excluded.comments,
+                    "needs_invitation": upsert.excluded.needs_invitation,
+                    "updated_at": func.now(),
+                },
+            )
+            # xmax is only set on rows that were there before, i.e. updated rather than inserted
+            form_id, created = (
+                await session.execute(
+                    upsert.returning(ApplicationForm.id, literal_column("xmax = 0"))
                 )
-                session.add(association)
-            await session.commit()
-
-    async def update_form(self, form: ApplicationFormIn) -> None:
-        async with self.session_scope() as session:
-            existing_form = await session.execute(
-                select(ApplicationForm).where(
-                    and_(
-                        ApplicationForm.year_id == form.year_id,
-                        ApplicationForm.user_id == form.user_id,
+            ).one()
+
+            position_ids = sorted(form.desired_positions_ids)
+            if not created:
+                await session.execute(
+                    delete(FormPositionAssociation).where(
+                        FormPositionAssociation.form_id == form_id,
+                        FormPositionAssociation.position_id.not_in(position_ids),
                     )
                 )
-            )
-
-            updated_form = existing_form.scalar_one_or_none()
-            if not updated_form:
-                raise ApplicationFormNotFound()
-
-            updated_form.itmo_group = form.itmo_group
-            updated_form.comments = form.comments
-            updated_form.needs_invitation = form.needs_invitation
-            await session.flush()
-
-            # Delete existing associations
-            await session.execute(
-                delete(FormPositionAssociation).where(
-                    FormPositionAssociation.form_id == updated_form.id
-                )
-            )
-
-            # Create new associations
-            for pos_id in form.desired_positions_ids:
-                association = FormPositionAssociation(
-                    form_id=updated_form.id,
-                    position_id=pos_id,
-                    year_id=form.year_id,
+            if position_ids:
+                # Positions the form already has are left alone
+                await session.execute(
+                    insert(FormPositionAssociation)
+                    .values(
+                        [
+                            {"form_id": form_id, "position_id": pos_id, "year_id": form.year_id}
+                            for pos_id in position_ids
+                        ]
+                    )
+                    .on_conflict_do_nothing()
                 )
-                session.add(association)
             await session.commit()
+            return bool(created)
 
     async def get_user_experience(self, user_id: int) -> list[ExperienceItem]:
         """Get prior experience data for a user across all years."""
-        async with self.session_scope() as session:
-            # Get all user days for this user with related data
-            result = await session.execute(
-                select(UserDay)
-                .join(ApplicationForm)
-                .where(ApplicationForm.user_id == user_id)
-                .options(
-                    selectinload(UserDay.application_form).selectinload(ApplicationForm.year),
-                    selectinload(UserDay.position),
-                    selectinload(UserDay.assessments),
+        experience_by_user = await self.get_users_experience({user_id})
+        return experience_by_user.get(user_id, [])
+
+    async def get_users_experience(self, user_ids: set[int]) -> dict[int, list[ExperienceItem]]:
+        """Get prior experience data for several users across all years.
+
+        Runs a constant number of queries regardless of how many users are requested.
+        Users without any prior experience are absent from the returned mapping.
+        """
+        if not user_ids:
+            return {}
+
+        async with self.read_session_scope() as session:
+            # Get all user days for these users with the year and position names
+            user_days_result = await session.execute(
+                select(
+                    UserDay.id,
+                    UserDay.attendance,
+                    ApplicationForm.user_id,
+                    ApplicationForm.year_id,
+                    Year.year_name,
+                    Position.name,
                 )
-                .order_by(ApplicationForm.year_id)
+                .join(ApplicationForm, UserDay.application_form_id == ApplicationForm.id)
+                .join(Year, ApplicationForm.year_id == Year.id)
+                .join(Position, UserDay.position_id == Position.id)
+                .where(ApplicationForm.user_id.in_(user_ids))
+                .order_by(ApplicationForm.user_id, ApplicationForm.year_id, UserDay.id)
+            )
+            user_days = user_days_result.all()
+
+            # Get all assessments of those user days in one go
+            assessments_result = await session.execute(
+                select(Assessment.user_day_id, Assessment.value, Assessment.comment)
+                .join(UserDay, Assessment.user_day_id == UserDay.id)
+                .join(ApplicationForm, UserDay.application_form_id == ApplicationForm.id)
+                .where(ApplicationForm.user_id.in_(user_ids))
+                .order_by(Assessment.id)
             )
-            user_days = list(result.scalars().all())
+            assessments_by_user_day: dict[int, list[str]] = {}
+            for user_day_id, value, comment in assessments_result:
+                assessments_by_user_day.setdefault(user_day_id, []).append(
+                    str(value) + ": " + comment
+                )
 
-            # Group by year and build experience list directly
-            experience_by_year: dict[int, ExperienceItem] = {}
+        # Group by user and year and build experience lists directly
+        experience_by_user: dict[int, dict[int, ExperienceItem]] = {}
 
-            for user_day in user_days:
-                year_id = user_day.application_form.year_id
-                year_name = user_day.application_form.year.year_name
+        for user_day_id, attendance, user_id, year_id, year_name, position_name in user_days:
+            experience_by_year = experience_by_user.setdefault(user_id, {})
 
-                if year_id not in experience_by_year:
-                    experience_by_year[year_id] = ExperienceItem(
-                        year_name=year_name,
-                        positions=[],
-                        attendance_stats={},
-                        assessments=[],
-                    )
+            if year_id not in experience_by_year:
+                experience_by_year[year_id] = ExperienceItem(
+                    year_name=year_name,
+                    positions=[],
+                    attendance_stats={},
+                    assessments=[],
+                )
+            experience = experience_by_year[year_id]
 
-                # Add position if not already present
-                if user_day.position.name not in experience_by_year[year_id].positions:
-                    experience_by_year[year_id].positions.append(user_day.position.name)
+            # Add position if not already present
+            if position_name not in experience.positions:
+                experience.positions.append(position_name)
 
-                # Increment attendance count
-                experience_by_year[year_id].attendance_stats[user_day.attendance] = (
-                    experience_by_year[year_id].attendance_stats.get(user_day.attendance, 0) + 1
-                )
+            # Increment attendance count
+            experience.attendance_stats[attendance] = (
+                experience.attendance_stats.get(attendance, 0) + 1
+            )
 
-                # Add assessment comments
-                for assessment in user_day.assessments:
-                    experience_by_year[year_id].assessments.append(
-                        str(assessment.value) + ": " + assessment.comment
-                    )
+            # Add assessment comments
+            experience.assessments.extend(assessments_by_user_day.get(user_day_id, []))
 
-            return list(experience_by_year.values())
+        return {
+            user_id: list(experience_by_year.values())
+            for user_id, experience_by_year in experience_by_user.items()
+        }